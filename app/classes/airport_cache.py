@@ -1,23 +1,41 @@
+import hashlib
 import json
 from pathlib import Path
-from typing import Set
-from app.utils.types import AirportMapData
+from typing import Optional, Set, Union, cast
+from app.classes.graph_artifact import read_graph_artifact, write_graph_artifact
+from app.classes.map_archive import read_map_archive, read_map_source, write_map_archive
+from app.classes.map_tiles import MapTiles, cut_map_tiles, read_map_tiles, write_map_tiles
+from app.classes.taxi_graph import TaxiGraph
+from app.utils.types import AirportMapData, JsonMapSource, MapSource
 
 
 class AirportCache:
-    def __init__(self, cache_dir: Path = Path(__file__).resolve().parent.parent / "data"):
+    """
+    Airport maps cached in `cache_dir`: <ICAO>.map (map archive) and/or <ICAO>.json.
+    The archive is what gets written and preferred on load; a JSON entry (the
+    bundled maps, or caches from before the archive) is converted on first load.
+    Writing an entry also cuts its map tiles (<ICAO>.tiles). Each archive records
+    its source: the apt.dat record checksum and parser version it was parsed
+    with, or the digest of the JSON entry it was converted from.
+    """
+
+    def __init__(self, cache_dir: Path = Path(__file__).resolve().parent.parent / "data", verbose: bool = True):
         self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.writes = 0  # entries written by this process; tells whether anything changed since a check
         self.available_icaos: Set[str] = self._scan_cache()
-        print("[AirportCache] Available ICAOs:")
-        for icao in self.available_icaos:
-            print(f" - {icao}")
+        if verbose:
+            print("[AirportCache] Available ICAOs:")
+            for icao in self.available_icaos:
+                print(f" - {icao}")
 
     def _scan_cache(self) -> Set[str]:
         if not self.cache_dir.exists():
             self.cache_dir.mkdir(parents=True)
         return {
             f.stem.upper()
-            for f in self.cache_dir.glob("*.json")
+            for pattern in ("*.json", "*.map")
+            for f in self.cache_dir.glob(pattern)
             if f.is_file()
         }
 
@@ -25,17 +43,104 @@ class AirportCache:
         print(f"[AirportCache] Checking cache for {icao}")
         return icao.upper() in self.available_icaos
 
+    def _archive_path(self, icao: str) -> Path:
+        return self.cache_dir / f"{icao.upper()}.map"
+
+    def _json_path(self, icao: str) -> Path:
+        return self.cache_dir / f"{icao.upper()}.json"
+
+    def _map_path(self, icao: str) -> Path:
+        """The file `load` reads: the archive, unless a JSON entry is newer (edited by hand)."""
+        archive, json_path = self._archive_path(icao), self._json_path(icao)
+        if json_path.is_file() and (not archive.is_file() or json_path.stat().st_mtime_ns > archive.stat().st_mtime_ns):
+            return json_path
+        return archive
+
     def load(self, icao: str) -> AirportMapData:
-        path = self.cache_dir / f"{icao.upper()}.json"
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        """The map as a LazyAirportMap: sections are only decoded when accessed."""
+        path = self._map_path(icao)
+        if path.suffix == ".map":
+            archive = read_map_archive(path)
+            if archive is not None:
+                return cast(AirportMapData, archive)
+            path = self._json_path(icao)
 
-    def save(self, icao: str, data: AirportMapData) -> None:
+        raw = path.read_bytes()
+        data = json.loads(raw.decode("utf-8"))
         try:
-            path = self.cache_dir / f"{icao.upper()}.json"
-            with path.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-            self.available_icaos.add(icao.upper())
-            print(f"[AirportCache] Saved cache for {icao}")
+            self.write(icao, data, JsonMapSource(origin="json", digest=hashlib.sha1(raw).hexdigest()))
+            archive = read_map_archive(self._archive_path(icao))
+        except Exception as e:
+            print(f"[AirportCache] Could not convert {icao} to a map archive: {e}")
+            archive = None
+        return cast(AirportMapData, archive) if archive is not None else data
+
+    def save(self, icao: str, data: AirportMapData, source: Optional[MapSource] = None) -> None:
+        try:
+            self.write(icao, data, source)
+            if self.verbose:
+                print(f"[AirportCache] Saved cache for {icao}")
         except Exception as e:
             print(f"[AirportCache] Error saving {icao}: {e}")
+
+    def write(self, icao: str, data: AirportMapData, source: Optional[Union[MapSource, JsonMapSource]] = None) -> None:
+        """Like save, but raises; the archive is replaced atomically so an interrupted write never looks cached."""
+        write_map_archive(self._archive_path(icao), data, source)
+        # replaced rather than mutated: the hub may be iterating it while a loader thread writes
+        self.available_icaos = self.available_icaos | {icao.upper()}
+        self.writes += 1
+        write_map_tiles(self._tiles_path(icao), cut_map_tiles(data), self._source_digest(icao))
+
+    def from_json(self, icao: str) -> bool:
+        """Whether the cached map comes from a JSON entry (bundled, or edited by hand) rather than apt.dat."""
+        path = self._map_path(icao)
+        if path.suffix == ".json":
+            return True
+        source = read_map_source(path)
+        if source is None:
+            # archives from before sources: converted from the JSON next to them, if any
+            return self._json_path(icao).is_file()
+        return source.get("origin") == "json"
+
+    def source_of(self, icao: str) -> Optional[MapSource]:
+        """apt.dat source of the cached map; None when unknown (JSON entries, archives from before sources)."""
+        path = self._map_path(icao)
+        source = read_map_source(path) if path.suffix == ".map" else None
+        return cast(MapSource, source) if source is not None and "origin" not in source else None
+
+    # === Compiled taxi graph artifact (<ICAO>.graph, next to the cached map) ===
+    def _graph_path(self, icao: str) -> Path:
+        return self.cache_dir / f"{icao.upper()}.graph"
+
+    def _source_digest(self, icao: str) -> str:
+        return hashlib.sha1(self._map_path(icao).read_bytes()).hexdigest()
+
+    def load_graph(self, icao: str) -> Optional[TaxiGraph]:
+        if not self.is_cached(icao):
+            return None
+        return read_graph_artifact(self._graph_path(icao), self._source_digest(icao))
+
+    def save_graph(self, icao: str, graph: TaxiGraph) -> None:
+        try:
+            write_graph_artifact(self._graph_path(icao), graph, self._source_digest(icao))
+            if self.verbose:
+                print(f"[AirportCache] Saved compiled graph for {icao}")
+        except Exception as e:
+            print(f"[AirportCache] Error saving compiled graph for {icao}: {e}")
+
+    # === Map tiles (<ICAO>.tiles, next to the cached map) ===
+    def _tiles_path(self, icao: str) -> Path:
+        return self.cache_dir / f"{icao.upper()}.tiles"
+
+    def load_tiles(self, icao: str) -> Optional[MapTiles]:
+        if not self.is_cached(icao):
+            return None
+        return read_map_tiles(self._tiles_path(icao), self._source_digest(icao))
+
+    def save_tiles(self, icao: str, tiles: MapTiles) -> None:
+        try:
+            write_map_tiles(self._tiles_path(icao), tiles, self._source_digest(icao))
+            if self.verbose:
+                print(f"[AirportCache] Saved map tiles for {icao}")
+        except Exception as e:
+            print(f"[AirportCache] Error saving map tiles for {icao}: {e}")
@@ -0,0 +1,121 @@
+"""
+Byte-offset index over apt.dat, stored next to it as apt.dat.index.
+
+The global apt.dat holds every airport of the world; the index records where
+each airport record starts and ends so a single airport can be read from a
+memory map without tokenizing the rest of the file. It is tied to apt.dat's
+size and mtime and rebuilt by one scan whenever either changes.
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# bump whenever the index layout changes: older sidecars are then rebuilt
+APT_INDEX_VERSION = 1
+HEADER_LINE_COUNT = 2  # "I"/"A" then the version line, replayed in front of every slice
+
+# land airport (1), seaplane base (16) and heliport (17) headers; the fifth field is the airport id
+_AIRPORT_HEADER = re.compile(rb"^(?:1|16|17)[ \t]+\S+[ \t]+\S+[ \t]+\S+[ \t]+(\S+)", re.MULTILINE)
+
+
+class AptIndex:
+    def __init__(self, apt_path: Path, header: str, airports: Dict[str, Tuple[int, int]]):
+        self.apt_path = apt_path
+        self.header = header
+        self.airports = airports
+
+    @staticmethod
+    def index_path(apt_path: Path) -> Path:
+        return apt_path.with_name(apt_path.name + ".index")
+
+    @classmethod
+    def load_or_build(cls, apt_path: Path) -> "AptIndex":
+        stat = apt_path.stat()  # FileNotFoundError when apt.dat is missing, as before
+        index = cls._load(apt_path, stat)
+        if index is not None:
+            return index
+
+        print(f"[AptIndex] Indexing {apt_path.name} ({stat.st_size / 1_000_000:.0f} MB), one-time scan")
+        index = cls.build(apt_path)
+        index._save(stat)
+        print(f"[AptIndex] Indexed {len(index.airports)} airports")
+        return index
+
+    @classmethod
+    def build(cls, apt_path: Path) -> "AptIndex":
+        airports: Dict[str, Tuple[int, int]] = {}
+
+        with apt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end = 0
+            if data[:1] in (b"A", b"I"):
+                for _ in range(HEADER_LINE_COUNT):
+                    newline = data.find(b"\n", header_end)
+                    header_end = len(data) if newline == -1 else newline + 1
+            header = data[:header_end].decode("utf8")
+
+            starts = [(match.start(), match.group(1)) for match in _AIRPORT_HEADER.finditer(data)]
+            for i, (start, airport_id) in enumerate(starts):
+                end = starts[i + 1][0] if i + 1 < len(starts) else len(data)
+                # the first record wins, as in a full AptDat lookup
+                airports.setdefault(airport_id.decode("utf8").upper(), (start, end))
+
+        return cls(apt_path, header, airports)
+
+    def read(self, icao: str) -> Optional[str]:
+        """apt.dat text of one airport, file header included; None when the ICAO is not indexed."""
+        span = self.airports.get(icao.upper())
+        if span is None:
+            return None
+
+        start, end = span
+        with self.apt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return self.header + data[start:end].decode("utf8")
+
+    def checksums(self, icaos: Iterable[str]) -> Dict[str, str]:
+        """sha1 of each indexed airport's record; ICAOs missing from apt.dat are left out."""
+        spans = {icao.upper(): self.airports.get(icao.upper()) for icao in icaos}
+        with self.apt_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return {
+                icao: hashlib.sha1(data[span[0]:span[1]]).hexdigest()
+                for icao, span in spans.items()
+                if span is not None
+            }
+
+    @classmethod
+    def _load(cls, apt_path: Path, stat: os.stat_result) -> Optional["AptIndex"]:
+        path = cls.index_path(apt_path)
+        if not path.is_file():
+            return None
+
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            if (raw.get("version") != APT_INDEX_VERSION or
+                raw.get("size") != stat.st_size or raw.get("mtime_ns") != stat.st_mtime_ns):
+                return None
+            airports = {icao: (span[0], span[1]) for icao, span in raw["airports"].items()}
+            return cls(apt_path, raw["header"], airports)
+
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            print(f"[AptIndex] Ignoring unreadable index {path.name}: {e}")
+            return None
+
+    def _save(self, stat: os.stat_result) -> None:
+        path = self.index_path(self.apt_path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump({
+                    "version": APT_INDEX_VERSION,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "header": self.header,
+                    "airports": self.airports,
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[AptIndex] Could not save {path.name}: {e}")
@@ -1,9 +1,12 @@
 from pathlib import Path
-from typing import List, cast
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, cast
 
-from xplane_airports.AptDat import AptDat, AptDatLine, RowCode
+from xplane_airports.AptDat import AptDat, IcaoWidth, RowCode
+from app.classes.apt_index import AptIndex
 from app.utils.types import (
     AirportMapData,
+    LonLat,
+    MapSource,
     ParkingType,
     Runway,
     Helipad,
@@ -11,20 +14,81 @@ from app.utils.types import (
     ParkingPosition
 )
 
+Tokens = List[str]
+TaxiEdgeRow = Tuple[int, int, Taxiway]  # begin node, end node, taxiway waiting for its coordinates
+
+# bump whenever build_map's output changes: cached maps built by an older parser are then rebuilt
+APT_PARSER_VERSION = 1
+
 class APTParser:
     APT_FILE_PATH: Path = Path(__file__).resolve().parent.parent / "data" / "apt.dat"
 
     def __init__(self):
-        self.apt_dat = AptDat(self.APT_FILE_PATH)
+        # only the byte offsets of each airport; records are parsed on demand
+        self.index = AptIndex.load_or_build(self.APT_FILE_PATH)
+        self.apt_stat = self._apt_stat()  # apt.dat (size, mtime) the index was built for
+
+    def _apt_stat(self) -> Tuple[int, int]:
+        stat = self.APT_FILE_PATH.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def refresh(self) -> bool:
+        """Re-index apt.dat if it changed on disk since; True when it did."""
+        stat = self._apt_stat()
+        if stat == self.apt_stat:
+            return False
+        self.index = AptIndex.load_or_build(self.APT_FILE_PATH)
+        self.apt_stat = stat
+        return True
+
+    def sources(self, icaos: Iterable[str]) -> Dict[str, MapSource]:
+        """What a map parsed now would be built from, for the ICAOs found in apt.dat."""
+        return {
+            icao: MapSource(checksum=checksum, parser_version=APT_PARSER_VERSION)
+            for icao, checksum in self.index.checksums(icaos).items()
+        }
+
+    def source_of(self, icao: str) -> Optional[MapSource]:
+        return self.sources([icao]).get(icao.upper())
 
     def parse_airport(self, icao: str) -> AirportMapData:
-        airport = self._get_airport_by_icao(icao)
+        return self.build_map(self._get_airport_by_icao(icao))
+
+    def _get_airport_by_icao(self, icao: str):
+        text = self.index.read(icao)
+        if text is not None:
+            for airport in AptDat.from_file_text(text, self.APT_FILE_PATH).airports:
+                if airport.id.upper() == icao.upper():
+                    return airport
+        raise ValueError(f"[APTParser] ICAO {icao} not found in apt.dat")
+
+    @classmethod
+    def build_map(cls, airport) -> AirportMapData:
+        """
+        One pass over the airport's tokenized rows: each row is handed to the
+        builder of its row code and its numeric fields are converted there,
+        once. Taxi edges only keep their node ids until the pass is over,
+        since X-Plane does not require nodes to come before the edges using them.
+        """
+        rows = _AirportRows()
+        builders: Dict[int, Callable[[Tokens], None]] = {
+            RowCode.LAND_RUNWAY: rows.add_runway,
+            RowCode.HELIPAD: rows.add_helipad,
+            RowCode.START_LOCATION_NEW: rows.add_parking,
+            RowCode.TAXI_ROUTE_NODE: rows.add_taxi_node,
+            RowCode.TAXI_ROUTE_EDGE: rows.add_taxi_edge,
+        }
+
+        for tokens in airport.tokenized_lines:
+            builder = builders.get(tokens[0])
+            if builder is not None:
+                builder(tokens)
 
         return {
-            "runways": self._parse_runways(airport),
-            "helipads": self._parse_helipads(airport),
-            "taxiways": self._parse_taxiways(airport),
-            "parking": self._parse_parking_positions(airport),
+            "runways": rows.runways,
+            "helipads": rows.helipads,
+            "taxiways": rows.taxiways(),
+            "parking": rows.parking,
             "airport_info": {
                 "icao": airport.id,
                 "name": airport.name,
@@ -32,96 +96,90 @@ class APTParser:
             }
         }
 
-    def _get_airport_by_icao(self, icao: str):
-        for airport in self.apt_dat.airports:
-            if airport.id.upper() == icao.upper():
-                return airport
-        raise ValueError(f"[APTParser] ICAO {icao} not found in apt.dat")
+    @staticmethod
+    def sanitize_parking_type(value: str) -> ParkingType:
+        v = value.strip().lower()
+        if v in ("gate", "tie_down", "hangar", "ramp"):
+            return cast(ParkingType, v)
+        return "unknown"
 
 
-    def _parse_runways(self, airport) -> List[Runway]:
-        runways: List[Runway] = []
-        for line in airport.text:
-            if isinstance(line, AptDatLine) and line.tokens:
-                code = line.tokens[0]
-                if isinstance(code, RowCode):
-                    code = code.value
-
-                if code == RowCode.LAND_RUNWAY:
-                    try:
-                        tokens = line.tokens
-                        runways.append({
-                            "name": f"{tokens[8]}/{tokens[17]}",
-                            "start": (float(tokens[9]), float(tokens[10])),
-                            "end": (float(tokens[18]), float(tokens[19])),
-                            "width": float(tokens[1]),
-                            "surface": int(tokens[2])
-                        })
-                    except Exception:
-                        continue
-        return runways
-
-    def _parse_helipads(self, airport) -> List[Helipad]:
-        helipads: List[Helipad] = []
-        for line in airport.text:
-            if line.is_runway() and line.runway_type == RowCode.HELIPAD:
-                try:
-                    tokens = line.tokens
-                    helipads.append({
-                        "name": tokens[1],
-                        "location": (float(tokens[2]), float(tokens[3])),
-                        "heading": float(tokens[4]),
-                        "length": float(tokens[5]),
-                        "width": float(tokens[6]),
-                    })
-                except Exception as e:
-                    print(f"[APTParser] Error parsing helipad: {tokens} => {e}")
-        return helipads
-
-    def _parse_taxiways(self, airport) -> List[Taxiway]:
-        taxiways: List[Taxiway] = []
-        network = airport.taxi_network
+class _AirportRows:
+    """Map sections collected by APTParser.build_map, filled row by row."""
+
+    def __init__(self):
+        self.runways: List[Runway] = []
+        self.helipads: List[Helipad] = []
+        self.parking: List[ParkingPosition] = []
+        self.nodes: Dict[int, LonLat] = {}
+        self.edges: List[TaxiEdgeRow] = []
+
+    def add_runway(self, tokens: Tokens) -> None:
+        try:
+            self.runways.append({
+                "name": f"{tokens[8]}/{tokens[17]}",
+                "start": (float(tokens[9]), float(tokens[10])),
+                "end": (float(tokens[18]), float(tokens[19])),
+                "width": float(tokens[1]),
+                "surface": int(tokens[2])
+            })
+        except Exception:
+            pass
+
+    def add_helipad(self, tokens: Tokens) -> None:
+        try:
+            self.helipads.append({
+                "name": tokens[1],
+                "location": (float(tokens[2]), float(tokens[3])),
+                "heading": float(tokens[4]),
+                "length": float(tokens[5]),
+                "width": float(tokens[6]),
+            })
+        except Exception as e:
+            print(f"[APTParser] Error parsing helipad: {tokens} => {e}")
+
+    def add_parking(self, tokens: Tokens) -> None:
+        try:
+            self.parking.append({
+                "location": (float(tokens[1]), float(tokens[2])),
+                "heading": float(tokens[3]),
+                "type": APTParser.sanitize_parking_type(tokens[4]),
+                "name": " ".join(tokens[6:]) if len(tokens) > 6 else "Unnamed"
+            })
+        except Exception as e:
+            print(f"[APTParser] Skipping bad parking line: {tokens} => {e}")
 
-        for edge in network.edges:
+    def add_taxi_node(self, tokens: Tokens) -> None:
+        try:
+            self.nodes[int(tokens[4])] = (float(tokens[1]), float(tokens[2]))
+        except Exception as e:
+            print(f"[APTParser] Skipping bad taxi node: {tokens} => {e}")
+
+    def add_taxi_edge(self, tokens: Tokens) -> None:
+        try:
+            kind = tokens[4]
+            width = kind[-1] if kind.startswith("taxiway_") and kind[-1] in _ICAO_WIDTHS else "C"
+            self.edges.append((int(tokens[1]), int(tokens[2]), {
+                "name": " ".join(tokens[5:]) or "-",
+                "start": (0.0, 0.0),
+                "end": (0.0, 0.0),
+                "is_runway": kind == "runway",
+                "one_way": tokens[3] == "oneway",
+                "width": width
+            }))
+        except Exception as e:
+            print(f"[APTParser] Failed to parse taxiway: {e}")
+
+    def taxiways(self) -> List[Taxiway]:
+        taxiways: List[Taxiway] = []
+        for begin, end, taxiway in self.edges:
             try:
-                start = network.nodes[edge.node_begin]
-                end = network.nodes[edge.node_end]
-
-                taxiways.append({
-                    "name": edge.name or "-",
-                    "start": (start.lat, start.lon),
-                    "end": (end.lat, end.lon),
-                    "is_runway": edge.is_runway,
-                    "one_way": edge.one_way,
-                    "width": edge.icao_width.name if edge.icao_width else "C"
-                })
+                taxiway["start"] = self.nodes[begin]
+                taxiway["end"] = self.nodes[end]
+                taxiways.append(taxiway)
             except Exception as e:
                 print(f"[APTParser] Failed to parse taxiway: {e}")
         return taxiways
 
-    def _parse_parking_positions(self, airport) -> List[ParkingPosition]:
-        parking: List[ParkingPosition] = []
-        for line in airport.text:
-            if isinstance(line, AptDatLine) and line.tokens:
-                code = line.tokens[0]
-                if isinstance(code, RowCode):
-                    code = code.value
-
-                if int(code) == 1300:
-                    try:
-                        tokens = line.tokens
-                        parking.append({
-                            "location": (float(tokens[1]), float(tokens[2])),
-                            "heading": float(tokens[3]),
-                            "type": self.sanitize_parking_type(str(tokens[4])),
-                            "name": " ".join(str(t) for t in tokens[6:]) if len(tokens) > 6 else "Unnamed"                        
-                        })
-                    except Exception as e:
-                        print(f"[APTParser] Skipping bad parking line: {tokens} => {e}")
-        return parking
-    
-    def sanitize_parking_type(self, value: str) -> ParkingType:
-        v = value.strip().lower()
-        if v in ("gate", "tie_down", "hangar", "ramp"):
-            return cast(ParkingType, v)
-        return "unknown"
+
+_ICAO_WIDTHS = frozenset(width.value for width in IcaoWidth)
@@ -5,8 +5,9 @@ from app.utils.types import AtcPublicView, StepStatus, UpdateStepData
 from app.utils.constants import ACTION_WORKFLOW, DEFAULT_TIMER_DURATION, PUSHBACK, PUSHBACK_DIRECTIONS, STANDBY_TIMER_DURATION, AFFIRM, STANDBY, UNABLE
 
 class Atc:
-    def __init__(self, atc_id: str):
+    def __init__(self, atc_id: str, facility: str = ""):
         self.atc_id: str = atc_id
+        self.facility: str = facility
         self.selected_aircraft_id: str = ""
     
     def to_public(self) -> AtcPublicView:
@@ -1,167 +1,653 @@
-from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, Set
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Dict, Literal, NamedTuple, Optional, Sequence, Tuple, Set
 from heapq import heappush, heappop
+from time import perf_counter
+import numpy as np
+from app.utils.constants import ROUTE_CACHE_SIZE
 from app.utils.types import AirportMapData, LonLat, LocationInfo
-from math import sqrt
+from app.classes.contraction_hierarchy import ContractionHierarchy
+from app.classes.route_cache import RouteCache
+from app.classes.spatial_index import SpatialIndex
+from app.classes.taxi_graph import TaxiGraph, to_lonlat
+from math import inf, sqrt
 
 if TYPE_CHECKING:
     from app.classes.pilot import Pilot
 
-Graph = Dict[LonLat, List[Tuple[LonLat, float, str]]]
-LabelMap = Dict[Tuple[LonLat, LonLat], str]
+# two nodes closer than this (in degrees, per axis) are treated as the same point
+CLOSE_TOLERANCE = 1e-5
+# query points per block of the vectorised batch snapping (block x node_count distances in memory)
+SNAP_CHUNK_SIZE = 256
+# k-shortest paths: loopless routes examined per requested alternative before giving up on distinct ones
+YEN_ROUNDS_PER_ROUTE = 4
+
+RouteKey = Tuple[int, int]  # snapped (start node, goal node)
+
+
+class RouteResult(NamedTuple):
+    instruction: str
+    locations: List[LocationInfo]
+    edges: Tuple[int, ...]  # half-edges of the graph, in travel order
+
+# "search": A* per request. "precomputed": one shortest-path tree per runway end built at startup.
+# "ch": contraction hierarchy built at startup, queried bidirectionally per request.
+RoutingMode = Literal["search", "precomputed", "ch"]
+ROUTING_MODES: Tuple[RoutingMode, ...] = ("search", "precomputed", "ch")
+
+# runs fn(*args) and returns its result, possibly on another thread
+Executor = Callable[..., Any]
+
+
+def _call(fn: Callable[..., Any], *args: Any) -> Any:
+    return fn(*args)
 
 
 class ClearanceEngine:
-    def __init__(self, airport_map: AirportMapData):
+    def __init__(
+        self,
+        airport_map: AirportMapData,
+        route_cache: Optional[RouteCache[RouteKey, RouteResult]] = None,
+        routing_mode: RoutingMode = "search",
+        graph: Optional[TaxiGraph] = None,
+    ):
+        if routing_mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode: {routing_mode}")
+
         self.airport_map = airport_map
-        self.graph, self.label_map = self._build_graph()
-        
+        # a graph loaded from a compiled artifact skips the build entirely
+        self.graph: TaxiGraph = graph if graph is not None else TaxiGraph.from_airport_map(airport_map)
+        self.node_index: SpatialIndex = self.graph.build_node_index()
+
+        # per-engine copy of the weights: a closed half-edge weighs inf and every search skips it
+        self.edge_weights: List[float] = list(self.graph.weights_list)
+        self.closed_edges: Set[int] = set()
+        self.closure_version = 0  # bumped on every close/reopen, so in-flight searches can tell
+
+        self.component_of, self.component_index = self._build_components()
+        # node ids are only meaningful for this graph: whoever swaps the map must clear a shared cache
+        self.route_cache: RouteCache[RouteKey, RouteResult] = (
+            route_cache if route_cache is not None else RouteCache(ROUTE_CACHE_SIZE)
+        )
+
+        self.routing_mode: RoutingMode = routing_mode
+        self.runway_trees: Dict[int, np.ndarray] = {}
+        self.hierarchy: Optional[ContractionHierarchy] = None
+        self.close_nodes: Dict[int, List[int]] = {}
+        self.precompute_stats: Dict[str, float] = {}
+        if routing_mode == "precomputed":
+            self._build_runway_trees()
+        elif routing_mode == "ch":
+            self._build_hierarchy()
+
     def to_lonlat(self, coord: object) -> LonLat:
-        if (isinstance(coord, (list, tuple)) and len(coord) == 2 and
-            isinstance(coord[0], (int, float)) and isinstance(coord[1], (int, float))):
-            return (float(coord[0]), float(coord[1]))
-        raise ValueError(f"Invalid coord format: {coord}")
-
-
-    def _build_graph(self) -> Tuple[Graph, LabelMap]:
-        graph: Graph = {}
-        label_map: LabelMap = {}
-
-        def add_edge(a: LonLat, b: LonLat, label: str):
-            dist = self._distance(a, b)
-            graph.setdefault(a, []).append((b, dist, label))
-            graph.setdefault(b, []).append((a, dist, label))
-            label_map[(a, b)] = label
-            label_map[(b, a)] = label
-
-        for twy in self.airport_map["taxiways"]:
-            try:
-                a = self.to_lonlat(twy["start"])
-                b = self.to_lonlat(twy["end"])
-                label = str(twy.get("name", "TAXIWAY"))
-                add_edge(a, b, label)
-            except Exception as e:
-                print(f"[Taxiway skipped] {e}")
-
-        for rwy in self.airport_map["runways"]:
-            try:
-                a = self.to_lonlat(rwy["start"])
-                b = self.to_lonlat(rwy["end"])
-                label = str(rwy.get("name", "RUNWAY"))
-                add_edge(a, b, label)
-            except Exception as e:
-                print(f"[Runway skipped] {e}")
-
-        # add parkings to graph : pilots spawn at a parking positions
-        for parking in self.airport_map.get("parking", []):
-            try:
-                parking_coord = self.to_lonlat(parking["location"])
-                parking_name = str(parking.get("name", "PARKING"))
-
-                if not graph:
+        return to_lonlat(coord)
+
+    def _build_components(self) -> Tuple[List[int], List[SpatialIndex]]:
+        # label every node with its connected component; only closures change them
+        graph = self.graph
+        weights = self.edge_weights
+        component_of: List[int] = [-1] * graph.node_count
+        members: List[List[int]] = []
+
+        for root in range(graph.node_count):
+            if component_of[root] != -1:
+                continue
+
+            component = len(members)
+            component_of[root] = component
+            nodes = [root]
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                for edge in graph.neighbors(current):
+                    neighbor = graph.targets_list[edge]
+                    if component_of[neighbor] == -1 and weights[edge] != inf:
+                        component_of[neighbor] = component
+                        nodes.append(neighbor)
+                        stack.append(neighbor)
+            members.append(nodes)
+
+        return component_of, [
+            SpatialIndex([graph.coord(n) for n in nodes], keys=nodes) for nodes in members
+        ]
+
+    def _build_runway_trees(self) -> None:
+        started = perf_counter()
+        graph = self.graph
+
+        runway_nodes = {
+            self._closest_node(self.to_lonlat(rwy[end]))
+            for rwy in self.airport_map["runways"]
+            for end in ("start", "end")
+        }
+
+        # a start in another component is routed to the node of its own component closest to the runway
+        roots: Set[int] = set()
+        for runway in runway_nodes:
+            for component, index in enumerate(self.component_index):
+                same = self.component_of[runway] == component
+                roots.add(runway if same else index.nearest(graph.coord(runway)))
+
+        for root in roots:
+            self.runway_trees[root] = self._shortest_path_tree(root)
+
+        self.precompute_stats = {
+            "trees": len(self.runway_trees),
+            "build_ms": (perf_counter() - started) * 1000.0,
+            "bytes": sum(tree.nbytes for tree in self.runway_trees.values()),
+        }
+        print(
+            f"[ClearanceEngine] {self.precompute_stats['trees']} runway trees built in "
+            f"{self.precompute_stats['build_ms']:.1f} ms ({self.precompute_stats['bytes'] / 1024:.1f} KiB)"
+        )
+
+    def _build_hierarchy(self) -> None:
+        started = perf_counter()
+        self.hierarchy = ContractionHierarchy(self.graph)
+        self.close_nodes = self._find_close_nodes()
+
+        self.precompute_stats = {
+            "shortcuts": self.hierarchy.shortcut_count,
+            "build_ms": (perf_counter() - started) * 1000.0,
+        }
+        print(
+            f"[ClearanceEngine] Contraction hierarchy built in {self.precompute_stats['build_ms']:.1f} ms "
+            f"({self.hierarchy.shortcut_count} shortcuts)"
+        )
+
+    def _find_close_nodes(self) -> Dict[int, List[int]]:
+        """Nodes having other nodes within CLOSE_TOLERANCE, mapped to all of them (themselves included)."""
+        graph = self.graph
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for node in range(graph.node_count):
+            cell = (int(graph.xs[node] // CLOSE_TOLERANCE), int(graph.ys[node] // CLOSE_TOLERANCE))
+            cells.setdefault(cell, []).append(node)
+
+        close_nodes: Dict[int, List[int]] = {}
+        for (cx, cy), nodes in cells.items():
+            nearby = [n for dx in (-1, 0, 1) for dy in (-1, 0, 1) for n in cells.get((cx + dx, cy + dy), ())]
+            for node in nodes:
+                close = sorted(n for n in nearby if self._is_close(node, n))
+                if len(close) > 1:
+                    close_nodes[node] = close
+        return close_nodes
+
+    def _query_hierarchy(self, start: int, goal: int) -> Tuple[List[int], List[int]]:
+        assert self.hierarchy is not None
+        if self._is_close(start, goal):
+            return [start], []
+
+        goal = self._effective_goal(start, goal)
+        xs, ys, weights = self.graph.xs, self.graph.ys, self.edge_weights
+
+        # A* stops at the first node within tolerance of the goal: among those, it pops the smallest
+        # (cost + heuristic, cost, node), so the hierarchy picks its target the same way
+        best: Optional[Tuple[Tuple[float, float, int], List[int], List[int]]] = None
+        for target in self.close_nodes.get(goal, (goal,)):
+            path, edges = self.hierarchy.query(start, target)
+            if not path:
+                continue
+            cost = 0.0
+            for edge in edges:
+                cost += weights[edge]
+            h = sqrt((xs[target] - xs[goal]) ** 2 + (ys[target] - ys[goal]) ** 2)
+            rank = (cost + h, cost, target)
+            if best is None or rank < best[0]:
+                best = (rank, path, edges)
+
+        return (best[1], best[2]) if best is not None else ([], [])
+
+    def _shortest_path_tree(self, root: int) -> np.ndarray:
+        """Entry n is the half-edge leaving n toward `root` (-1 if unreachable)."""
+        toward_root, _ = self._dijkstra(root)
+        return np.array(toward_root, dtype=np.int32)
+
+    def _dijkstra(self, root: int) -> Tuple[List[int], Dict[int, float]]:
+        """Full Dijkstra from `root`: half-edge toward the root and distance to it, for every reached node."""
+        graph = self.graph
+        offsets, targets, twins = graph.offsets_list, graph.targets_list, graph.twins_list
+        weights = self.edge_weights
+
+        toward_root = [-1] * graph.node_count
+        best_cost: Dict[int, float] = {root: 0.0}
+        visited: Set[int] = set()
+        queue = [(0.0, root)]
+
+        while queue:
+            cost, current = heappop(queue)
+            if current in visited:
+                continue
+            visited.add(current)
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[edge]
+                new_cost = cost + weights[edge]
+                if neighbor in visited or new_cost >= best_cost.get(neighbor, inf):
                     continue
 
-                closest_node = self._closest_node(parking_coord, graph)
-                if closest_node:
-                    add_edge(parking_coord, closest_node, parking_name)
-            except Exception as e:
-                print(f"[Parking skipped] {e}")
+                best_cost[neighbor] = new_cost
+                toward_root[neighbor] = twins[edge]
+                heappush(queue, (new_cost, neighbor))
+
+        return toward_root, best_cost
+
+    def _walk_tree(self, tree: np.ndarray, start: int, goal: int) -> Optional[Tuple[List[int], List[int]]]:
+        """Follow `tree` from `start`; None when it is not rooted at the effective goal or never reaches it."""
+        if self._is_close(start, goal):
+            return [start], []
+
+        goal = self._effective_goal(start, goal)
+        if tree[goal] != -1:
+            return None
 
-        return graph, label_map
+        targets = self.graph.targets_list
+        path = [start]
+        edges: List[int] = []
+        node = start
+        while node != goal:
+            edge = int(tree[node])
+            if edge < 0:
+                return None
+            edges.append(edge)
+            node = targets[edge]
+            path.append(node)
+
+        return path, edges
 
     def generate_clearance(self, pilot: "Pilot") -> Tuple[str, List[LocationInfo]]:
-        start_raw = pilot.plane["current_pos"]["coord"]
-        end_raw = pilot.plane["final_pos"]["coord"]
+        return self.clearance_for(pilot, self.plan_route(pilot))
 
-        start = self._closest_node(self.to_lonlat(start_raw))
-        end = self._closest_node(self.to_lonlat(end_raw))
+    def generate_clearances(self, pilots: Sequence["Pilot"]) -> List[Tuple[str, List[LocationInfo]]]:
+        """`generate_clearance` for many pilots at once, results in the same order."""
+        return [self.clearance_for(pilot, route) for pilot, route in zip(pilots, self.plan_routes(pilots))]
 
-        path = self._find_path(start, end)
-        if not path:
+    def clearance_for(self, pilot: "Pilot", route: Optional[RouteResult]) -> Tuple[str, List[LocationInfo]]:
+        if route is None:
             return "UNABLE TO GENERATE CLEARANCE", [pilot.plane["current_pos"]]
 
-        labels = self._extract_labels(path)
-        instruction = f"TAXI VIA {' '.join(labels)}"
+        return route.instruction, list(route.locations)
 
-        locations = self._build_location_infos(path)
+    def route_key(self, pilot: "Pilot") -> RouteKey:
+        start = self._closest_node(self.to_lonlat(pilot.plane["current_pos"]["coord"]))
+        end = self._closest_node(self.to_lonlat(pilot.plane["final_pos"]["coord"]))
+        return start, end
 
-        return instruction, locations
+    def plan_route(self, pilot: "Pilot", execute: Executor = _call) -> Optional[RouteResult]:
+        """
+        Cached route for the pilot, computed on a miss.
 
+        The cache is only touched from the calling thread: `execute` receives the
+        search itself, so it can run it elsewhere (e.g. a worker thread).
+        """
+        key = self.route_key(pilot)
+        route = self.route_cache.get(key)
+        if route is None:
+            route = self._execute_stable(execute, self.compute_route, key)
+            if route is not None:
+                self.route_cache.put(key, route)
+        return route
 
-    def _find_path(self, start: LonLat, goal: LonLat) -> List[LonLat]:
-        if start not in self.graph or goal not in self.graph:
+    def plan_routes(self, pilots: Sequence["Pilot"], execute: Executor = _call) -> List[Optional[RouteResult]]:
+        """`plan_route` for many pilots; endpoints are snapped in one vectorised pass."""
+        if not pilots:
             return []
-        
-        if self._is_close(start, goal):
-            return [start]
-        
-        connected = set()
-        queue = [start]
+
+        points = [self.to_lonlat(p.plane["current_pos"]["coord"]) for p in pilots]
+        points += [self.to_lonlat(p.plane["final_pos"]["coord"]) for p in pilots]
+        snapped = self._closest_nodes(points)
+        keys: List[RouteKey] = list(zip(snapped[:len(pilots)], snapped[len(pilots):]))
+
+        routes: Dict[RouteKey, Optional[RouteResult]] = {}
+        missing: List[RouteKey] = []
+        for key in keys:
+            if key not in routes:
+                routes[key] = self.route_cache.get(key)
+                if routes[key] is None:
+                    missing.append(key)
+
+        if missing:
+            for key, route in zip(missing, self._execute_stable(execute, self.compute_routes, missing)):
+                routes[key] = route
+                if route is not None:
+                    self.route_cache.put(key, route)
+
+        return [routes[key] for key in keys]
+
+    def _execute_stable(self, execute: Executor, fn: Callable[..., Any], *args: Any) -> Any:
+        # a closure changed while `fn` ran elsewhere: its result may cross a closed edge, so run it again
+        while True:
+            version = self.closure_version
+            result = execute(fn, *args)
+            if version == self.closure_version:
+                return result
+
+    def compute_routes(self, keys: Sequence[RouteKey]) -> List[Optional[RouteResult]]:
+        """Uncached routes sharing a destination are walked from a single shortest-path tree."""
+        groups: Dict[int, List[int]] = {}  # effective goal -> positions in `keys`
+        for position, (start, end) in enumerate(keys):
+            groups.setdefault(self._effective_goal(start, end), []).append(position)
+
+        routes: List[Optional[RouteResult]] = [None] * len(keys)
+        for goal, positions in groups.items():
+            tree = self.runway_trees.get(goal) if not self.closed_edges else None
+            # a single route is cheaper to search than a whole tree, and hierarchy queries beat both
+            if tree is None and len(positions) > 1 and self.hierarchy is None:
+                tree = self._shortest_path_tree(goal)
+            for position in positions:
+                routes[position] = self.compute_route(keys[position], tree)
+        return routes
+
+    def compute_route(self, key: RouteKey, tree: Optional[np.ndarray] = None) -> Optional[RouteResult]:
+        """Route between snapped endpoints, bypassing the cache; None when there is none."""
+        path, edges = self._find_path(*key, tree)
+        if not path:
+            return None
+
+        labels = self._extract_labels(edges)
+        instruction = f"TAXI VIA {' '.join(labels)}"
+        return RouteResult(instruction, self._build_location_infos(edges), tuple(edges))
+
+    def alternative_routes(self, pilot: "Pilot", count: int, execute: Executor = _call) -> List[RouteResult]:
+        """
+        Up to `count` loopless routes for the pilot, shortest first (Yen's algorithm).
+
+        The first one is the regular, cached route; `execute` runs the search
+        for the others, as in `plan_route`.
+        """
+        if count <= 0:
+            return []
+
+        first = self.plan_route(pilot, execute)
+        if first is None:
+            return []
+        if count == 1 or not first.edges:
+            return [first]
+
+        return [first] + self._execute_stable(execute, self.compute_alternatives, self.route_key(pilot)[0], first, count)
+
+    def compute_alternatives(self, start: int, first: RouteResult, count: int) -> List[RouteResult]:
+        """
+        The count - 1 next shortest loopless routes after `first`, which starts at `start`.
+
+        Routes whose instruction repeats an earlier one (a detour through the
+        same taxiways) still feed the spur searches but are not returned.
+        """
+        graph = self.graph
+        weights = self.edge_weights
+        goal = graph.targets_list[first.edges[-1]]
+
+        # exact distances to the goal: a perfect A* heuristic shared by every spur search,
+        # still admissible once spur searches remove nodes and edges
+        _, to_goal = self._dijkstra(goal)
+
+        accepted: List[Tuple[List[int], List[int]]] = [([start] + [graph.targets_list[e] for e in first.edges], list(first.edges))]
+        candidates: List[Tuple[float, List[int], List[int]]] = []
+        seen: Set[Tuple[int, ...]] = {first.edges}
+        routes: List[RouteResult] = []
+        instructions = {first.instruction}
+
+        while len(routes) < count - 1 and len(accepted) < count * YEN_ROUNDS_PER_ROUTE:
+            path, edges = accepted[-1]
+            root_cost = 0.0
+            for i, spur in enumerate(path[:-1]):
+                root_edges = edges[:i]
+                # the next edge of every accepted route sharing this root is off limits
+                blocked_edges = {e[i] for p, e in accepted if len(e) > i and e[:i] == root_edges}
+                blocked_nodes = set(path[:i])
+
+                spur_path = self._spur_search(spur, goal, to_goal, blocked_nodes, blocked_edges)
+                if spur_path is not None:
+                    spur_edges, spur_cost = spur_path
+                    total_edges = root_edges + spur_edges
+                    if tuple(total_edges) not in seen:
+                        seen.add(tuple(total_edges))
+                        total_nodes = path[:i + 1] + [graph.targets_list[e] for e in spur_edges]
+                        heappush(candidates, (root_cost + spur_cost, total_nodes, total_edges))
+
+                root_cost += weights[edges[i]]
+
+            if not candidates:
+                break
+            _, path, edges = heappop(candidates)
+            accepted.append((path, edges))
+
+            instruction = f"TAXI VIA {' '.join(self._extract_labels(edges))}"
+            if instruction not in instructions:
+                instructions.add(instruction)
+                routes.append(RouteResult(instruction, self._build_location_infos(edges), tuple(edges)))
+
+        return routes
+
+    def _spur_search(
+        self,
+        start: int,
+        goal: int,
+        to_goal: Dict[int, float],
+        blocked_nodes: Set[int],
+        blocked_edges: Set[int],
+    ) -> Optional[Tuple[List[int], float]]:
+        """A* guided by exact goal distances, avoiding the given nodes and half-edges."""
+        graph = self.graph
+        offsets, targets, weights = graph.offsets_list, graph.targets_list, self.edge_weights
+
+        queue = [(to_goal.get(start, inf), 0.0, start)]
+        came_from: Dict[int, int] = {}
+        best_cost: Dict[int, float] = {start: 0.0}
+        visited: Set[int] = set()
+
         while queue:
-            current = queue.pop(0)
-            if current in connected:
+            _, cost, current = heappop(queue)
+            if current in visited:
                 continue
-            connected.add(current)
-            for neighbor, _, _ in self.graph.get(current, []):
-                if neighbor not in connected:
-                    queue.append(neighbor)
-        
-        if goal not in connected:
-            goal = min(connected, key=lambda n: self._distance(n, goal))
-        
-        from heapq import heappush, heappop
-        queue = [(0.0, start, [])]
-        visited = set()
-        
+            visited.add(current)
+
+            if current == goal:
+                return self._rebuild_path(came_from, goal)[1], cost
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[edge]
+                new_cost = cost + weights[edge]
+                if (neighbor in visited or neighbor in blocked_nodes or edge in blocked_edges
+                        or neighbor not in to_goal or new_cost >= best_cost.get(neighbor, inf)):
+                    continue
+
+                best_cost[neighbor] = new_cost
+                came_from[neighbor] = edge
+                heappush(queue, (new_cost + to_goal[neighbor], new_cost, neighbor))
+
+        return None
+
+    def _find_path(
+        self, start: int, goal: int, tree: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], List[int]]:
+        """`tree`: a shortest-path tree rooted at the effective goal, walked instead of searching."""
+        # runway trees and the hierarchy are built on the open network: closures fall back to A*
+        precomputed_usable = not self.closed_edges
+
+        if tree is None and self.routing_mode == "precomputed" and precomputed_usable:
+            tree = self.runway_trees.get(self._effective_goal(start, goal))
+
+        if tree is not None:
+            walked = self._walk_tree(tree, start, goal)
+            if walked is not None:
+                return walked
+
+        if self.hierarchy is not None and precomputed_usable:
+            path, edges = self._query_hierarchy(start, goal)
+            if path:
+                return path, edges
+
+        path, edges, _ = self._search(start, goal)
+        return path, edges
+
+    def edges_named(self, name: str) -> List[int]:
+        """Every half-edge labelled `name` (a taxiway, runway or parking name)."""
+        graph = self.graph
+        if name not in graph.labels:
+            return []
+        label = graph.labels.index(name)
+        return np.flatnonzero(graph.edge_labels == label).tolist()
+
+    def close_edges(self, edges: Iterable[int]) -> Set[int]:
+        """
+        Close half-edges (with their twins) to every route; returns the newly closed ones.
+
+        Closing only makes routes longer, so cached routes avoiding the closed
+        edges stay optimal: only the ones crossing them are evicted.
+        """
+        closed = self._with_twins(edges) - self.closed_edges
+        if not closed:
+            return closed
+
+        for edge in closed:
+            self.edge_weights[edge] = inf
+        self.closed_edges |= closed
+        self._closures_changed()
+
+        evicted = self.route_cache.discard_where(lambda _, route: not closed.isdisjoint(route.edges))
+        print(f"[ClearanceEngine] {len(closed)} half-edges closed, {evicted} cached routes evicted")
+        return closed
+
+    def reopen_edges(self, edges: Iterable[int]) -> Set[int]:
+        """Reopen closed half-edges (with their twins); returns the ones actually reopened."""
+        reopened = self._with_twins(edges) & self.closed_edges
+        if not reopened:
+            return reopened
+
+        weights = self.graph.weights_list
+        for edge in reopened:
+            self.edge_weights[edge] = weights[edge]
+        self.closed_edges -= reopened
+        self._closures_changed()
+
+        # any cached route may now have a shorter alternative
+        self.route_cache.clear()
+        print(f"[ClearanceEngine] {len(reopened)} half-edges reopened, route cache cleared")
+        return reopened
+
+    def _with_twins(self, edges: Iterable[int]) -> Set[int]:
+        graph = self.graph
+        result: Set[int] = set()
+        for edge in edges:
+            edge = int(edge)
+            if not 0 <= edge < graph.edge_count:
+                raise ValueError(f"Unknown edge: {edge}")
+            result.add(edge)
+            result.add(graph.twins_list[edge])
+        return result
+
+    def _closures_changed(self) -> None:
+        self.closure_version += 1
+        self.component_of, self.component_index = self._build_components()
+
+    def _effective_goal(self, start: int, goal: int) -> int:
+        # unreachable goal: aim for the closest node of the start's component instead
+        component = self.component_of[start]
+        if self.component_of[goal] != component:
+            return self.component_index[component].nearest(self.graph.coord(goal))
+        return goal
+
+    def _search(self, start: int, goal: int) -> Tuple[List[int], List[int], int]:
+        """A* over the taxi graph; returns the node path, the edge path and the number of expanded nodes."""
+        graph = self.graph
+        if not (0 <= start < graph.node_count and 0 <= goal < graph.node_count):
+            return [], [], 0
+
+        if self._is_close(start, goal):
+            return [start], [], 0
+
+        goal = self._effective_goal(start, goal)
+
+        xs, ys = graph.xs, graph.ys
+        offsets, targets, weights = graph.offsets_list, graph.targets_list, self.edge_weights
+        gx, gy = xs[goal], ys[goal]
+
+        # edge weights are straight-line distances, so this heuristic never overestimates
+        queue = [(sqrt((xs[start] - gx) ** 2 + (ys[start] - gy) ** 2), 0.0, start)]
+        came_from: Dict[int, int] = {}  # node -> half-edge it was reached through
+        best_cost: Dict[int, float] = {start: 0.0}
+        visited: Set[int] = set()
+
         while queue:
-            cost, current, path = heappop(queue)
-            
+            _, cost, current = heappop(queue)
+
             if current in visited:
                 continue
-            
+
             visited.add(current)
-            new_path = path + [current]
-            
-            if self._is_close(current, goal):
-                return new_path
-            
-            for neighbor, dist, _ in self.graph.get(current, []):
-                if neighbor not in visited:
-                    heappush(queue, (cost + dist, neighbor, new_path))
-        
-        return []
 
+            if abs(xs[current] - gx) < CLOSE_TOLERANCE and abs(ys[current] - gy) < CLOSE_TOLERANCE:
+                path, edges = self._rebuild_path(came_from, current)
+                return path, edges, len(visited)
+
+            for edge in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[edge]
+                new_cost = cost + weights[edge]
+                if neighbor in visited or new_cost >= best_cost.get(neighbor, inf):
+                    continue
+
+                best_cost[neighbor] = new_cost
+                came_from[neighbor] = edge
+                h = sqrt((xs[neighbor] - gx) ** 2 + (ys[neighbor] - gy) ** 2)
+                heappush(queue, (new_cost + h, new_cost, neighbor))
+
+        return [], [], len(visited)
+
+    def _rebuild_path(self, came_from: Dict[int, int], end: int) -> Tuple[List[int], List[int]]:
+        sources = self.graph.sources_list
+        path = [end]
+        edges: List[int] = []
+        edge = came_from.get(end)
+        while edge is not None:
+            edges.append(edge)
+            path.append(sources[edge])
+            edge = came_from.get(sources[edge])
+        path.reverse()
+        edges.reverse()
+        return path, edges
+
+    def _closest_node(self, point: LonLat) -> int:
+        return self.node_index.nearest(point)
 
-    def _closest_node(self, point: LonLat, graph: Optional[Graph] = None) -> LonLat:
-        if graph is None:
-            graph = self.graph  # fallback
-        return min(graph.keys(), key=lambda n: self._distance(n, point))
+    def _closest_nodes(self, points: List[LonLat]) -> List[int]:
+        """Brute-force `_closest_node` for many points; argmin keeps the lowest id on ties, like the index."""
+        graph = self.graph
+        if graph.node_count == 0:
+            raise ValueError("Cannot snap points on an empty taxi graph")
 
+        xs, ys = graph.coords[:, 0], graph.coords[:, 1]
+        queries = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nearest = np.empty(len(queries), dtype=np.int64)
+        for lo in range(0, len(queries), SNAP_CHUNK_SIZE):
+            block = queries[lo:lo + SNAP_CHUNK_SIZE]
+            dist = np.sqrt((xs - block[:, 0:1]) ** 2 + (ys - block[:, 1:2]) ** 2)
+            nearest[lo:lo + len(block)] = dist.argmin(axis=1)
+        return nearest.tolist()
 
     def _distance(self, a: LonLat, b: LonLat) -> float:
         return sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
 
-    def _is_close(self, a: LonLat, b: LonLat, tol: float = 1e-5) -> bool:
-        return abs(a[0] - b[0]) < tol and abs(a[1] - b[1]) < tol
+    def _is_close(self, a: int, b: int, tol: float = CLOSE_TOLERANCE) -> bool:
+        xs, ys = self.graph.xs, self.graph.ys
+        return abs(xs[a] - xs[b]) < tol and abs(ys[a] - ys[b]) < tol
 
-    def _extract_labels(self, path: List[LonLat]) -> List[str]:
+    def _extract_labels(self, edges: List[int]) -> List[str]:
         seen = set()
         labels = []
-        for a, b in zip(path, path[1:]):
-            label = self.label_map.get((a, b))
+        for edge in edges:
+            label = self.graph.label_of(edge)
             if label and label not in seen:
                 labels.append(label)
                 seen.add(label)
         return labels
 
-    def _build_location_infos(self, path: List[LonLat]) -> List[LocationInfo]:
+    def _build_location_infos(self, edges: List[int]) -> List[LocationInfo]:
+        graph = self.graph
         locations: List[LocationInfo] = []
-        for a, b in zip(path, path[1:]):
-            label = self.label_map.get((a, b), "")
-            is_runway = any(label == rwy["name"] for rwy in self.airport_map["runways"])
-            kind = "runway" if is_runway else "taxiway"
+        for edge in edges:
+            kind = "runway" if graph.is_runway_edge(edge) else "taxiway"
             locations.append({
-                "name": label,
+                "name": graph.label_of(edge),
                 "type": kind,
-                "coord": b,
+                "coord": graph.coord(graph.targets_list[edge]),
             })
-        return locations
\ No newline at end of file
+        return locations
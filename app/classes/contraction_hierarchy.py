@@ -0,0 +1,198 @@
+from heapq import heapify, heappop, heappush
+from math import inf
+from typing import Dict, List, Optional, Tuple
+
+from app.classes.taxi_graph import TaxiGraph
+
+# nodes settled by one witness search before giving up; a missed witness only costs an extra shortcut
+WITNESS_SETTLE_LIMIT = 64
+
+Arc = Tuple[int, int]  # (other node, arc id)
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over a TaxiGraph.
+
+    Nodes are contracted least important first (edge difference plus already
+    contracted neighbours). Contracting v adds a shortcut u -> w for every pair
+    of its neighbours unless a bounded witness search finds a path avoiding v
+    that is at most as long. Queries run a Dijkstra upward from both ends and
+    meet at the highest node of the shortest path.
+
+    Arcs 0..edge_count-1 are the graph's half-edges; every later arc is a
+    shortcut made of two child arcs, unpacked back into half-edges on query.
+    """
+
+    def __init__(self, graph: TaxiGraph):
+        self.graph = graph
+        self.arc_weights: List[float] = list(graph.weights_list)
+        self.arc_children: List[Optional[Tuple[int, int]]] = [None] * graph.edge_count
+        self.rank: List[int] = [-1] * graph.node_count
+
+        # upward arcs only: up_out[v] leave v, up_in[v] enter v, both toward higher ranks
+        self.up_out: List[List[Arc]] = [[] for _ in range(graph.node_count)]
+        self.up_in: List[List[Arc]] = [[] for _ in range(graph.node_count)]
+
+        self._contract_all()
+
+    @property
+    def shortcut_count(self) -> int:
+        return len(self.arc_weights) - self.graph.edge_count
+
+    def _contract_all(self) -> None:
+        graph = self.graph
+
+        # remaining graph: node -> {neighbour: arc id}; taxi segments are undirected
+        adj: List[Dict[int, int]] = [{} for _ in range(graph.node_count)]
+        for edge, source in enumerate(graph.sources_list):
+            adj[source][graph.targets_list[edge]] = edge
+
+        contracted_neighbors = [0] * graph.node_count
+        queue = [(self._priority(node, adj, contracted_neighbors), node) for node in range(graph.node_count)]
+        heapify(queue)
+
+        order = 0
+        while queue:
+            _, node = heappop(queue)
+            if self.rank[node] != -1:
+                continue
+
+            # lazy update: the priority may have grown since it was queued
+            priority = self._priority(node, adj, contracted_neighbors)
+            if queue and priority > queue[0][0]:
+                heappush(queue, (priority, node))
+                continue
+
+            for u, w, cost in self._shortcuts(node, adj):
+                self._add_shortcut(adj, u, node, w, cost)
+
+            for neighbor, arc in adj[node].items():
+                self.up_out[node].append((neighbor, arc))
+                self.up_in[node].append((neighbor, adj[neighbor][node]))
+                del adj[neighbor][node]
+                contracted_neighbors[neighbor] += 1
+            adj[node] = {}
+
+            self.rank[node] = order
+            order += 1
+
+    def _priority(self, node: int, adj: List[Dict[int, int]], contracted_neighbors: List[int]) -> int:
+        return len(self._shortcuts(node, adj)) - len(adj[node]) + contracted_neighbors[node]
+
+    def _shortcuts(self, node: int, adj: List[Dict[int, int]]) -> List[Tuple[int, int, float]]:
+        """Neighbour pairs (u, w, cost) whose shortest connection goes through `node`."""
+        weights = self.arc_weights
+        neighbors = list(adj[node].items())
+        needed = []
+
+        for i, (u, _) in enumerate(neighbors):
+            into = weights[adj[u][node]]
+            costs = {w: into + weights[arc] for w, arc in neighbors[i + 1:]}
+            if not costs:
+                continue
+
+            # weights are symmetric: one search from u covers both directions of every pair
+            reached = self._witness_search(adj, u, node, max(costs.values()))
+            needed.extend((u, w, cost) for w, cost in costs.items() if reached.get(w, inf) > cost)
+
+        return needed
+
+    def _witness_search(self, adj: List[Dict[int, int]], source: int, skip: int, max_cost: float) -> Dict[int, float]:
+        weights = self.arc_weights
+        best: Dict[int, float] = {source: 0.0}
+        queue = [(0.0, source)]
+        settled = 0
+
+        while queue and settled < WITNESS_SETTLE_LIMIT:
+            cost, current = heappop(queue)
+            if cost > best[current]:
+                continue
+            if cost > max_cost:
+                break
+            settled += 1
+
+            for neighbor, arc in adj[current].items():
+                new_cost = cost + weights[arc]
+                if neighbor != skip and new_cost < best.get(neighbor, inf):
+                    best[neighbor] = new_cost
+                    heappush(queue, (new_cost, neighbor))
+
+        # unsettled entries are still lengths of real paths, so they are valid witnesses too
+        return best
+
+    def _add_shortcut(self, adj: List[Dict[int, int]], u: int, via: int, w: int, cost: float) -> None:
+        for a, b in ((u, w), (w, u)):
+            adj[a][b] = len(self.arc_weights)
+            self.arc_weights.append(cost)
+            self.arc_children.append((adj[a][via], adj[via][b]))
+
+    def query(self, start: int, goal: int) -> Tuple[List[int], List[int]]:
+        """Node path and half-edge path from start to goal; empty when goal is unreachable."""
+        if start == goal:
+            return [start], []
+
+        forward_cost, forward_arc = self._upward_search(start, self.up_out)
+        backward_cost, backward_arc = self._upward_search(goal, self.up_in)
+
+        best: Optional[Tuple[float, int]] = None
+        for node, cost in forward_cost.items():
+            other = backward_cost.get(node)
+            if other is not None and (best is None or (cost + other, node) < best):
+                best = (cost + other, node)
+        if best is None:
+            return [], []
+
+        meeting = best[1]
+        arcs: List[int] = []
+        node = meeting
+        while node != start:
+            node, arc = forward_arc[node]
+            arcs.append(arc)
+        arcs.reverse()
+
+        node = meeting
+        while node != goal:
+            node, arc = backward_arc[node]
+            arcs.append(arc)
+
+        edges = self._unpack(arcs)
+        targets = self.graph.targets_list
+        return [start] + [targets[edge] for edge in edges], edges
+
+    def _upward_search(
+        self, source: int, arcs: List[List[Arc]]
+    ) -> Tuple[Dict[int, float], Dict[int, Arc]]:
+        """Dijkstra over upward arcs; reached[n] = (previous node toward source, arc linking them)."""
+        weights = self.arc_weights
+        best: Dict[int, float] = {source: 0.0}
+        reached: Dict[int, Arc] = {}
+        queue = [(0.0, source)]
+
+        while queue:
+            cost, current = heappop(queue)
+            if cost > best[current]:
+                continue
+
+            for neighbor, arc in arcs[current]:
+                new_cost = cost + weights[arc]
+                if new_cost < best.get(neighbor, inf):
+                    best[neighbor] = new_cost
+                    reached[neighbor] = (current, arc)
+                    heappush(queue, (new_cost, neighbor))
+
+        return best, reached
+
+    def _unpack(self, arcs: List[int]) -> List[int]:
+        children = self.arc_children
+        edges: List[int] = []
+        stack = list(reversed(arcs))
+        while stack:
+            arc = stack.pop()
+            pair = children[arc]
+            if pair is None:
+                edges.append(arc)
+            else:
+                stack.append(pair[1])
+                stack.append(pair[0])
+        return edges
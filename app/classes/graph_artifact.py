@@ -0,0 +1,97 @@
+"""
+Binary artifact of a compiled TaxiGraph, stored next to the airport JSON cache.
+
+Layout: MAGIC, a little-endian uint32 format version, a uint32 header length,
+a JSON header (source digest, label table, array descriptors), then the raw
+arrays, each aligned on ARRAY_ALIGNMENT bytes so they can be memory-mapped
+in place.
+"""
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.classes.taxi_graph import TaxiGraph
+
+MAGIC = b"CPDLCTG\0"
+# bump whenever TaxiGraph compilation or this layout changes: older artifacts are then rebuilt
+GRAPH_ARTIFACT_VERSION = 2
+ARRAY_ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+_ARRAY_FIELDS = (
+    "coords",
+    "offsets",
+    "targets",
+    "weights",
+    "edge_labels",
+    "runway_labels",
+    "twins",
+)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def write_graph_artifact(path: Path, graph: TaxiGraph, source_digest: str) -> None:
+    arrays = {name: np.ascontiguousarray(getattr(graph, name)) for name in _ARRAY_FIELDS}
+
+    descriptors: Dict[str, dict] = {}
+    offset = 0
+    for name, array in arrays.items():
+        descriptors[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({
+        "source_digest": source_digest,
+        "labels": graph.labels,
+        "arrays": descriptors,
+    }).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, GRAPH_ARTIFACT_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + descriptors[name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_graph_artifact(path: Path, source_digest: str) -> Optional[TaxiGraph]:
+    """Memory-map the artifact; None when it is missing, corrupt, from another version or for another source."""
+    if not path.is_file():
+        return None
+
+    try:
+        with path.open("rb") as f:
+            magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC or version != GRAPH_ARTIFACT_VERSION:
+                return None
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if header.get("source_digest") != source_digest:
+            return None
+
+        data_start = _aligned(_PREAMBLE.size + header_len)
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+        arrays = {}
+        for name in _ARRAY_FIELDS:
+            descriptor = header["arrays"][name]
+            dtype = np.dtype(descriptor["dtype"])
+            shape = tuple(descriptor["shape"])
+            start = data_start + descriptor["offset"]
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            arrays[name] = raw[start:start + nbytes].view(dtype).reshape(shape)
+
+        return TaxiGraph(labels=list(header["labels"]), **arrays)
+
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        print(f"[GraphArtifact] Ignoring unreadable artifact {path.name}: {e}")
+        return None
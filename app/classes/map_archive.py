@@ -0,0 +1,233 @@
+"""
+Columnar archive of an airport map (<ICAO>.map), the binary form of the JSON cache.
+
+Layout follows the graph artifact: MAGIC, a little-endian uint32 format
+version, a uint32 header length, a JSON header (airport info, array
+descriptors, the apt.dat source the map was built from), then the raw
+arrays, each aligned on ARRAY_ALIGNMENT bytes. Every section is a set of
+typed arrays (coordinates as (n, 2) float64, flags as bool, names as
+fixed-width unicode; taxiway names go through a table since most segments
+share one). The file is read in one go and arrays are views on it, so a
+section costs nothing until it is accessed, and its AirportMapData dicts are
+only built when a consumer asks for that section.
+"""
+import json
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+MAGIC = b"CPDLCMA\0"
+# bump whenever the archive layout changes: older archives are then ignored and rewritten
+MAP_ARCHIVE_VERSION = 1
+ARRAY_ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct("<8sII")
+
+SECTIONS = ("airport_info", "runways", "helipads", "taxiways", "parking")
+_COLUMNS = {
+    "runways": ("name", "start", "end", "width", "surface"),
+    "helipads": ("name", "location", "heading", "length", "width"),
+    "taxiways": ("name_index", "names", "start", "end", "width", "is_runway", "one_way"),
+    "parking": ("name", "location", "heading", "type"),
+}
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def _strings(values: List[str]) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.zeros(0, dtype="<U1")
+
+
+def _points(values: List[Any]) -> np.ndarray:
+    return np.array(values, dtype=np.float64).reshape(-1, 2)
+
+
+def write_map_archive(path: Path, data: Mapping, source: Optional[Mapping] = None) -> None:
+    runways, helipads, taxiways, parking = (data[section] for section in SECTIONS[1:])
+    names, name_index = np.unique(_strings([t["name"] for t in taxiways]), return_inverse=True)
+
+    arrays = {
+        "runways/name": _strings([r["name"] for r in runways]),
+        "runways/start": _points([r["start"] for r in runways]),
+        "runways/end": _points([r["end"] for r in runways]),
+        "runways/width": np.array([r["width"] for r in runways], dtype=np.float64),
+        "runways/surface": np.array([r["surface"] for r in runways], dtype=np.int64),
+
+        "helipads/name": _strings([h["name"] for h in helipads]),
+        "helipads/location": _points([h["location"] for h in helipads]),
+        "helipads/heading": np.array([h["heading"] for h in helipads], dtype=np.float64),
+        "helipads/length": np.array([h["length"] for h in helipads], dtype=np.float64),
+        "helipads/width": np.array([h["width"] for h in helipads], dtype=np.float64),
+
+        "taxiways/name_index": name_index.astype(np.int32).reshape(-1),
+        "taxiways/names": names,
+        "taxiways/start": _points([t["start"] for t in taxiways]),
+        "taxiways/end": _points([t["end"] for t in taxiways]),
+        "taxiways/width": _strings([t["width"] for t in taxiways]),
+        "taxiways/is_runway": np.array([t["is_runway"] for t in taxiways], dtype=bool),
+        "taxiways/one_way": np.array([t["one_way"] for t in taxiways], dtype=bool),
+
+        "parking/name": _strings([p["name"] for p in parking]),
+        "parking/location": _points([p["location"] for p in parking]),
+        "parking/heading": np.array([p["heading"] for p in parking], dtype=np.float64),
+        "parking/type": _strings([p["type"] for p in parking]),
+    }
+
+    descriptors: Dict[str, dict] = {}
+    offset = 0
+    for name, array in arrays.items():
+        descriptors[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({
+        "airport_info": data["airport_info"],
+        "arrays": descriptors,
+        "source": dict(source) if source is not None else None,
+    }).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, MAP_ARCHIVE_VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + descriptors[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_map_source(path: Path) -> Optional[dict]:
+    """The apt.dat source recorded in the archive header, without reading the arrays; None when unknown."""
+    try:
+        with path.open("rb") as f:
+            magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC or version != MAP_ARCHIVE_VERSION:
+                return None
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        return header.get("source")
+    except (OSError, ValueError, AttributeError, struct.error):
+        return None
+
+
+def read_map_archive(path: Path) -> Optional["LazyAirportMap"]:
+    """Read the archive; None when it is missing, corrupt or from another version."""
+    if not path.is_file():
+        return None
+
+    try:
+        raw = path.read_bytes()
+        magic, version, header_len = _PREAMBLE.unpack_from(raw)
+        if magic != MAGIC or version != MAP_ARCHIVE_VERSION:
+            return None
+        header = json.loads(raw[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+
+        data_start = _aligned(_PREAMBLE.size + header_len)
+        arrays = {}
+        for name, descriptor in header["arrays"].items():
+            dtype = np.dtype(descriptor["dtype"])
+            shape = tuple(descriptor["shape"])
+            count = int(np.prod(shape, dtype=np.int64))
+            arrays[name] = np.frombuffer(raw, dtype, count, data_start + descriptor["offset"]).reshape(shape)
+
+        return LazyAirportMap(arrays, header["airport_info"])
+
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        print(f"[MapArchive] Ignoring unreadable archive {path.name}: {e}")
+        return None
+
+
+def _runways(c: Dict[str, np.ndarray]) -> List[dict]:
+    return [
+        {"name": name, "start": start, "end": end, "width": width, "surface": surface}
+        for name, start, end, width, surface in zip(
+            c["name"].tolist(), c["start"].tolist(), c["end"].tolist(), c["width"].tolist(), c["surface"].tolist()
+        )
+    ]
+
+
+def _helipads(c: Dict[str, np.ndarray]) -> List[dict]:
+    return [
+        {"name": name, "location": location, "heading": heading, "length": length, "width": width}
+        for name, location, heading, length, width in zip(
+            c["name"].tolist(), c["location"].tolist(), c["heading"].tolist(), c["length"].tolist(), c["width"].tolist()
+        )
+    ]
+
+
+def _taxiways(c: Dict[str, np.ndarray]) -> List[dict]:
+    names = c["names"].tolist()
+    return [
+        {"name": names[name], "start": start, "end": end, "is_runway": is_runway, "one_way": one_way, "width": width}
+        for name, start, end, width, is_runway, one_way in zip(
+            c["name_index"].tolist(), c["start"].tolist(), c["end"].tolist(), c["width"].tolist(),
+            c["is_runway"].tolist(), c["one_way"].tolist()
+        )
+    ]
+
+
+def _parking(c: Dict[str, np.ndarray]) -> List[dict]:
+    return [
+        {"location": location, "heading": heading, "type": kind, "name": name}
+        for location, heading, kind, name in zip(
+            c["location"].tolist(), c["heading"].tolist(), c["type"].tolist(), c["name"].tolist()
+        )
+    ]
+
+
+_BUILDERS: Dict[str, Callable[[Dict[str, np.ndarray]], List[dict]]] = {
+    "runways": _runways,
+    "helipads": _helipads,
+    "taxiways": _taxiways,
+    "parking": _parking,
+}
+
+
+class LazyAirportMap(Mapping):
+    """
+    Read-only AirportMapData backed by a map archive. A section's dicts are
+    built on first access and kept; `columns` gives the typed arrays instead.
+    Pass `dict(map)` wherever a real dict is needed, e.g. to serialize it.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], airport_info: dict):
+        self._arrays = arrays
+        self._sections: Dict[str, Any] = {"airport_info": airport_info}
+
+    def __getitem__(self, section: str) -> Any:
+        built = self._sections.get(section)
+        if built is None:
+            built = self._sections[section] = self.build_section(section)
+        return built
+
+    def build_section(self, section: str) -> Any:
+        """The section's dicts without keeping them, unless they are already built."""
+        built = self._sections.get(section)
+        if built is None:
+            if section not in _BUILDERS:
+                raise KeyError(section)
+            built = _BUILDERS[section](self.columns(section))
+        return built
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SECTIONS)
+
+    def __len__(self) -> int:
+        return len(SECTIONS)
+
+    def columns(self, section: str) -> Dict[str, np.ndarray]:
+        return {name: self._arrays[f"{section}/{name}"] for name in _COLUMNS[section]}
+
+    def rows(self, section: str) -> int:
+        """Row count of the section, read from its columns without building it."""
+        return len(self._arrays[f"{section}/{_COLUMNS[section][0]}"])  # the first column has one entry per row
+
+    @property
+    def loaded_sections(self) -> List[str]:
+        return list(self._sections)
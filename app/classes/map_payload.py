@@ -0,0 +1,65 @@
+"""
+Airport map as served over HTTP: serialized and compressed once per map version.
+
+The JSON body is encoded a single time when the airport is loaded and kept
+only in compressed form (gzip, plus brotli when the module is installed), so
+a map request costs a header check and a buffer write instead of a JSON
+encode. The version is a digest of the JSON body: it changes exactly when the
+map does, and doubles as the HTTP ETag.
+"""
+import gzip
+import hashlib
+import json
+from collections.abc import Container, Mapping
+from typing import Dict, Optional
+
+from app.classes.map_archive import LazyAirportMap
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+def _map_body(map_data: Mapping) -> bytes:
+    if isinstance(map_data, LazyAirportMap):
+        # sections nobody read yet are built for the encode only, not kept
+        sections = {section: map_data.build_section(section) for section in map_data}
+    else:
+        sections = dict(map_data)
+    return json.dumps(sections, separators=(",", ":")).encode("utf-8")
+
+
+class MapPayload:
+    def __init__(self, icao: str, map_data: Mapping):
+        body = _map_body(map_data)
+        self.icao = icao.upper()
+        self.version = hashlib.sha1(body).hexdigest()[:16]
+        self.raw_bytes = len(body)
+        self.encodings: Dict[str, bytes] = {"gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(data) for data in self.encodings.values())
+
+    def etag(self, encoding: Optional[str]) -> str:
+        # one strong ETag per representation, as the bytes differ
+        return f"{self.version}-{encoding}" if encoding else self.version
+
+    def negotiate(self, accepted: Container[str]) -> Optional[str]:
+        """Smallest stored encoding the client accepts; None for an uncompressed body."""
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and encoding in accepted:
+                return encoding
+        return None
+
+    def body(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            # clients without gzip support are rare enough to pay the decompression
+            return gzip.decompress(self.encodings["gzip"])
+        return self.encodings[encoding]
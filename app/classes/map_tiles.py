@@ -0,0 +1,326 @@
+"""
+Quadtree tiles of an airport map (<ICAO>.tiles), cut when the map is cached.
+
+The pyramid covers a square of `span` degrees from `origin`, the airport's
+south-west corner (degrees on both axes, like the ATC client's projection).
+Level z splits it into 2^z x 2^z tiles; tile (z, x, y) has x counted along
+the second coordinate (lon) and y along the first (lat). A tile holds every
+feature whose bounding box overlaps it, in the AirportMapData layout minus
+airport_info, so a feature crossing tiles is repeated in each of them.
+
+Below the deepest level, geometry is simplified for a tile drawn about
+MAP_TILE_RESOLUTION pixels wide: taxiway segments are chained through the
+nodes where one taxiway simply continues, each chain goes through
+Douglas-Peucker with a one-pixel tolerance, chains shorter than a pixel are
+dropped, coordinates are rounded to the pixel, and parking stands only show
+from MAP_TILE_PARKING_MIN_ZOOM. The deepest level is exact.
+
+Layout follows the graph artifact: MAGIC, a little-endian uint32 format
+version, a uint32 header length, a JSON header (source digest, bounds, tile
+directory), then every tile as gzip-compressed JSON, served as is.
+"""
+import gzip
+import hashlib
+import json
+import math
+import os
+import struct
+from collections import defaultdict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.utils.constants import MAP_TILE_MAX_ZOOM, MAP_TILE_PARKING_MIN_ZOOM, MAP_TILE_RESOLUTION
+
+MAGIC = b"CPDLCMT\0"
+# bump whenever the cutting rules or this layout change: older tile files are then recut
+MAP_TILES_VERSION = 1
+GZIP_LEVEL = 6
+
+_PREAMBLE = struct.Struct("<8sII")
+
+TileKey = Tuple[int, int, int]
+Point = Tuple[float, float]
+
+
+class MapTiles:
+    def __init__(
+        self,
+        bounds: List[List[float]],
+        span: float,
+        max_zoom: int,
+        resolution: int,
+        airport_info: dict,
+        blobs: Dict[TileKey, bytes],
+        version: str,
+    ):
+        self.bounds = bounds  # [south_west, north_east], in the map's (lat, lon) order
+        self.span = span
+        self.max_zoom = max_zoom
+        self.resolution = resolution
+        self.airport_info = airport_info
+        self.version = version
+        self._blobs = blobs
+        self._empty = gzip.compress(b"{}", GZIP_LEVEL, mtime=0)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(blob) for blob in self._blobs.values())
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def index(self) -> dict:
+        return {
+            "version": self.version,
+            "bounds": self.bounds,
+            "span": self.span,
+            "max_zoom": self.max_zoom,
+            "resolution": self.resolution,
+            "airport_info": self.airport_info,
+        }
+
+    def tile(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Gzip JSON of the tile; an empty object for an empty tile, None outside the pyramid."""
+        if not 0 <= z <= self.max_zoom or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return None
+        return self._blobs.get((z, x, y), self._empty)
+
+    def keys(self) -> Iterator[TileKey]:
+        return iter(self._blobs)
+
+
+# === Cutting
+def _bounds(map_data: Mapping) -> List[List[float]]:
+    points: List[Sequence[float]] = []
+    for runway in map_data["runways"]:
+        points += (runway["start"], runway["end"])
+    for taxiway in map_data["taxiways"]:
+        points += (taxiway["start"], taxiway["end"])
+    points += [helipad["location"] for helipad in map_data["helipads"]]
+    points += [parking["location"] for parking in map_data["parking"]]
+    if not points:
+        return [[0.0, 0.0], [0.0, 0.0]]
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+    return [[min(lats), min(lons)], [max(lats), max(lons)]]
+
+
+def _taxiway_chains(taxiways: Sequence[dict]) -> List[Tuple[dict, List[Point]]]:
+    """Taxiway segments merged into polylines through the nodes where exactly two segments of one taxiway meet."""
+    at_node: Dict[Point, List[int]] = defaultdict(list)
+    ends = [(tuple(t["start"]), tuple(t["end"])) for t in taxiways]
+    for i, (start, end) in enumerate(ends):
+        at_node[start].append(i)
+        at_node[end].append(i)
+
+    def same_kind(a: dict, b: dict) -> bool:
+        return all(a[key] == b[key] for key in ("name", "width", "is_runway", "one_way"))
+
+    def follow(i: int, node: Point, forward: bool, visited: set) -> Iterator[Point]:
+        # walks away from segment i through `node` while the taxiway simply continues
+        while len(at_node[node]) == 2:
+            j = at_node[node][0] if at_node[node][1] == i else at_node[node][1]
+            if j in visited or not same_kind(taxiways[i], taxiways[j]):
+                return
+            start, end = ends[j]
+            if (start == node) == forward:
+                node = end if forward else start
+            elif taxiways[j]["one_way"]:
+                return  # would reverse a one-way taxiway
+            else:
+                node = start if forward else end
+            visited.add(j)
+            i = j
+            yield node
+
+    chains = []
+    visited: set = set()
+    for i, taxiway in enumerate(taxiways):
+        if i in visited:
+            continue
+        visited.add(i)
+        start, end = ends[i]
+        before = list(follow(i, start, False, visited))
+        after = list(follow(i, end, True, visited))
+        chains.append((taxiway, before[::-1] + [start, end] + after))
+    return chains
+
+
+def _douglas_peucker(points: List[Point], tolerance: float) -> List[int]:
+    """Indices of the vertices kept; `points` are in pixels of the level."""
+    keep = {0, len(points) - 1}
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = points[first], points[last]
+        dx, dy = bx - ax, by - ay
+        length = math.hypot(dx, dy)
+        farthest, distance = -1, tolerance
+        for k in range(first + 1, last):
+            px, py = points[k]
+            d = abs(dx * (ay - py) - dy * (ax - px)) / length if length else math.hypot(px - ax, py - ay)
+            if d > distance:
+                farthest, distance = k, d
+        if farthest >= 0:
+            keep.add(farthest)
+            stack += [(first, farthest), (farthest, last)]
+    return sorted(keep)
+
+
+def _span(bounds: List[List[float]]) -> float:
+    (south, west), (north, east) = bounds
+    # a single point still gets a usable grid
+    return max(north - south, east - west, 1e-6)
+
+
+class _Level:
+    """Pixel grid of one zoom level: each tile is `resolution` pixels wide."""
+
+    def __init__(self, bounds: List[List[float]], span: float, z: int, resolution: int):
+        self.south, self.west = bounds[0]
+        self.z = z
+        self.tiles = 2 ** z
+        self.px_per_degree = self.tiles * resolution / span
+        self.resolution = resolution
+        self.decimals = max(0, math.ceil(math.log10(self.px_per_degree)))
+
+    def pixel(self, point: Sequence[float]) -> Point:
+        return (point[1] - self.west) * self.px_per_degree, (point[0] - self.south) * self.px_per_degree
+
+    def rounded(self, point: Sequence[float]) -> List[float]:
+        return [round(point[0], self.decimals), round(point[1], self.decimals)]
+
+    def tiles_of(self, *points: Sequence[float]) -> Iterator[TileKey]:
+        pixels = [self.pixel(point) for point in points]
+        last = self.tiles - 1
+        x0 = min(max(int(min(p[0] for p in pixels) // self.resolution), 0), last)
+        x1 = min(max(int(max(p[0] for p in pixels) // self.resolution), 0), last)
+        y0 = min(max(int(min(p[1] for p in pixels) // self.resolution), 0), last)
+        y1 = min(max(int(max(p[1] for p in pixels) // self.resolution), 0), last)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield self.z, x, y
+
+
+def _level_taxiways(level: _Level, chains: List[Tuple[dict, List[Point]]]) -> List[dict]:
+    segments = []
+    for taxiway, points in chains:
+        pixels = [level.pixel(point) for point in points]
+        ax, ay = pixels[0]
+        if all(math.hypot(px - ax, py - ay) < 1.0 for px, py in pixels):
+            continue  # fits in a pixel
+        kept = _douglas_peucker(pixels, 1.0)
+        for first, last in zip(kept, kept[1:]):
+            segments.append({
+                "name": taxiway["name"],
+                "start": level.rounded(points[first]),
+                "end": level.rounded(points[last]),
+                "is_runway": taxiway["is_runway"],
+                "one_way": taxiway["one_way"],
+                "width": taxiway["width"],
+            })
+    return segments
+
+
+def cut_map_tiles(
+    map_data: Mapping,
+    max_zoom: int = MAP_TILE_MAX_ZOOM,
+    resolution: int = MAP_TILE_RESOLUTION,
+) -> MapTiles:
+    bounds = _bounds(map_data)
+    span = _span(bounds)
+    runways, helipads, taxiways, parking = (map_data[section] for section in ("runways", "helipads", "taxiways", "parking"))
+    chains = _taxiway_chains(taxiways)
+
+    blobs: Dict[TileKey, bytes] = {}
+    for z in range(max_zoom + 1):
+        level = _Level(bounds, span, z, resolution)
+        tiles: Dict[TileKey, Dict[str, List[dict]]] = defaultdict(
+            lambda: {"runways": [], "helipads": [], "taxiways": [], "parking": []}
+        )
+
+        level_taxiways = taxiways if z == max_zoom else _level_taxiways(level, chains)
+        for taxiway in level_taxiways:
+            for key in level.tiles_of(taxiway["start"], taxiway["end"]):
+                tiles[key]["taxiways"].append(taxiway)
+        for runway in runways:
+            for key in level.tiles_of(runway["start"], runway["end"]):
+                tiles[key]["runways"].append(runway)
+        for helipad in helipads:
+            for key in level.tiles_of(helipad["location"]):
+                tiles[key]["helipads"].append(helipad)
+        if z >= MAP_TILE_PARKING_MIN_ZOOM:
+            for stand in parking:
+                for key in level.tiles_of(stand["location"]):
+                    tiles[key]["parking"].append(stand)
+
+        for (_, x, y), sections in tiles.items():
+            body = json.dumps({"tile": [z, x, y], **sections}, separators=(",", ":")).encode("utf-8")
+            blobs[(z, x, y)] = gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+    digest = hashlib.sha1()
+    for key in sorted(blobs):
+        digest.update(blobs[key])
+    return MapTiles(bounds, span, max_zoom, resolution, dict(map_data["airport_info"]), blobs, digest.hexdigest()[:16])
+
+
+# === Storage
+def write_map_tiles(path: Path, tiles: MapTiles, source_digest: str) -> None:
+    directory: Dict[str, List[int]] = {}
+    offset = 0
+    keys = sorted(tiles.keys())
+    for z, x, y in keys:
+        size = len(tiles.tile(z, x, y))
+        directory[f"{z}/{x}/{y}"] = [offset, size]
+        offset += size
+
+    header = json.dumps({
+        "source_digest": source_digest,
+        "index": tiles.index(),
+        "tiles": directory,
+    }).encode("utf-8")
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, MAP_TILES_VERSION, len(header)))
+        f.write(header)
+        for z, x, y in keys:
+            f.write(tiles.tile(z, x, y))
+    os.replace(tmp_path, path)
+
+
+def read_map_tiles(path: Path, source_digest: str) -> Optional[MapTiles]:
+    """None when the file is missing, corrupt, from another version or for another source."""
+    if not path.is_file():
+        return None
+
+    try:
+        raw = path.read_bytes()
+        magic, version, header_len = _PREAMBLE.unpack_from(raw)
+        if magic != MAGIC or version != MAP_TILES_VERSION:
+            return None
+        header = json.loads(raw[_PREAMBLE.size:_PREAMBLE.size + header_len].decode("utf-8"))
+        if header.get("source_digest") != source_digest:
+            return None
+
+        data_start = _PREAMBLE.size + header_len
+        blobs: Dict[TileKey, bytes] = {}
+        for key, (offset, size) in header["tiles"].items():
+            z, x, y = (int(part) for part in key.split("/"))
+            blobs[(z, x, y)] = raw[data_start + offset:data_start + offset + size]
+
+        index = header["index"]
+        return MapTiles(
+            index["bounds"],
+            index["span"],
+            index["max_zoom"],
+            index["resolution"],
+            index["airport_info"],
+            blobs,
+            index["version"],
+        )
+
+    except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+        print(f"[MapTiles] Ignoring unreadable tile file {path.name}: {e}")
+        return None
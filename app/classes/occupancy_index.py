@@ -0,0 +1,108 @@
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from app.classes.taxi_graph import TaxiGraph
+
+ConflictPair = Tuple[str, str]  # two pilot sids, sorted
+ConflictListener = Callable[[List[ConflictPair], List[ConflictPair]], None]  # (added, removed)
+
+
+class OccupancyIndex:
+    """
+    Which pilots' active routes use each taxi segment and node.
+
+    Segments are undirected (a half-edge and its twin share one id), so traffic
+    in opposite directions conflicts too. Two pilots conflict when their routes
+    share a segment or a node (a crossing). Listeners receive the conflict
+    pairs added and removed by every update.
+    """
+
+    def __init__(self):
+        self.graph: Optional[TaxiGraph] = None
+        self._segments: Dict[int, Set[str]] = {}
+        self._nodes: Dict[int, Set[str]] = {}
+        self._routes: Dict[str, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+        self._listeners: List[ConflictListener] = []
+
+    def on_change(self, listener: ConflictListener) -> None:
+        self._listeners.append(listener)
+
+    def bind(self, graph: TaxiGraph) -> None:
+        """Index routes of `graph` from now on; routes indexed against a previous graph are dropped."""
+        removed = sorted({pair for sid in self._routes for pair in self._pairs(sid, self.conflicts_of(sid))})
+        self.graph = graph
+        self._segments.clear()
+        self._nodes.clear()
+        self._routes.clear()
+        self._notify([], removed)
+
+    def update(self, sid: str, edges: Sequence[int]) -> None:
+        """Replace the route indexed for `sid` (empty edges: the pilot holds no route)."""
+        if self.graph is None:
+            return
+
+        before = self.conflicts_of(sid)
+        self._unindex(sid)
+        if edges:
+            self._index(sid, edges)
+        after = self.conflicts_of(sid)
+
+        added = self._pairs(sid, after.keys() - before.keys())
+        removed = self._pairs(sid, before.keys() - after.keys())
+        self._notify(added, removed)
+
+    def remove(self, sid: str) -> None:
+        self.update(sid, ())
+
+    def conflicts_of(self, sid: str) -> Dict[str, Tuple[int, int]]:
+        """Other pilots sharing the route of `sid`: sid -> (shared segments, shared nodes)."""
+        route = self._routes.get(sid)
+        if route is None:
+            return {}
+
+        segments, nodes = route
+        counts: Dict[str, List[int]] = {}
+        for segment in segments:
+            for other in self._segments[segment]:
+                if other != sid:
+                    counts.setdefault(other, [0, 0])[0] += 1
+        for node in nodes:
+            for other in self._nodes[node]:
+                if other != sid:
+                    counts.setdefault(other, [0, 0])[1] += 1
+
+        return {other: (shared[0], shared[1]) for other, shared in counts.items()}
+
+    def _index(self, sid: str, edges: Sequence[int]) -> None:
+        assert self.graph is not None
+        twins, sources, targets = self.graph.twins_list, self.graph.sources_list, self.graph.targets_list
+
+        segments = frozenset(min(edge, twins[edge]) for edge in edges)
+        nodes = frozenset([sources[edges[0]]] + [targets[edge] for edge in edges])
+        self._routes[sid] = (segments, nodes)
+
+        for segment in segments:
+            self._segments.setdefault(segment, set()).add(sid)
+        for node in nodes:
+            self._nodes.setdefault(node, set()).add(sid)
+
+    def _unindex(self, sid: str) -> None:
+        route = self._routes.pop(sid, None)
+        if route is None:
+            return
+
+        segments, nodes = route
+        for table, keys in ((self._segments, segments), (self._nodes, nodes)):
+            for key in keys:
+                holders = table[key]
+                holders.discard(sid)
+                if not holders:
+                    del table[key]
+
+    def _pairs(self, sid: str, others) -> List[ConflictPair]:
+        return sorted((min(sid, other), max(sid, other)) for other in others)
+
+    def _notify(self, added: List[ConflictPair], removed: List[ConflictPair]) -> None:
+        if not added and not removed:
+            return
+        for listener in self._listeners:
+            listener(added, removed)
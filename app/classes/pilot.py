@@ -1,6 +1,7 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Sequence, Tuple
 import uuid
 
+from app.classes.occupancy_index import OccupancyIndex
 from app.classes.step import Step
 from app.managers.log_manager import logger
 from app.utils.color import set_pilot_color
@@ -27,8 +28,18 @@ DEFAULT_PLANE: Plane = {
 }
 
 class Pilot:
-    def __init__(self, sid: str, plane: Plane = DEFAULT_PLANE):
+    def __init__(
+        self,
+        sid: str,
+        plane: Plane = DEFAULT_PLANE,
+        occupancy: Optional[OccupancyIndex] = None,
+        facility: str = "",
+        atc_room: str = ATC_ROOM,
+    ):
         self.sid = sid
+        self.occupancy = occupancy
+        self.facility = facility
+        self.atc_room = atc_room
         self.steps: Dict[str, Step] = {}
         self.color : str = set_pilot_color(sid)
         self.history: list[UpdateStepData] = []
@@ -36,8 +47,8 @@ class Pilot:
         
         self.plane: Plane = plane
         
-        self.init_clearances()
         self.current_clearance : ClearanceType = "expected"
+        self.init_clearances()
         self.initialize_steps()
 
     def initialize_steps(self):
@@ -48,6 +59,7 @@ class Pilot:
             self.steps[code] = Step(step_code=code, label=label, request_id=request_id)
             
     def init_clearances(self) -> Dict[ClearanceType, Clearance]:
+        self.route_edges: Dict[ClearanceType, Tuple[int, ...]] = {}  # graph half-edges behind each clearance
         self.clearances = {
             "expected": {
                 "kind": "expected",
@@ -68,14 +80,29 @@ class Pilot:
                 "issued_at": "",
             }
         }
+        self._sync_occupancy()
         return self.clearances
         
-    def set_clearance(self, clearance: Clearance):
+    def set_clearance(self, clearance: Clearance, route_edges: Sequence[int] = ()):
         if clearance["kind"] not in self.clearances:
             raise ValueError(f"Unknown clearance type: {clearance['kind']}")
         
         self.clearances[clearance["kind"]] = clearance
+        self.route_edges[clearance["kind"]] = tuple(route_edges)
         self.current_clearance = clearance["kind"]
+        self._sync_occupancy()
+
+    def rebind_routes(self, route_edges: Dict[ClearanceType, Tuple[int, ...]]) -> None:
+        """Route edges re-expressed on a rebuilt taxi graph; the clearances themselves are kept."""
+        self.route_edges = dict(route_edges)
+        self._sync_occupancy()
+
+    def active_route_edges(self) -> Tuple[int, ...]:
+        return self.route_edges.get(self.current_clearance, ())
+
+    def _sync_occupancy(self) -> None:
+        if self.occupancy is not None:
+            self.occupancy.update(self.sid, self.active_route_edges())
 
     def get_step(self, step_code: str) -> Optional[Step]:
         return self.steps.get(step_code)
@@ -194,6 +221,8 @@ class Pilot:
         )
 
         self.clearances[kind] = empty_clearance
+        self.route_edges.pop(kind, None)
+        self._sync_occupancy()
         return empty_clearance
     
     ## edge case where pilot requests expected taxi clearance then taxi clearance,
@@ -397,7 +426,7 @@ class Pilot:
             "timeLeft": update.time_left,
         }, room=self.sid)
         
-        socket.send(NEW_REQUEST_SEND, update.to_atc_payload(), room=ATC_ROOM)
+        socket.send(NEW_REQUEST_SEND, update.to_atc_payload(), room=self.atc_room)
 
         # gss_client.send_update_step(update.to_dict()) #keeping track of gss
         logger.log_event(self.sid, "TIMEOUT", f"{step_code} expired.")
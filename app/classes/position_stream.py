@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+class PositionStream:
+    """
+    Turns simulator state into compact position frames for ATC clients.
+
+    Coordinates go out as integers (degrees * scale) and headings as whole
+    degrees. A frame only lists the aircraft whose quantized position moved
+    by at least `min_move` units or whose heading turned by at least
+    `min_turn` degrees since they were last sent, plus the sids that left the
+    stream. Every client shares the same baseline, so a client joining late
+    starts from `keyframe()`.
+    """
+
+    def __init__(self, scale: int, min_move: int, min_turn: int):
+        self.scale = scale
+        self.min_move = min_move
+        self.min_turn = min_turn
+        self.seq = 0
+
+        # last values sent, aligned on _sids
+        self._sids: List[str] = []
+        self._coords = np.zeros((0, 2), dtype=np.int64)
+        self._headings = np.zeros(0, dtype=np.int64)
+
+    def frame(self, sids: Sequence[str], positions: np.ndarray, headings: np.ndarray) -> Dict[str, Any]:
+        """Frame for the current state; an empty frame (no `sids`, no `removed`) keeps `seq` unchanged."""
+        coords = np.rint(positions * self.scale).astype(np.int64).reshape(-1, 2)
+        turns = np.rint(headings).astype(np.int64) % 360
+
+        if list(sids) == self._sids:
+            removed: List[str] = []
+            sent_coords, sent_headings = self._coords, self._headings
+            known = np.ones(len(sids), dtype=bool)
+        else:
+            # membership changed: realign the sent state on the new slot order
+            previous = {sid: i for i, sid in enumerate(self._sids)}
+            index = np.array([previous.get(sid, -1) for sid in sids], dtype=np.int64)
+            current = set(sids)
+            removed = [sid for sid in self._sids if sid not in current]
+            known = index >= 0
+            safe = np.where(known, index, 0)
+            sent_coords = self._coords[safe] if len(self._sids) else np.zeros_like(coords)
+            sent_headings = self._headings[safe] if len(self._sids) else np.zeros_like(turns)
+
+        turned = np.abs((turns - sent_headings + 180) % 360 - 180)
+        changed = ~known | (np.abs(coords - sent_coords).max(axis=1, initial=0) >= self.min_move) | (turned >= self.min_turn)
+
+        # unchanged aircraft keep their last sent values, so slow drift still crosses the threshold
+        self._sids = list(sids)
+        self._coords = np.where(changed[:, None], coords, sent_coords)
+        self._headings = np.where(changed, turns, sent_headings)
+
+        picked = np.flatnonzero(changed)
+        if len(picked) or removed:
+            self.seq += 1
+        return {
+            "seq": self.seq,
+            "sids": [self._sids[slot] for slot in picked.tolist()],
+            "coords": coords[picked].ravel().tolist(),
+            "headings": turns[picked].tolist(),
+            "removed": removed,
+        }
+
+    def keyframe(self) -> Dict[str, Any]:
+        """Every aircraft at its last sent state."""
+        return {
+            "seq": self.seq,
+            "keyframe": True,
+            "scale": self.scale,
+            "sids": list(self._sids),
+            "coords": self._coords.ravel().tolist(),
+            "headings": self._headings.tolist(),
+            "removed": [],
+        }
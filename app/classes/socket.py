@@ -1,4 +1,4 @@
-from flask_socketio import SocketIO, join_room, leave_room
+from flask_socketio import SocketIO
 from typing import Optional, Any
 
 class SocketService:
@@ -14,12 +14,37 @@ class SocketService:
         if self.metrics:
             self.metrics.record_emit(event, room)
 
+    def start_background_task(self, target, *args):
+        return self.socketio.start_background_task(target, *args)
+
+    def sleep(self, seconds: float):
+        return self.socketio.sleep(seconds)
+
+    @property
+    def async_mode(self) -> str:
+        return self.socketio.async_mode
+
+    def outbound_queue_depth(self, room: str) -> int:
+        """Packets waiting to be written on the most backed-up socket of `room` (0 when unknown)."""
+        server = self.socketio.server
+        if server is None:
+            return 0
+
+        depth = 0
+        for _, eio_sid in server.manager.get_participants("/", room):
+            queue = getattr(server.eio.sockets.get(eio_sid), "queue", None)
+            if queue is not None:
+                depth = max(depth, queue.qsize())
+        return depth
+
+    # through the server rather than flask_socketio's helpers, which need a request context:
+    # sessions may be bound from a background task once their airport has loaded
     def enter_room(self, sid, room):
-        join_room(room, sid=sid)
+        self.socketio.server.enter_room(sid, room, namespace="/")
 
     def leave_room(self, sid, room):
-        leave_room(room, sid=sid)
+        self.socketio.server.leave_room(sid, room, namespace="/")
 
     # security helper
     def disconnect(self, sid: str):
-        self.socketio.disconnect(sid)
\ No newline at end of file
+        self.socketio.server.disconnect(sid, namespace="/")
\ No newline at end of file
@@ -0,0 +1,98 @@
+from math import floor, sqrt
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.types import LonLat
+
+Cell = Tuple[int, int]
+
+# average number of points per grid cell targeted when the cell size is derived
+TARGET_POINTS_PER_CELL = 4
+
+
+class SpatialIndex:
+    """
+    Uniform grid over LonLat points, used for nearest-node lookups.
+
+    Every point carries an integer key (its insertion rank unless given) and
+    `nearest()` returns that key. Results match a brute-force `min()` over the
+    points: on equal distances the smallest key wins.
+    """
+
+    def __init__(
+        self,
+        points: Iterable[LonLat] = (),
+        keys: Optional[Iterable[int]] = None,
+        cell_size: Optional[float] = None,
+    ):
+        initial = list(points)
+        self.cell_size: float = cell_size or self._derive_cell_size(initial)
+        self._buckets: Dict[Cell, List[Tuple[int, LonLat]]] = {}
+        self._count = 0
+        self._min_cell: Optional[Cell] = None
+        self._max_cell: Optional[Cell] = None
+
+        for point, key in zip(initial, keys if keys is not None else range(len(initial))):
+            self.insert(point, key)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _derive_cell_size(self, points: List[LonLat]) -> float:
+        if len(points) < 2:
+            return 1e-3
+
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        area = max(max(xs) - min(xs), 1e-9) * max(max(ys) - min(ys), 1e-9)
+        return max(sqrt(area * TARGET_POINTS_PER_CELL / len(points)), 1e-6)
+
+    def _cell_of(self, point: LonLat) -> Cell:
+        return (floor(point[0] / self.cell_size), floor(point[1] / self.cell_size))
+
+    def insert(self, point: LonLat, key: Optional[int] = None) -> None:
+        cell = self._cell_of(point)
+        self._buckets.setdefault(cell, []).append((self._count if key is None else key, point))
+        self._count += 1
+
+        if self._min_cell is None or self._max_cell is None:
+            self._min_cell = self._max_cell = cell
+        else:
+            self._min_cell = (min(self._min_cell[0], cell[0]), min(self._min_cell[1], cell[1]))
+            self._max_cell = (max(self._max_cell[0], cell[0]), max(self._max_cell[1], cell[1]))
+
+    def nearest(self, point: LonLat) -> int:
+        if self._min_cell is None or self._max_cell is None:
+            raise ValueError("nearest() called on an empty SpatialIndex")
+
+        cx, cy = self._cell_of(point)
+        max_ring = max(
+            abs(cx - self._min_cell[0]), abs(cx - self._max_cell[0]),
+            abs(cy - self._min_cell[1]), abs(cy - self._max_cell[1]),
+        )
+
+        best: Optional[Tuple[float, int]] = None
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx, cy, ring):
+                for key, candidate in self._buckets.get(cell, ()):
+                    dist = sqrt((candidate[0] - point[0]) ** 2 + (candidate[1] - point[1]) ** 2)
+                    if best is None or (dist, key) < best:
+                        best = (dist, key)
+
+            # every cell beyond this ring is at least `ring` cells away from the query
+            if best is not None and best[0] < ring * self.cell_size:
+                break
+
+        assert best is not None
+        return best[1]
+
+    def _ring_cells(self, cx: int, cy: int, ring: int) -> Iterable[Cell]:
+        if ring == 0:
+            yield (cx, cy)
+            return
+
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
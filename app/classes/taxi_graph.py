@@ -0,0 +1,189 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.classes.spatial_index import SpatialIndex
+from app.utils.types import AirportMapData, LonLat
+
+
+def to_lonlat(coord: object) -> LonLat:
+    if (isinstance(coord, (list, tuple)) and len(coord) == 2 and
+        isinstance(coord[0], (int, float)) and isinstance(coord[1], (int, float))):
+        return (float(coord[0]), float(coord[1]))
+    raise ValueError(f"Invalid coord format: {coord}")
+
+
+class TaxiGraph:
+    """
+    Compiled, integer-indexed taxi network.
+
+    Nodes are ints into `coords`. Edges are stored in CSR form: the half-edges
+    leaving node `n` are `offsets[n]:offsets[n + 1]`, each with a target node, a
+    weight and an id into the interned `labels` table. Every undirected segment
+    is stored as two half-edges, and `twins[e]` is the opposite half of `e`.
+    """
+
+    def __init__(
+        self,
+        coords: np.ndarray,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        weights: np.ndarray,
+        edge_labels: np.ndarray,
+        labels: List[str],
+        runway_labels: np.ndarray,
+        twins: np.ndarray,
+    ):
+        self.coords = coords
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_labels = edge_labels
+        self.labels = labels
+        self.runway_labels = runway_labels
+        self.twins = twins
+
+        # python-side copies for the search loops: scalar access on lists beats numpy indexing
+        self.xs: List[float] = coords[:, 0].tolist()
+        self.ys: List[float] = coords[:, 1].tolist()
+        self.offsets_list: List[int] = offsets.tolist()
+        self.targets_list: List[int] = targets.tolist()
+        self.weights_list: List[float] = weights.tolist()
+        self.sources_list: List[int] = np.repeat(
+            np.arange(self.node_count, dtype=np.int32), np.diff(offsets)
+        ).tolist()
+        self.twins_list: List[int] = twins.tolist()
+
+    @property
+    def node_count(self) -> int:
+        return int(self.coords.shape[0])
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.targets.shape[0])
+
+    def coord(self, node: int) -> LonLat:
+        return (self.xs[node], self.ys[node])
+
+    def endpoints(self, edge: int) -> Tuple[LonLat, LonLat]:
+        return self.coord(self.sources_list[edge]), self.coord(self.targets_list[edge])
+
+    def edges_by_endpoints(self) -> Dict[Tuple[LonLat, LonLat], int]:
+        """Half-edges keyed by their (source, target) coordinates, to find them again in a rebuilt graph."""
+        return {self.endpoints(edge): edge for edge in range(self.edge_count)}
+
+    def neighbors(self, node: int) -> range:
+        return range(self.offsets_list[node], self.offsets_list[node + 1])
+
+    def label_of(self, edge: int) -> str:
+        return self.labels[self.edge_labels[edge]]
+
+    def is_runway_edge(self, edge: int) -> bool:
+        return bool(self.runway_labels[self.edge_labels[edge]])
+
+    def build_node_index(self) -> SpatialIndex:
+        return SpatialIndex(self.coord(node) for node in range(self.node_count))
+
+    @classmethod
+    def from_airport_map(cls, airport_map: AirportMapData) -> "TaxiGraph":
+        """Compile the map's taxiways, runways and parkings into a TaxiGraph."""
+        builder = _TaxiGraphBuilder()
+
+        for twy in airport_map["taxiways"]:
+            try:
+                builder.add_edge(to_lonlat(twy["start"]), to_lonlat(twy["end"]), str(twy.get("name", "TAXIWAY")))
+            except Exception as e:
+                print(f"[Taxiway skipped] {e}")
+
+        for rwy in airport_map["runways"]:
+            try:
+                builder.add_edge(to_lonlat(rwy["start"]), to_lonlat(rwy["end"]), str(rwy.get("name", "RUNWAY")))
+            except Exception as e:
+                print(f"[Runway skipped] {e}")
+
+        # index built once the network bounds are known; parkings are inserted as they attach
+        index = SpatialIndex(builder.coords)
+        builder.index = index
+
+        # add parkings to graph : pilots spawn at a parking positions
+        for parking in airport_map.get("parking", []):
+            try:
+                parking_coord = to_lonlat(parking["location"])
+                parking_name = str(parking.get("name", "PARKING"))
+
+                if not builder.coords:
+                    continue
+
+                closest = index.nearest(parking_coord)
+                builder.add_edge(parking_coord, builder.coords[closest], parking_name)
+            except Exception as e:
+                print(f"[Parking skipped] {e}")
+
+        runway_names = {str(rwy["name"]) for rwy in airport_map["runways"] if "name" in rwy}
+        return builder.compile(runway_names)
+
+
+class _TaxiGraphBuilder:
+    def __init__(self):
+        self.coords: List[LonLat] = []
+        self.node_ids: Dict[LonLat, int] = {}
+        self.index: SpatialIndex | None = None
+
+        # directed pair -> [adjacency rank, label]; like the old label map, the last label written wins
+        self.half_edges: Dict[Tuple[int, int], List] = {}
+        self.labels: List[str] = []
+        self.label_ids: Dict[str, int] = {}
+
+    def node(self, coord: LonLat) -> int:
+        node = self.node_ids.get(coord)
+        if node is None:
+            node = len(self.coords)
+            self.node_ids[coord] = node
+            self.coords.append(coord)
+            if self.index is not None:
+                self.index.insert(coord, node)
+        return node
+
+    def label(self, name: str) -> int:
+        label = self.label_ids.get(name)
+        if label is None:
+            label = len(self.labels)
+            self.label_ids[name] = label
+            self.labels.append(name)
+        return label
+
+    def add_edge(self, a: LonLat, b: LonLat, name: str) -> None:
+        a_id, b_id = self.node(a), self.node(b)
+        if a_id == b_id:
+            return  # a parking sitting exactly on a node never shows up inside a path
+
+        label = self.label(name)
+        for pair in ((a_id, b_id), (b_id, a_id)):
+            entry = self.half_edges.get(pair)
+            if entry is None:
+                self.half_edges[pair] = [len(self.half_edges), label]
+            else:
+                entry[1] = label
+
+    def compile(self, runway_names: Iterable[str]) -> TaxiGraph:
+        coords = np.array(self.coords, dtype=np.float64).reshape(-1, 2)
+
+        # insertion order within each source keeps neighbour order identical to the old adjacency lists
+        ordered = sorted(self.half_edges.items(), key=lambda item: (item[0][0], item[1][0]))
+        sources = np.array([pair[0] for pair, _ in ordered], dtype=np.int64)
+        targets = np.array([pair[1] for pair, _ in ordered], dtype=np.int32)
+        edge_labels = np.array([entry[1] for _, entry in ordered], dtype=np.int32)
+
+        offsets = np.zeros(len(self.coords) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.coords)), out=offsets[1:])
+
+        delta = coords[targets] - coords[sources] if len(ordered) else np.zeros((0, 2))
+        weights = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+
+        runway_set = set(runway_names)
+        runway_labels = np.array([name in runway_set for name in self.labels], dtype=bool)
+
+        position = {pair: edge for edge, (pair, _) in enumerate(ordered)}
+        twins = np.array([position[(pair[1], pair[0])] for pair, _ in ordered], dtype=np.int32)
+
+        return TaxiGraph(coords, offsets, targets, weights, edge_labels, self.labels, runway_labels, twins)
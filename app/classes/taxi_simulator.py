@@ -0,0 +1,192 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.types import LonLat
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+class TaxiSimulator:
+    """
+    Moves aircraft along their cleared taxi polylines, all of them per tick.
+
+    Every aircraft owns a slot in the state arrays (position, heading, speed,
+    distance travelled). Route vertices of all aircraft are concatenated into
+    one buffer whose cumulative distances are offset per route, with a gap of
+    one metre between routes, so a single `searchsorted` finds the current
+    segment of every aircraft at once. Map coordinates are (lat, lon) pairs;
+    segment lengths are metres on a local equirectangular projection and
+    headings follow `compute_heading`.
+    """
+
+    def __init__(self, speed_mps: float, acceleration_mps2: float):
+        self.speed_mps = speed_mps
+        self.acceleration_mps2 = acceleration_mps2
+
+        self.sids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._routes: List[np.ndarray] = []  # per slot: (n, 2) lon/lat vertices
+
+        self.positions = np.zeros((0, 2))
+        self.headings = np.zeros(0)
+        self.speeds = np.zeros(0)
+        self.travelled = np.zeros(0)
+        self.segments = np.zeros(0, dtype=np.int64)  # index of the route segment each aircraft is on
+
+        self._pending: List[Tuple[LonLat, float]] = []  # (position, heading) of slots started since the last flush
+        self._dirty = False
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self.sids)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._slots
+
+    def start(self, sid: str, polyline: Sequence[LonLat], heading: float = 0.0) -> None:
+        """(Re)start `sid` at the first vertex of `polyline`, at rest."""
+        route = np.asarray(polyline, dtype=np.float64).reshape(-1, 2)
+        if len(route) < 2:
+            raise ValueError(f"Taxi route of {sid} needs at least two points")
+
+        self.stop(sid)
+        self._slots[sid] = len(self.sids)
+        self.sids.append(sid)
+        self._routes.append(route)
+        self._pending.append(((float(route[0, 0]), float(route[0, 1])), heading))
+        self._dirty = True
+
+    def stop(self, sid: str) -> Optional[Tuple[LonLat, float]]:
+        """Drop `sid`; returns its last (position, heading) when it was simulated."""
+        return self.stop_many([sid]).get(sid)
+
+    def stop_many(self, sids: Iterable[str]) -> Dict[str, Tuple[LonLat, float]]:
+        """Drop every simulated sid of `sids` with one compaction; returns their last (position, heading)."""
+        self._flush_pending()
+        slots = {sid: self._slots[sid] for sid in sids if sid in self._slots}
+        if not slots:
+            return {}
+
+        states = {sid: self.state_of_slot(slot)[:2] for sid, slot in slots.items()}
+        keep = np.ones(len(self.sids), dtype=bool)
+        keep[list(slots.values())] = False
+        self.sids = [sid for sid, kept in zip(self.sids, keep) if kept]
+        self._routes = [route for route, kept in zip(self._routes, keep) if kept]
+        self._slots = {sid: slot for slot, sid in enumerate(self.sids)}
+
+        self.positions = self.positions[keep]
+        self.headings = self.headings[keep]
+        self.speeds = self.speeds[keep]
+        self.travelled = self.travelled[keep]
+        self.segments = self.segments[keep]
+        self._dirty = True  # route geometry is rebuilt once, on the next tick
+        return states
+
+    def clear(self) -> None:
+        self.stop_many(list(self.sids))
+
+    def slot_of(self, sid: str) -> Optional[int]:
+        return self._slots.get(sid)
+
+    def state(self, sid: str) -> Optional[Tuple[LonLat, float, float]]:
+        slot = self._slots.get(sid)
+        return None if slot is None else self.state_of_slot(slot)
+
+    def state_of_slot(self, slot: int) -> Tuple[LonLat, float, float]:
+        self._flush_pending()
+        lon, lat = self.positions[slot]
+        return (float(lon), float(lat)), float(self.headings[slot]), float(self.speeds[slot])
+
+    def arrived(self) -> np.ndarray:
+        self._flush()
+        return self.travelled >= self._totals
+
+    def tick(self, dt: float) -> np.ndarray:
+        """Advance every aircraft by `dt` seconds; returns the slots that moved."""
+        self._flush()
+        if not self.sids:
+            return np.zeros(0, dtype=np.int64)
+
+        remaining = self._totals - self.travelled
+        moving = remaining > 0.0
+
+        # accelerate toward taxi speed, then never overshoot the end of the route
+        speeds = np.minimum(self.speeds + self.acceleration_mps2 * dt, self.speed_mps)
+        step = np.minimum(speeds * dt, remaining)
+        self.travelled = self.travelled + np.where(moving, step, 0.0)
+        self.speeds = np.where(moving & (self.travelled < self._totals), speeds, 0.0)
+
+        # global distance -> segment: last vertex at or before it, kept inside the aircraft's own route
+        target = self._bases + self.travelled
+        segment = np.searchsorted(self._cumulative, target, side="right") - 1
+        segment = np.clip(segment, self._first_vertex, self._last_segment)
+
+        along = (target - self._cumulative[segment]) / self._segment_lengths[segment]
+        along = np.clip(along, 0.0, 1.0)[:, None]
+        start = self._vertices[segment]
+        self.positions = start + along * (self._vertices[segment + 1] - start)
+        turning = moving & self._has_length[segment]
+        self.headings = np.where(turning, self._segment_headings[segment], self.headings)
+        self.segments = segment - self._first_vertex
+
+        return np.flatnonzero(moving)
+
+    def _flush(self) -> None:
+        self._flush_pending()
+        if self._dirty:
+            self._rebuild()
+
+    def _flush_pending(self) -> None:
+        # state rows of started slots; unlike the route geometry, they are needed by stop and state reads
+        if self._pending:
+            positions, headings = zip(*self._pending)
+            self.positions = np.concatenate([self.positions, np.array(positions)])
+            self.headings = np.concatenate([self.headings, headings])
+            self.speeds = np.concatenate([self.speeds, np.zeros(len(headings))])
+            self.travelled = np.concatenate([self.travelled, np.zeros(len(headings))])
+            self.segments = np.concatenate([self.segments, np.zeros(len(headings), dtype=np.int64)])
+            self._pending.clear()
+
+    def _rebuild(self) -> None:
+        self._dirty = False
+        routes = self._routes
+        if not routes:
+            self._vertices = np.zeros((0, 2))
+            self._cumulative = np.zeros(0)
+            self._segment_lengths = np.zeros(0)
+            self._segment_headings = np.zeros(0)
+            self._has_length = np.zeros(0, dtype=bool)
+            self._bases = self._totals = np.zeros(0)
+            self._first_vertex = self._last_segment = np.zeros(0, dtype=np.int64)
+            return
+
+        vertices = np.concatenate(routes)
+        counts = np.array([len(route) for route in routes], dtype=np.int64)
+        first_vertex = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        route_of_vertex = np.repeat(np.arange(len(routes)), counts)
+
+        # segment i runs from vertex i to vertex i + 1; the last vertex of each route gets a dummy one
+        delta = np.diff(vertices, axis=0, append=vertices[-1:])
+        north = np.radians(delta[:, 0]) * EARTH_RADIUS_M
+        east = np.radians(delta[:, 1]) * np.cos(np.radians(vertices[:, 0])) * EARTH_RADIUS_M
+        lengths = np.hypot(north, east)
+        last_vertex = first_vertex + counts - 1
+        lengths[last_vertex] = 0.0
+        headings = (np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) + 360) % 360
+
+        # cumulative distance restarts per route, then routes are laid end to end with a gap
+        running = np.cumsum(lengths) - lengths
+        local = running - running[first_vertex][route_of_vertex]
+        totals = local[last_vertex]
+        bases = np.concatenate(([0.0], np.cumsum(totals + 1.0)[:-1]))
+
+        self._vertices = vertices
+        self._cumulative = local + bases[route_of_vertex]
+        self._segment_lengths = np.where(lengths > 0.0, lengths, 1.0)
+        self._segment_headings = headings
+        self._has_length = lengths > 0.0
+        self._bases = bases
+        self._totals = totals
+        self._first_vertex = first_vertex
+        self._last_segment = last_vertex - 1
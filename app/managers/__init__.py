@@ -3,4 +3,9 @@ from app.managers.pilot_manager import PilotManager
 from app.managers.socket_manager import SocketManager
 from app.managers.timer_manager import TimerManager
 from app.managers.atc_manager import AtcManager
-from app.managers.airport_map_manager import AirportMapManager
\ No newline at end of file
+from app.managers.airport_map_manager import AirportMapManager
+from app.managers.airport_registry import AirportRegistry
+from app.managers.clearance_dispatcher import ClearanceDispatcher
+from app.managers.clearance_prefetcher import ClearancePrefetcher
+from app.managers.simulation_manager import SimulationManager
+from app.managers.cache_revalidator import CacheRevalidator
\ No newline at end of file
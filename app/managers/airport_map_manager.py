@@ -1,14 +1,26 @@
+import re
+from threading import Lock
+from typing import Callable, Iterable, Optional, Tuple
 from app.classes.airport_cache import AirportCache
 from app.classes.apt_parser import APTParser
-from app.utils.simulate_pos import simulate_plane_from_map
-from app.utils.types import AirportMapData, Plane
+from app.classes.map_tiles import MapTiles, cut_map_tiles
+from app.classes.taxi_graph import TaxiGraph
+from app.utils.types import AirportMapData
+
+MapChangeListener = Callable[[str], None]
+
+_ICAO = re.compile(r"[A-Z0-9]{3,7}")  # apt.dat airport idents
 
 class AirportMapManager:
+    """Loads airport maps (cache first, apt.dat otherwise) and tracks the default airport."""
+
     def __init__(self, icao: str):
-        self.icao: str = icao
+        self.icao: str = icao.upper()
         self.cache: AirportCache = AirportCache()
-        self.map_data: AirportMapData = self.get_or_parse_map(icao)
         self.parser: APTParser | None = None
+        # maps are loaded and revalidated from thread-pool threads: one of them builds or re-indexes the parser
+        self._parser_lock = Lock()
+        self._listeners: list[MapChangeListener] = []
 
     def get_or_parse_map(self, icao: str) -> AirportMapData:
         if self.cache.is_cached(icao):
@@ -18,9 +30,12 @@ class AirportMapManager:
         print(f"[AirportMapManager] Parsing {icao} via apt.dat")
 
         try:
-            self.parser = APTParser()
-            parsed = self.parser.parse_airport(icao)
-            self.cache.save(icao, parsed)
+            with self._parser_lock:
+                if self.parser is None:
+                    self.parser = APTParser()
+                parser = self.parser
+            parsed = parser.parse_airport(icao)
+            self.cache.save(icao, parsed, parser.source_of(icao))
             return parsed
 
         except FileNotFoundError:
@@ -35,16 +50,91 @@ class AirportMapManager:
                 f"\n\n######################\nCould not parse airport {icao}: {e}\n######################\n\n"
             )
 
-    # for ingescape!
+    def has_airport(self, icao: str) -> bool:
+        """Whether `icao` is a well-formed ident with a cached map or an apt.dat record, without loading it."""
+        icao = icao.upper()
+        if not _ICAO.fullmatch(icao):
+            return False
+        if self.cache.is_cached(icao):
+            return True
+
+        with self._parser_lock:
+            try:
+                if self.parser is None:
+                    self.parser = APTParser()
+            except FileNotFoundError:
+                return False
+            parser = self.parser
+        return icao in parser.index.airports
+
+    def _current_parser(self) -> Optional[APTParser]:
+        """The parser over the current apt.dat (re-indexed if it changed); None without apt.dat."""
+        with self._parser_lock:
+            try:
+                if self.parser is None:
+                    self.parser = APTParser()
+                else:
+                    self.parser.refresh()
+            except FileNotFoundError:
+                return None
+            return self.parser
+
+    def apt_state(self) -> Optional[Tuple[int, int]]:
+        """(size, mtime) of the apt.dat maps are checked against, after re-indexing it if it changed; None without it."""
+        parser = self._current_parser()
+        return parser.apt_stat if parser is not None else None
+
+    def stale_maps(self, icaos: Iterable[str]) -> list[str]:
+        """
+        Cached maps built from another apt.dat record or parser version than the
+        current ones. Maps apt.dat does not know (or without apt.dat at all) and
+        maps converted from a JSON entry (bundled, or edited by hand) are never stale.
+        """
+        parser = self._current_parser()
+        if parser is None:
+            return []
+        return [
+            icao for icao, source in parser.sources(icaos).items()
+            if not self.cache.from_json(icao) and self.cache.source_of(icao) != source
+        ]
+
+    def rebuild_map(self, icao: str) -> None:
+        """Re-parse `icao` from apt.dat into its cache entry; its graph and tiles follow on the next load."""
+        parser = self._current_parser()
+        if parser is None:
+            raise FileNotFoundError(APTParser.APT_FILE_PATH)
+        self.cache.write(icao, parser.parse_airport(icao), parser.source_of(icao))
+
+    def on_change(self, listener: MapChangeListener) -> None:
+        self._listeners.append(listener)
+
+    # for ingescape! listeners load the new default airport; sessions already bound keep theirs
     def change_airport(self, new_icao: str):
+        new_icao = new_icao.upper()
         if new_icao != self.icao:
             self.icao = new_icao
-            self.map_data = self.get_or_parse_map(new_icao)
+            for listener in self._listeners:
+                listener(self.icao)
+
+    def get_taxi_graph(self, icao: str, map_data: AirportMapData) -> TaxiGraph:
+        graph = self.cache.load_graph(icao)
+        if graph is not None:
+            print(f"[AirportMapManager] Loaded compiled graph for {icao}")
+            return graph
+
+        print(f"[AirportMapManager] Compiling taxi graph for {icao}")
+        graph = TaxiGraph.from_airport_map(map_data)
+        self.cache.save_graph(icao, graph)
+        return graph
+    
 
-    def get_map(self) -> AirportMapData:
-        return self.map_data
+    def get_map_tiles(self, icao: str, map_data: AirportMapData) -> MapTiles:
+        tiles = self.cache.load_tiles(icao)
+        if tiles is not None:
+            return tiles
 
-    def simulate_plane(self) -> Plane:
-        map = self.get_map()
-        return simulate_plane_from_map(map)
-    
\ No newline at end of file
+        # entries cached before tiles existed, or whose map changed since
+        print(f"[AirportMapManager] Cutting map tiles for {icao}")
+        tiles = cut_map_tiles(map_data)
+        self.cache.save_tiles(icao, tiles)
+        return tiles
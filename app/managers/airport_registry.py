@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from app.classes.map_archive import LazyAirportMap
+from app.classes.map_payload import MapPayload
+from app.classes.map_tiles import MapTiles
+from app.classes.occupancy_index import OccupancyIndex
+from app.managers.simulation_manager import SimulationManager
+from app.testing.benchmark.metrics.server import LatencyRecorder
+from app.utils.constants import (
+    AIRPORT_MAP_PATH,
+    AIRPORT_MAX_COLD_LOADS,
+    AIRPORT_MAX_IN_USE,
+    AIRPORT_MEMORY_BUDGET_MB,
+    FACILITY_BYTES_PER_MAP_ROW,
+)
+from app.utils.socket_constants import ATC_ROOM
+from app.utils.time_utils import get_current_timestamp
+from app.utils.types import AirportMapData, ConnectInfo
+
+try:
+    from eventlet import tpool
+except ImportError:
+    tpool = None
+
+if TYPE_CHECKING:
+    from app.classes.clearance import ClearanceEngine
+    from app.classes.socket import SocketService
+    from app.managers.pilot_manager import PilotManager
+
+MAP_SECTIONS = ("runways", "helipads", "taxiways", "parking")
+
+
+def _map_rows(map_data: AirportMapData) -> int:
+    if isinstance(map_data, LazyAirportMap):
+        # counted from the columns: building the sections here would keep their dicts for good
+        return sum(map_data.rows(section) for section in MAP_SECTIONS)
+    return sum(len(map_data[section]) for section in MAP_SECTIONS)
+
+
+class Facility:
+    """One airport served by this process, with everything bound to its taxi graph."""
+
+    def __init__(
+        self,
+        icao: str,
+        map_data: AirportMapData,
+        engine: "ClearanceEngine",
+        tiles: MapTiles,
+        socket_service: "SocketService",
+        pilot_manager: "PilotManager",
+    ):
+        self.icao = icao.upper()
+        self.map_data = map_data
+        self.map_payload = MapPayload(self.icao, map_data)
+        self.map_url = f"{AIRPORT_MAP_PATH}/{self.icao}"
+        self.tiles = tiles
+        self.engine = engine
+        self.atc_room = f"{ATC_ROOM}:{self.icao}"
+        self.occupancy = OccupancyIndex()
+        self.occupancy.bind(engine.graph)
+        self.simulation = SimulationManager(socket_service, pilot_manager, room=self.atc_room)
+        self.connection_info = ConnectInfo(facility=self.icao, connectedSince=get_current_timestamp())
+        self.footprint_bytes = (
+            FACILITY_BYTES_PER_MAP_ROW * _map_rows(map_data)
+            + self.map_payload.nbytes
+            + tiles.nbytes
+        )
+        self.sessions: set[str] = set()  # pilot and ATC sids bound here; a facility in use is never evicted
+
+    def swap_map(self, rebuilt: "Facility") -> "ClearanceEngine":
+        """
+        Take the map, tiles and engine of `rebuilt` (same airport, newer map);
+        sessions, room and simulation stay. Returns the engine replaced, whose
+        edge ids routes and closures still refer to.
+        """
+        old_engine = self.engine
+        self.map_data = rebuilt.map_data
+        self.map_payload = rebuilt.map_payload
+        self.tiles = rebuilt.tiles
+        self.engine = rebuilt.engine
+        self.footprint_bytes = rebuilt.footprint_bytes
+        self.occupancy.bind(self.engine.graph)
+        return old_engine
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "footprint_mb": self.footprint_bytes / (1024 * 1024),
+            "map_version": self.map_payload.version,
+            "route_cache": self.engine.route_cache.stats(),
+            "taxi_simulation": self.simulation.stats(),
+        }
+
+    def reset_stats(self) -> None:
+        self.engine.route_cache.reset_stats()
+        self.simulation.reset_stats()
+
+
+FacilityBuilder = Callable[[str], Facility]
+# (icao, facility, error): exactly one of facility and error is None
+FacilityCallback = Callable[[str, Optional[Facility], Optional[str]], None]
+FacilityListener = Callable[[Facility], None]
+# (facility, engine it had before the swap)
+SwapListener = Callable[[Facility, "ClearanceEngine"], None]
+
+
+class AirportRegistry:
+    """
+    Airports kept in memory by this process, keyed by ICAO.
+
+    Facilities are built by `build` (map, compiled graph and routing engine)
+    and kept in LRU order under a memory budget, estimated from the size of
+    their maps. Facilities with bound sessions and the default one are never
+    evicted, so the budget can be exceeded while they are all in use. A cold
+    airport is built on a background task, in eventlet's thread pool when
+    available, and every caller asking for it meanwhile waits on the same
+    load; airports already loaded keep serving in the meantime. Cold requests
+    are turned away while `max_loading` airports are building, or when that
+    many more airports with sessions would reach `max_in_use`. Everything but
+    `build` runs on the hub.
+    """
+
+    def __init__(
+        self,
+        socket_service: "SocketService",
+        build: FacilityBuilder,
+        budget_mb: float = AIRPORT_MEMORY_BUDGET_MB,
+        max_loading: int = AIRPORT_MAX_COLD_LOADS,
+        max_in_use: int = AIRPORT_MAX_IN_USE,
+    ):
+        self.socket = socket_service
+        self._build = build
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.max_loading = max_loading
+        self.max_in_use = max_in_use
+        self._offload = socket_service.async_mode == "eventlet" and tpool is not None
+
+        self._facilities: "OrderedDict[str, Facility]" = OrderedDict()
+        self._waiting: dict[str, list[FacilityCallback]] = {}
+        self._bindings: dict[str, str] = {}  # sid -> icao
+        self._loaded_listeners: list[FacilityListener] = []
+        self._evicted_listeners: list[FacilityListener] = []
+        self._swapped_listeners: list[SwapListener] = []
+        self.default_icao = ""
+
+        self.loads = 0
+        self.load_failures = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.load_ms = LatencyRecorder()
+
+    def __contains__(self, icao: str) -> bool:
+        return icao.upper() in self._facilities
+
+    @property
+    def facilities(self) -> list[Facility]:
+        return list(self._facilities.values())
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(facility.footprint_bytes for facility in self._facilities.values())
+
+    def on_loaded(self, listener: FacilityListener) -> None:
+        self._loaded_listeners.append(listener)
+
+    def on_evicted(self, listener: FacilityListener) -> None:
+        self._evicted_listeners.append(listener)
+
+    def on_swapped(self, listener: SwapListener) -> None:
+        self._swapped_listeners.append(listener)
+
+    def get(self, icao: str) -> Optional[Facility]:
+        facility = self._facilities.get(icao.upper())
+        if facility is not None:
+            self._facilities.move_to_end(facility.icao)
+        return facility
+
+    def load(self, icao: str) -> Facility:
+        """Blocking load, for boot: the caller waits for the build."""
+        facility = self.get(icao)
+        if facility is None:
+            facility = self._insert(self._timed_build(icao.upper()))
+            self._evict(keep=facility.icao)
+        return facility
+
+    def request(self, icao: str, callback: FacilityCallback) -> None:
+        """Hand the facility to `callback`: now when it is loaded, after a background load otherwise."""
+        icao = icao.upper()
+        facility = self.get(icao)
+        if facility is not None:
+            callback(icao, facility, None)
+            return
+
+        waiting = self._waiting.get(icao)
+        if waiting is not None:
+            waiting.append(callback)
+            return
+
+        # every waiter of a load binds to it: loads in flight count as airports in use
+        in_use = sum(1 for facility in self._facilities.values() if facility.sessions)
+        if len(self._waiting) >= self.max_loading or in_use + len(self._waiting) >= self.max_in_use:
+            self.rejected += 1
+            callback(icao, None, f"too many airports loading or in use to load {icao}")
+            return
+
+        self._waiting[icao] = [callback]
+        print(f"[AirportRegistry] Loading {icao} in the background")
+        self.socket.start_background_task(self._load_in_background, icao)
+
+    def _load_in_background(self, icao: str) -> None:
+        facility: Optional[Facility] = None
+        error: Optional[str] = None
+        try:
+            facility = tpool.execute(self._timed_build, icao) if self._offload else self._timed_build(icao)
+            self._insert(facility)
+        except Exception as e:
+            self.load_failures += 1
+            error = str(e) or type(e).__name__
+            print(f"[AirportRegistry] Could not load {icao}: {error}")
+
+        for callback in self._waiting.pop(icao, []):
+            try:
+                callback(icao, facility, error)
+            except Exception as e:
+                print(f"[AirportRegistry] Callback for {icao} failed: {e}")
+
+        # only once the waiters had a chance to bind their sessions
+        self._evict()
+
+    def _timed_build(self, icao: str) -> Facility:
+        started = perf_counter_ns()
+        facility = self._build(icao)
+        self.load_ms.add_ms((perf_counter_ns() - started) / 1_000_000.0)
+        return facility
+
+    def _insert(self, facility: Facility) -> Facility:
+        self._facilities[facility.icao] = facility
+        self.loads += 1
+        print(
+            f"[AirportRegistry] {facility.icao} loaded (~{facility.footprint_bytes / (1024 * 1024):.1f} MB, "
+            f"{self.resident_bytes / (1024 * 1024):.1f}/{self.budget_bytes / (1024 * 1024):.0f} MB in use)"
+        )
+        for listener in self._loaded_listeners:
+            listener(facility)
+        return facility
+
+    def swap(self, rebuilt: Facility) -> bool:
+        """
+        Move a rebuilt map into the loaded facility of the same airport, in one
+        step on the hub: no session sees a map and an engine from different
+        builds. False when the airport is not loaded (anymore).
+        """
+        facility = self._facilities.get(rebuilt.icao)
+        if facility is None:
+            return False
+
+        old_engine = facility.swap_map(rebuilt)
+        self.swaps += 1
+        print(f"[AirportRegistry] {facility.icao} now on map {facility.map_payload.version}")
+        for listener in self._swapped_listeners:
+            listener(facility, old_engine)
+        self._evict()
+        return True
+
+    def set_default(self, icao: str) -> None:
+        """Facility given to sessions that do not ask for one; it must be loaded."""
+        if icao.upper() not in self._facilities:
+            raise ValueError(f"[AirportRegistry] {icao} is not loaded")
+        self.default_icao = icao.upper()
+        self._evict()
+
+    # === Session binding
+    def bind(self, sid: str, facility: Facility) -> None:
+        self.unbind(sid)
+        self._bindings[sid] = facility.icao
+        facility.sessions.add(sid)
+
+    def unbind(self, sid: str) -> Optional[Facility]:
+        icao = self._bindings.pop(sid, None)
+        facility = self._facilities.get(icao) if icao else None
+        if facility is not None:
+            facility.sessions.discard(sid)
+            if not facility.sessions:
+                self._evict()
+        return facility
+
+    def facility_of(self, sid: str) -> Optional[Facility]:
+        icao = self._bindings.get(sid)
+        return self._facilities.get(icao) if icao else None
+
+    def _evict(self, keep: str = "") -> None:
+        resident = self.resident_bytes
+        # least recently used first
+        for icao in list(self._facilities):
+            if resident <= self.budget_bytes:
+                return
+            facility = self._facilities[icao]
+            if facility.sessions or icao in (self.default_icao, keep):
+                continue
+
+            del self._facilities[icao]
+            resident -= facility.footprint_bytes
+            self.evictions += 1
+            print(f"[AirportRegistry] Evicted {icao}")
+            for listener in self._evicted_listeners:
+                listener(facility)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "default": self.default_icao,
+            "budget_mb": self.budget_bytes / (1024 * 1024),
+            "resident_mb": self.resident_bytes / (1024 * 1024),
+            "loading": sorted(self._waiting),
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "swaps": self.swaps,
+            "load_ms": self.load_ms.snapshot(),
+            "facilities": {icao: facility.stats() for icao, facility in self._facilities.items()},
+        }
+
+    def reset_stats(self) -> None:
+        self.loads = 0
+        self.load_failures = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.load_ms = LatencyRecorder()
+        for facility in self._facilities.values():
+            facility.reset_stats()
@@ -1,24 +1,19 @@
 from typing import TYPE_CHECKING
 
-from app.utils.time_utils import get_current_timestamp
-from app.utils.types import AtcPublicView, ConnectInfo
+from app.utils.types import AtcPublicView
 
 if TYPE_CHECKING:
     from app.classes.atc import Atc
 
 class AtcManager:
-    def __init__(self, selected_icao: str):
+    def __init__(self):
         self._atcs: dict[str, "Atc"] = {}  # sid -> Atc
-        self.connection_info: ConnectInfo = ConnectInfo(
-            facility=selected_icao,
-            connectedSince=get_current_timestamp(),
-        )
 
-    def create(self, sid: str) -> None:
+    def create(self, sid: str, facility: str = "") -> None:
         from app.classes.atc import Atc
         if self.exists(sid):
             raise ValueError(f"ATC with SID {sid} already exists.")
-        self._atcs[sid] = Atc(sid)
+        self._atcs[sid] = Atc(sid, facility)
 
     def get(self, sid: str) -> "Atc":
         if not self.exists(sid):
@@ -34,11 +29,11 @@ class AtcManager:
     def get_all_sids(self) -> list[str]:
         return list(self._atcs.keys())
 
-    def get_all(self) -> list[AtcPublicView]:
-        return [atc.to_public() for atc in self._atcs.values()]
+    def get_all(self, facility: str | None = None) -> list[AtcPublicView]:
+        return [atc.to_public() for atc in self.get_all_atcs(facility)]
 
-    def get_all_atcs(self) -> list["Atc"]:
-        return list(self._atcs.values())
+    def get_all_atcs(self, facility: str | None = None) -> list["Atc"]:
+        return [atc for atc in self._atcs.values() if facility is None or atc.facility == facility]
 
-    def has_any(self) -> bool:
-        return len(self._atcs) > 0
+    def has_any(self, facility: str | None = None) -> bool:
+        return any(facility is None or atc.facility == facility for atc in self._atcs.values())
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.testing.benchmark.metrics.server import LatencyRecorder
+from app.utils.constants import CACHE_REBUILD_BATCH, CACHE_REVALIDATE_INTERVAL_S
+
+try:
+    from eventlet import tpool
+except ImportError:
+    tpool = None
+
+if TYPE_CHECKING:
+    from app.classes.socket import SocketService
+    from app.managers.airport_map_manager import AirportMapManager
+    from app.managers.airport_registry import AirportRegistry, FacilityBuilder
+
+
+class CacheRevalidator:
+    """
+    Checks the airport cache against apt.dat from a background task, every
+    `interval_s`.
+
+    A cached map is stale when the apt.dat record it was built from or the
+    parser version changed since (see AirportMapManager.stale_maps). Airports
+    in use are rebuilt first: the map is re-parsed and the facility rebuilt
+    with `build` off the hub, then swapped into the loaded facility on the hub
+    by the registry, so connected sessions carry on with the new map. Stale
+    airports not in use only get their cache entry rewritten, at most `batch`
+    per pass; their graph and tiles follow the next time they load.
+
+    Checking hashes the apt.dat record of every cached airport, so a pass is
+    skipped when neither apt.dat nor the cache changed since the last pass
+    that left nothing stale behind.
+    """
+
+    def __init__(
+        self,
+        socket_service: "SocketService",
+        airport_map_manager: "AirportMapManager",
+        registry: "AirportRegistry",
+        build: "FacilityBuilder",
+        interval_s: float = CACHE_REVALIDATE_INTERVAL_S,
+        batch: int = CACHE_REBUILD_BATCH,
+    ):
+        self.socket = socket_service
+        self.maps = airport_map_manager
+        self.registry = registry
+        self._build = build
+        self.interval_s = interval_s
+        self.batch = batch
+        self._offload = socket_service.async_mode == "eventlet" and tpool is not None
+        self._running = False
+        self._checked: Optional[tuple] = None  # (apt.dat state, cache writes) of the last complete pass
+
+        self.passes = 0
+        self.skipped = 0
+        self.checked = 0
+        self.stale = 0
+        self.rebuilt = 0
+        self.swapped = 0
+        self.failures = 0
+        self.pass_ms = LatencyRecorder()
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self.socket.start_background_task(self._run)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _run(self) -> None:
+        while self._running:
+            self.socket.sleep(self.interval_s)
+            try:
+                self.revalidate()
+            except Exception as e:
+                print(f"[CacheRevalidator] Pass failed: {e}")
+
+    def _execute(self, fn, *args) -> Any:
+        return tpool.execute(fn, *args) if self._offload else fn(*args)
+
+    def revalidate(self) -> list[str]:
+        """One pass over the cache; returns the airports rebuilt."""
+        started = perf_counter_ns()
+        apt_state = self._execute(self.maps.apt_state)
+        if apt_state is None or (apt_state, self.maps.cache.writes) == self._checked:
+            self.skipped += 1
+            return []
+
+        cached = sorted(self.maps.cache.available_icaos)
+        stale = self._execute(self.maps.stale_maps, cached)
+
+        loaded = [icao for icao in stale if icao in self.registry]
+        idle = [icao for icao in stale if icao not in self.registry][:self.batch]
+        if stale:
+            print(f"[CacheRevalidator] {len(stale)} stale maps, rebuilding {len(loaded)} in use and {len(idle)} idle")
+
+        rebuilt = []
+        failures = self.failures
+        for icao in loaded + idle:
+            try:
+                self._execute(self.maps.rebuild_map, icao)
+                self.rebuilt += 1
+                rebuilt.append(icao)
+                # loaded meanwhile, or still in use: sessions move to the new map
+                if icao in self.registry and self.registry.swap(self._execute(self._build, icao)):
+                    self.swapped += 1
+            except Exception as e:
+                self.failures += 1
+                print(f"[CacheRevalidator] Could not rebuild {icao}: {e}")
+
+        # the next pass can skip only if this one left nothing stale (its own writes included)
+        complete = len(loaded) + len(idle) == len(stale) and self.failures == failures
+        self._checked = (apt_state, self.maps.cache.writes) if complete else None
+
+        self.passes += 1
+        self.checked += len(cached)
+        self.stale += len(stale)
+        self.pass_ms.add_ms((perf_counter_ns() - started) / 1_000_000.0)
+        return rebuilt
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "interval_s": self.interval_s,
+            "passes": self.passes,
+            "skipped": self.skipped,
+            "checked": self.checked,
+            "stale": self.stale,
+            "rebuilt": self.rebuilt,
+            "swapped": self.swapped,
+            "failures": self.failures,
+            "pass_ms": self.pass_ms.snapshot(),
+        }
+
+    def reset_stats(self) -> None:
+        self.passes = 0
+        self.skipped = 0
+        self.checked = 0
+        self.stale = 0
+        self.rebuilt = 0
+        self.swapped = 0
+        self.failures = 0
+        self.pass_ms = LatencyRecorder()
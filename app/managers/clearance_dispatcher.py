@@ -0,0 +1,147 @@
+from collections import deque
+from threading import Lock
+from time import perf_counter_ns
+from typing import Any, Callable, Sequence, Union
+
+from app.testing.benchmark.metrics.server import LatencyRecorder
+
+try:
+    from eventlet import tpool
+except ImportError:
+    tpool = None
+
+# a job receives `execute` and must route its CPU-heavy part through it
+ClearanceJob = Callable[[Callable[..., Any]], None]
+
+
+class _SharedJob:
+    """One job queued under several keys: it runs once it is at the head of all their queues."""
+
+    def __init__(self, keys: Sequence[str], job: ClearanceJob):
+        self.keys = keys
+        self.job = job
+        self.arrived: set[str] = set()
+
+
+class ClearanceDispatcher:
+    """
+    Runs clearance jobs on background tasks instead of inside the socket handlers.
+
+    Jobs are queued per key (a pilot SID) and run one after another, so the
+    clearances of one pilot are delivered in request order while different
+    pilots proceed side by side. A job touching several pilots is queued under
+    all of them (`submit_many`) and waits until it is next in every queue, so it
+    keeps its place in each pilot's order. With `offload`, the work passed to `execute`
+    runs in eventlet's native thread pool and the hub keeps serving other
+    sockets meanwhile. Everything else in a job stays on the hub, so it may
+    emit and touch shared state freely.
+    """
+
+    def __init__(self, start_background_task: Callable[..., Any], offload: bool = True):
+        self._start_background_task = start_background_task
+        self._offload = offload and tpool is not None
+        self._queues: dict[str, deque[Union[ClearanceJob, _SharedJob]]] = {}
+        self._lock = Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.compute_ms = LatencyRecorder()
+
+    def submit(self, key: str, job: ClearanceJob) -> None:
+        with self._lock:
+            self.submitted += 1
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append(job)  # the running drain for this key picks it up
+                self.max_depth = max(self.max_depth, self._depth())
+                return
+
+            self._queues[key] = deque([job])
+            self.max_depth = max(self.max_depth, self._depth())
+
+        self._start_background_task(self._drain, key)
+
+    def submit_many(self, keys: Sequence[str], job: ClearanceJob) -> None:
+        """Queue `job` under every key at once; it runs after the jobs queued before it under any of them."""
+        keys = list(dict.fromkeys(keys))
+        shared = _SharedJob(keys, job)
+        idle = []
+        with self._lock:
+            self.submitted += 1
+            # enqueued under all keys in one step: shared jobs are in the same order in every queue
+            for key in keys:
+                queue = self._queues.get(key)
+                if queue is None:
+                    self._queues[key] = deque([shared])
+                    idle.append(key)
+                else:
+                    queue.append(shared)
+            self.max_depth = max(self.max_depth, self._depth())
+
+        for key in idle:
+            self._start_background_task(self._drain, key)
+
+    def _drain(self, key: str) -> None:
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                job = queue[0]
+                if isinstance(job, _SharedJob):
+                    job.arrived.add(key)
+                    if len(job.arrived) < len(job.keys):
+                        return  # parked: the last key to reach the job runs it and resumes this queue
+
+            run = job.job if isinstance(job, _SharedJob) else job
+            try:
+                run(self._execute)
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                print(f"[ClearanceDispatcher] Job for {key} failed: {e}")
+                with self._lock:
+                    self.failed += 1
+            finally:
+                with self._lock:
+                    queue.popleft()
+                    others = [other for other in job.keys if other != key] if isinstance(job, _SharedJob) else []
+                    for other in others:
+                        self._queues[other].popleft()
+                for other in others:
+                    self._start_background_task(self._drain, other)
+
+    def _execute(self, fn: Callable[..., Any], *args: Any) -> Any:
+        started = perf_counter_ns()
+        try:
+            return tpool.execute(fn, *args) if self._offload else fn(*args)
+        finally:
+            elapsed_ms = (perf_counter_ns() - started) / 1_000_000.0
+            with self._lock:
+                self.compute_ms.add_ms(elapsed_ms)
+
+    def _depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "offloaded": self._offload,
+                "queue_depth": self._depth(),
+                "max_queue_depth": self.max_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "compute_ms": self.compute_ms.snapshot(),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.submitted = 0
+            self.completed = 0
+            self.failed = 0
+            self.max_depth = 0
+            self.compute_ms = LatencyRecorder()
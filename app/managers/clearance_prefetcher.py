@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from app.classes.clearance import ClearanceEngine, RouteKey
+    from app.classes.pilot import Pilot
+    from app.managers.clearance_dispatcher import ClearanceDispatcher
+
+
+class ClearancePrefetcher:
+    """
+    Warms the route cache with a pilot's taxi route as soon as it connects.
+
+    Spawn and final positions are known at creation, so the route of the
+    later DM_136/DM_135 is too. The prefetch is queued on the pilot's own
+    dispatcher queue: a clearance request arriving early simply runs after it
+    and finds the route cached.
+
+    A prefetch is a hit when the first clearance request finds its route still
+    cached, and wasted when the pilot leaves without asking, the route was
+    evicted, or the endpoints or engine changed in between.
+    """
+
+    def __init__(self, dispatcher: "ClearanceDispatcher", is_connected: Callable[["Pilot"], bool]):
+        self.dispatcher = dispatcher
+        self._is_connected = is_connected
+        self._pending: dict[str, tuple["ClearanceEngine", "RouteKey"]] = {}
+        self._lock = Lock()
+
+        self.prefetched = 0
+        self.hits = 0
+        self.wasted = 0
+
+    def prefetch(self, engine: "ClearanceEngine", pilot: "Pilot") -> None:
+        def job(execute) -> None:
+            key = engine.route_key(pilot)
+            if engine.plan_route(pilot, execute) is None:
+                return  # nothing was cached: no hit to expect
+
+            with self._lock:
+                self.prefetched += 1
+                if self._is_connected(pilot):
+                    self._pending[pilot.sid] = (engine, key)
+                else:
+                    self.wasted += 1  # left while the route was being computed
+
+        self.dispatcher.submit(pilot.sid, job)
+
+    def claim(self, engine: "ClearanceEngine", pilot: "Pilot") -> None:
+        """Called on the pilot's first clearance request, before its route is planned."""
+        with self._lock:
+            pending = self._pending.pop(pilot.sid, None)
+        if pending is None:
+            return
+
+        prefetch_engine, key = pending
+        hit = prefetch_engine is engine and engine.route_key(pilot) == key and key in engine.route_cache
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.wasted += 1
+
+    def discard(self, sid: str) -> None:
+        with self._lock:
+            if self._pending.pop(sid, None) is not None:
+                self.wasted += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            resolved = self.hits + self.wasted
+            return {
+                "prefetched": self.prefetched,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "wasted": self.wasted,
+                "hit_rate": self.hits / resolved if resolved else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.prefetched = 0
+            self.hits = 0
+            self.wasted = 0
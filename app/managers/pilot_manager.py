@@ -1,28 +1,34 @@
 from typing import TYPE_CHECKING
 
+from app.utils.simulate_pos import simulate_plane_from_map
 from app.utils.types import PilotPublicView, Plane
-from app.managers.airport_map_manager import AirportMapManager
 
 if TYPE_CHECKING:
     from app.classes.pilot import Pilot
+    from app.managers.airport_registry import Facility
 
 class PilotManager:
-    def __init__(self, airport_map_manager : AirportMapManager):
+    def __init__(self):
         self._pilots: dict[str, "Pilot"] = {}
-        self.airport_map_manager = airport_map_manager
 
     def get(self, sid: str) -> "Pilot":
         if not self.exists(sid):
             raise KeyError(f"Pilot with SID {sid} does not exist.")
         return self._pilots[sid]
 
-    def create(self, sid: str) -> PilotPublicView:
+    def create(self, sid: str, facility: "Facility") -> PilotPublicView:
         from app.classes.pilot import Pilot
         if self.exists(sid):
             raise ValueError(f"Pilot with SID {sid} already exists.")
 
-        plane : Plane = self.airport_map_manager.simulate_plane() # simulate pilot position
-        self._pilots[sid] = Pilot(sid, plane=plane)
+        plane : Plane = simulate_plane_from_map(facility.map_data) # simulate pilot position
+        self._pilots[sid] = Pilot(
+            sid,
+            plane=plane,
+            occupancy=facility.occupancy,
+            facility=facility.icao,
+            atc_room=facility.atc_room,
+        )
         return self._pilots[sid].to_public()
 
     def exists(self, sid: str) -> bool:
@@ -31,7 +37,9 @@ class PilotManager:
     def remove(self, sid: str) -> None:
         pilot = self._pilots.pop(sid, None)
         if pilot:
+            if pilot.occupancy is not None:
+                pilot.occupancy.remove(sid)
             pilot.cleanup()
 
-    def get_all_pilots(self) -> list["Pilot"]:
-        return list(self._pilots.values())
+    def get_all_pilots(self, facility: str | None = None) -> list["Pilot"]:
+        return [pilot for pilot in self._pilots.values() if facility is None or pilot.facility == facility]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from time import perf_counter, perf_counter_ns
+from typing import TYPE_CHECKING, Any
+
+from app.classes.position_stream import PositionStream
+from app.classes.taxi_simulator import TaxiSimulator
+from app.testing.benchmark.metrics.server import LatencyRecorder
+from app.utils.constants import (
+    POSITION_STREAM_HIGH_WATER,
+    POSITION_STREAM_LOW_WATER,
+    POSITION_STREAM_MAX_INTERVAL,
+    POSITION_STREAM_MIN_MOVE,
+    POSITION_STREAM_MIN_TURN,
+    POSITION_STREAM_SCALE,
+    SIMULATION_TICK_HZ,
+    TAXI_ACCELERATION_MPS2,
+    TAXI_SPEED_MPS,
+)
+from app.utils.socket_constants import ATC_ROOM, TAXI_POSITIONS_SEND
+from app.utils.types import LocationInfo
+
+if TYPE_CHECKING:
+    from app.classes.pilot import Pilot
+    from app.classes.socket import SocketService
+    from app.managers.pilot_manager import PilotManager
+
+
+class SimulationManager:
+    """
+    Drives the TaxiSimulator from a background task at SIMULATION_TICK_HZ.
+
+    A pilot starts moving when its taxi clearance is executed and follows the
+    polyline of its current clearance. Positions reach `room` as PositionStream
+    frames, one every `frame_interval` ticks: the interval doubles while the
+    slowest ATC socket has more than POSITION_STREAM_HIGH_WATER packets queued
+    and halves again once it drains. Pilots' `plane` dicts are only written
+    back on demand (`sync_planes`) or when an aircraft stops, never per tick.
+    """
+
+    def __init__(
+        self,
+        socket_service: "SocketService",
+        pilot_manager: "PilotManager",
+        tick_hz: float = SIMULATION_TICK_HZ,
+        room: str = ATC_ROOM,
+    ):
+        self.socket = socket_service
+        self.pilots = pilot_manager
+        self.room = room
+        self.interval = 1.0 / tick_hz
+        self.simulator = TaxiSimulator(TAXI_SPEED_MPS, TAXI_ACCELERATION_MPS2)
+        self._locations: dict[str, list[LocationInfo]] = {}  # per simulated sid: one entry per route segment
+        self.stream = PositionStream(POSITION_STREAM_SCALE, POSITION_STREAM_MIN_MOVE, POSITION_STREAM_MIN_TURN)
+        self.frame_interval = 1
+        self._ticks_since_frame = 0
+        self._running = False
+
+        self.ticks = 0
+        self.frames = 0
+        self.max_queue_depth = 0
+        self.tick_ms = LatencyRecorder()
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self.socket.start_background_task(self._run)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _run(self) -> None:
+        last = perf_counter()
+        while self._running:
+            self.socket.sleep(self.interval)
+            now = perf_counter()
+            try:
+                self.tick(now - last)
+            except Exception as e:
+                print(f"[SimulationManager] Tick failed: {e}")
+            last = now
+
+    def start_taxi(self, pilot: "Pilot") -> bool:
+        kind = pilot.current_clearance if pilot.current_clearance != "expected" else "taxi"
+        locations = list(pilot.clearances[kind]["coords"])
+        if not locations:
+            return False
+
+        polyline = [pilot.plane["current_pos"]["coord"]] + [location["coord"] for location in locations]
+        self.simulator.start(pilot.sid, polyline, heading=pilot.plane["current_heading"])
+        self._locations[pilot.sid] = locations
+        print(f"[SimulationManager] {pilot.sid} taxiing via {kind} clearance ({len(locations)} segments)")
+        return True
+
+    def stop_taxi(self, sid: str) -> None:
+        self.stop_taxis([sid])
+
+    def stop_taxis(self, sids: list[str]) -> None:
+        sids = [sid for sid in sids if sid in self.simulator]
+        for sid in sids:
+            if self.pilots.exists(sid):
+                self._write_back(self.pilots.get(sid))
+        # one compaction of the simulator arrays, however many aircraft stop
+        self.simulator.stop_many(sids)
+        for sid in sids:
+            self._locations.pop(sid, None)
+
+    def clear(self) -> None:
+        self.stop_taxis(list(self.simulator.sids))
+
+    def tick(self, dt: float) -> None:
+        started = perf_counter_ns()
+        simulator = self.simulator
+        simulator.tick(dt)
+        self.ticks += 1
+
+        # a frame is forced on arrival so the final position is never skipped
+        arrived = simulator.arrived().nonzero()[0].tolist()
+        self._ticks_since_frame += 1
+        if self._ticks_since_frame >= self.frame_interval or arrived:
+            self._publish()
+
+        # arrived aircraft leave the arrays so ticks only pay for traffic still moving
+        if arrived:
+            self.stop_taxis([simulator.sids[slot] for slot in arrived])
+
+        self.tick_ms.add_ms((perf_counter_ns() - started) / 1_000_000.0)
+
+    def _publish(self) -> None:
+        self._ticks_since_frame = 0
+
+        depth = self.socket.outbound_queue_depth(self.room)
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        if depth > POSITION_STREAM_HIGH_WATER:
+            self.frame_interval = min(self.frame_interval * 2, POSITION_STREAM_MAX_INTERVAL)
+        elif depth < POSITION_STREAM_LOW_WATER:
+            self.frame_interval = max(self.frame_interval // 2, 1)
+
+        simulator = self.simulator
+        frame = self.stream.frame(simulator.sids, simulator.positions, simulator.headings)
+        if frame["sids"] or frame["removed"]:
+            self.frames += 1
+            self.socket.send(TAXI_POSITIONS_SEND, frame, room=self.room)
+
+    def keyframe(self) -> dict[str, Any]:
+        return self.stream.keyframe()
+
+    def sync_planes(self) -> None:
+        """Copy simulated state into the `plane` of every moving pilot."""
+        for sid in self.simulator.sids:
+            if self.pilots.exists(sid):
+                self._write_back(self.pilots.get(sid))
+
+    def _write_back(self, pilot: "Pilot") -> None:
+        slot = self.simulator.slot_of(pilot.sid)
+        if slot is None:
+            return
+        coord, heading, speed = self.simulator.state_of_slot(slot)
+        segment = self._locations[pilot.sid][int(self.simulator.segments[slot])]
+        pilot.plane["current_pos"] = {"name": segment["name"], "type": segment["type"], "coord": coord}
+        pilot.plane["current_heading"] = heading
+        pilot.plane["current_speed"] = speed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "aircraft": len(self.simulator),
+            "ticks": self.ticks,
+            "frames": self.frames,
+            "frame_interval": self.frame_interval,
+            "max_queue_depth": self.max_queue_depth,
+            "tick_ms": self.tick_ms.snapshot(),
+        }
+
+    def reset_stats(self) -> None:
+        self.ticks = 0
+        self.frames = 0
+        self.max_queue_depth = 0
+        self.tick_ms = LatencyRecorder()
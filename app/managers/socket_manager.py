@@ -4,13 +4,17 @@ from flask import request
 from typing import TYPE_CHECKING, Any
 
 from app.utils.constants import (
+    AIRPORT_MEMORY_BUDGET_MB,
     CANCEL,
     CLEARANCE_CODES,
     EXPECTED_TAXI_CLEARANCE,
+    MAX_ROUTE_ALTERNATIVES,
+    ROUTE_CACHE_SIZE,
     TAXI_CLEARANCE,
     UNABLE,
 )
 from app.utils.parse import interpolate_request_message, parse_status
+from app.utils.route_encoding import RouteEncoding, encode_clearance, encode_locations, encode_public_view
 from app.utils.socket_constants import (
     ACTION_ACK_SEND,
     ACTIVITY_INFO_SEND,
@@ -18,28 +22,38 @@ from app.utils.socket_constants import (
     ATC_LIST_SEND,
     ATC_RESPONSE_LISTEN,
     ATC_RESPONSE_TO_PILOT,
-    ATC_ROOM,
     CANCEL_CLEARANCE_LISTEN,
     CANCEL_REQUEST_LISTEN,
     CLEARANCE_CANCELLED,
+    CLOSE_EDGES_LISTEN,
     CONNECT_LISTEN,
     CONNECTED_TO_ATC_SEND,
     DISCONNECT_LISTEN,
+    EDGE_CLOSURES_SEND,
     ERROR_SEND,
     GET_ACTIVITY_LISTEN,
     GET_AIRPORT_MAP_DATA_LISTEN,
     GET_CLEARANCE_LISTEN,
+    GET_CLEARANCES_LISTEN,
     GET_PILOTS_LISTEN,
+    GET_ROUTE_ALTERNATIVES_LISTEN,
+    GET_ROUTE_CONFLICTS_LISTEN,
     NEW_REQUEST_SEND,
+    PILOT_CONFLICTS_SEND,
     PILOT_CONNECTED_SEND,
     PILOT_DISCONNECTED_SEND,
     PILOT_LIST_SEND,
     PROPOSED_CLEARANCE_SEND,
+    PROPOSED_CLEARANCES_SEND,
+    REOPEN_EDGES_LISTEN,
     REQUEST_ACK_SEND,
     REQUEST_CANCELLED_SEND,
+    ROUTE_ALTERNATIVES_SEND,
+    ROUTE_CONFLICTS_SEND,
     SELECT_AIRCRAFT,
     SEND_ACTION_LISTEN,
     SEND_REQUEST_LISTEN,
+    TAXI_POSITIONS_SEND,
 )
 from app.utils.time_utils import get_current_timestamp, get_formatted_time
 from app.utils.types import (
@@ -52,7 +66,12 @@ from app.utils.types import (
     UpdateStepData,
 )
 from app.managers.log_manager import logger
-from app.classes.clearance import ClearanceEngine
+from app.classes.clearance import ClearanceEngine, RoutingMode
+from app.classes.route_cache import RouteCache
+from app.managers.clearance_dispatcher import ClearanceDispatcher
+from app.managers.clearance_prefetcher import ClearancePrefetcher
+from app.managers.airport_registry import AirportRegistry, Facility
+from app.managers.cache_revalidator import CacheRevalidator
 
 if TYPE_CHECKING:
     from app.classes.pilot import Pilot
@@ -71,18 +90,233 @@ class SocketManager:
         atc_manager: "AtcManager",
         airport_map_manager: "AirportMapManager",
         metrics_store: "SystemMetrics",
+        routing_mode: RoutingMode = "search",
+        route_encoding: RouteEncoding = "legacy",
+        airport_memory_mb: float = AIRPORT_MEMORY_BUDGET_MB,
     ):
         self.socket: "SocketService" = socket_service
         self.pilots: "PilotManager" = pilot_manager
         self.atc_manager: "AtcManager" = atc_manager
         self.airport_map_manager: "AirportMapManager" = airport_map_manager
-        self.clearance_engine = ClearanceEngine(airport_map_manager.map_data)
+        self.routing_mode: RoutingMode = routing_mode
+        self.route_encoding: RouteEncoding = route_encoding
         self.metrics: "SystemMetrics" = metrics_store
         self._disconnecting: set[str] = set()
+        self._connecting: dict[str, int] = {}  # sid -> role, while its airport loads
+        self._simulating = False
+        self.clearance_dispatcher = ClearanceDispatcher(
+            self.socket.start_background_task,
+            offload=self.socket.async_mode == "eventlet",
+        )
+        self.clearance_prefetcher = ClearancePrefetcher(self.clearance_dispatcher, self._is_connected)
+
+        self.airports = AirportRegistry(self.socket, self._build_facility, airport_memory_mb)
+        self.airports.on_loaded(self._activate_facility)
+        self.airports.on_evicted(self._deactivate_facility)
+        self.airports.on_swapped(self._on_facility_swapped)
+        self.airports.load(airport_map_manager.icao)
+        self.airports.set_default(airport_map_manager.icao)
+        self.cache_revalidator = CacheRevalidator(self.socket, airport_map_manager, self.airports, self._build_facility)
+
+        self.airport_map_manager.on_change(self.on_airport_changed)
+        self.metrics.register_source(
+            "clearance_queue", self.clearance_dispatcher.stats, self.clearance_dispatcher.reset_stats
+        )
+        self.metrics.register_source(
+            "clearance_prefetch", self.clearance_prefetcher.stats, self.clearance_prefetcher.reset_stats
+        )
+        self.metrics.register_source("airports", self.airports.stats, self.airports.reset_stats)
+        self.metrics.register_source(
+            "cache_revalidation", self.cache_revalidator.stats, self.cache_revalidator.reset_stats
+        )
+
+    ## === FACILITIES
+    def _build_facility(self, icao: str) -> Facility:
+        # runs off the hub: no emits; the parser and cache index it shares with other loads are thread-safe
+        map_data = self.airport_map_manager.get_or_parse_map(icao)
+        engine = ClearanceEngine(
+            map_data,
+            route_cache=RouteCache(ROUTE_CACHE_SIZE),
+            routing_mode=self.routing_mode,
+            graph=self.airport_map_manager.get_taxi_graph(icao, map_data),
+        )
+        tiles = self.airport_map_manager.get_map_tiles(icao, map_data)
+        return Facility(icao, map_data, engine, tiles, self.socket, self.pilots)
+
+    def _activate_facility(self, facility: Facility) -> None:
+        facility.occupancy.on_change(
+            lambda added, removed: self.on_route_conflicts_changed(facility, added, removed)
+        )
+        if self._simulating:
+            facility.simulation.start()
+
+    def _deactivate_facility(self, facility: Facility) -> None:
+        facility.simulation.stop()
+        facility.simulation.clear()
+
+    def _on_facility_swapped(self, facility: Facility, old_engine: ClearanceEngine) -> None:
+        # on the hub, right after the swap: old edge ids are re-expressed on the new graph before anything yields
+        old_graph, engine = old_engine.graph, facility.engine
+        new_edges = engine.graph.edges_by_endpoints()
+
+        def translate(edges) -> tuple[int, ...] | None:
+            translated = tuple(new_edges.get(old_graph.endpoints(edge)) for edge in edges)
+            return None if None in translated else translated
+
+        # closures carry over to the segments that still exist
+        closed = (old_graph.endpoints(edge) for edge in old_engine.closed_edges)
+        engine.close_edges([new_edges[key] for key in closed if key in new_edges])
+
+        rerouted = []
+        for pilot in self.pilots.get_all_pilots(facility.icao):
+            route_edges = {}
+            for kind, edges in pilot.route_edges.items():
+                translated = translate(edges)
+                if translated is not None:
+                    route_edges[kind] = translated
+                elif kind == pilot.current_clearance:
+                    rerouted.append(pilot)
+            pilot.rebind_routes(route_edges)
+
+        if old_engine.closed_edges:
+            graph = engine.graph
+            self._emit(
+                facility.atc_room,
+                EDGE_CLOSURES_SEND,
+                {
+                    "closed_edges": sorted(engine.closed_edges),
+                    "closed_names": sorted({graph.label_of(edge) for edge in engine.closed_edges}),
+                },
+            )
+        # clients fetch the new version of the map
+        self._emit(facility.atc_room, AIRPORT_MAP_DATA_SEND, self._map_ref(facility))
+
+        # routes over segments the new map no longer has
+        for pilot in rerouted:
+            self._propose_clearance(pilot, "route_change", reply_sid=facility.atc_room)
+
+    def on_airport_changed(self, icao: str) -> None:
+        # the old default keeps serving new sessions until the new one has loaded
+        self.airports.request(icao, self._on_default_airport_ready)
+
+    def _on_default_airport_ready(self, icao: str, facility: Facility | None, error: str | None) -> None:
+        if facility is None:
+            print(f"[SocketManager] Default airport stays {self.airports.default_icao}: {icao} failed to load ({error})")
+            return
+        self.airports.set_default(facility.icao)
+        print(f"[SocketManager] Default airport is now {facility.icao}")
+
+    def _facility(self, sid: str) -> Facility:
+        """Facility the pilot or ATC `sid` is bound to."""
+        facility = self.airports.facility_of(sid)
+        if facility is None:
+            raise KeyError(f"SID {sid} is not bound to any airport")
+        return facility
+
+    def _facility_pilot(self, facility: Facility, pilot_sid: str) -> Pilot:
+        """A pilot of `facility`; pilots of other airports do not exist for its controllers."""
+        pilot = self.pilots.get(pilot_sid)
+        if pilot.facility != facility.icao:
+            raise KeyError(f"Pilot with SID {pilot_sid} does not exist.")
+        return pilot
+
+    def on_route_conflicts_changed(
+        self,
+        facility: Facility,
+        added: list[tuple[str, str]],
+        removed: list[tuple[str, str]],
+    ) -> None:
+        self._emit(
+            facility.atc_room,
+            ROUTE_CONFLICTS_SEND,
+            {
+                "added": [list(pair) for pair in added],
+                "removed": [list(pair) for pair in removed],
+            },
+        )
 
     def _emit(self, room: str, event: str, payload: Any, **kwargs) -> None:
         self.socket.send(event, payload, room=room, **kwargs)
 
+    def _encode_clearance(self, clearance: Clearance) -> Any:
+        return encode_clearance(clearance, self.route_encoding)
+
+    def _is_connected(self, pilot: Pilot) -> bool:
+        return self.pilots.exists(pilot.sid) and self.pilots.get(pilot.sid) is pilot
+
+    def _propose_clearance(
+        self,
+        pilot: Pilot,
+        kind: ClearanceType,
+        reply_sid: str,
+        only_if_changed: bool = False,
+        request: dict | None = None,
+        new_request: dict | None = None,
+    ) -> None:
+        """
+        Route off the hub; the clearance is set and proposed to ATC once it is ready.
+        With `only_if_changed`, nothing is proposed when the route matches the active one.
+        For a pilot `request`, `new_request` is sent to ATC after the proposed clearance,
+        and a failure is reported against the request instead.
+        """
+        issued_at = get_formatted_time(get_current_timestamp())
+        facility = self._facility(pilot.sid)
+
+        def job(execute) -> None:
+            try:
+                engine = facility.engine
+                self.clearance_prefetcher.claim(engine, pilot)
+                route = engine.plan_route(pilot, execute)
+                if not self._is_connected(pilot):
+                    return
+                if facility.engine is not engine:
+                    # the map was rebuilt meanwhile: route again on the new one
+                    self.clearance_dispatcher.submit(pilot.sid, job)
+                    return
+
+                route_edges = route.edges if route is not None else ()
+                if only_if_changed and route_edges == pilot.active_route_edges():
+                    return
+
+                instruction, coords = engine.clearance_for(pilot, route)
+                clearance: Clearance = Clearance(
+                    kind=kind,
+                    instruction=instruction,
+                    coords=coords,
+                    issued_at=issued_at,
+                )
+
+                pilot.set_clearance(clearance, route_edges)
+
+                self._emit(
+                    facility.atc_room,
+                    PROPOSED_CLEARANCE_SEND,
+                    {
+                        "pilot_sid": pilot.sid,
+                        "clearance": self._encode_clearance(clearance),
+                    },
+                )
+                if new_request is not None:
+                    self._emit(facility.atc_room, NEW_REQUEST_SEND, new_request)
+
+            except Exception as e:
+                self.metrics.record_error()
+                if request is None:
+                    self._emit(reply_sid, ERROR_SEND, self._make_error_payload(reply_sid, "CLEARANCE", str(e)))
+                    logger.log_error(pilot_id=reply_sid, context="CLEARANCE", error=str(e))
+                    return
+
+                error_payload = self._make_error_payload(
+                    sid=reply_sid,
+                    context="REQUEST",
+                    message=str(e),
+                    request_type=request.get("requestType"),
+                )
+                self._emit(reply_sid, ERROR_SEND, self._with_test_metadata(error_payload, request))
+                logger.log_error(pilot_id=reply_sid, context="REQUEST", error=str(e))
+
+        self.clearance_dispatcher.submit(pilot.sid, job)
+
     def _with_test_metadata(self, payload: dict, source: dict | None) -> dict:
         if not isinstance(source, dict):
             return payload
@@ -127,79 +361,135 @@ class SocketManager:
         self.socket.listen(GET_PILOTS_LISTEN, self.handle_pilot_list)
         self.socket.listen(GET_AIRPORT_MAP_DATA_LISTEN, self.handle_map_request)
         self.socket.listen(GET_CLEARANCE_LISTEN, self.on_clearance_request)
+        self.socket.listen(GET_CLEARANCES_LISTEN, self.on_clearances_request)
+        self.socket.listen(GET_ROUTE_ALTERNATIVES_LISTEN, self.on_route_alternatives_request)
+        self.socket.listen(GET_ROUTE_CONFLICTS_LISTEN, self.on_route_conflicts_request)
         self.socket.listen(CANCEL_CLEARANCE_LISTEN, self.on_clearance_cancel)
         self.socket.listen(SELECT_AIRCRAFT, self.on_aircraft_selected)
+        self.socket.listen(CLOSE_EDGES_LISTEN, self.on_close_edges)
+        self.socket.listen(REOPEN_EDGES_LISTEN, self.on_reopen_edges)
 
         # GLOBAL EVENTS
         self.socket.listen(ATC_RESPONSE_LISTEN, self.on_atc_response)
 
+        self._simulating = True
+        for facility in self.airports.facilities:
+            facility.simulation.start()
+        self.cache_revalidator.start()
+
     ## PILOT UIS EVENTS
     ## === CONNECT
     def on_connect(self, auth=None):
         sid = request.sid
         role = auth.get("r") if auth else None  # 0 = pilot, 1 = atc
+        if role not in (0, 1):
+            logger.log_event(pilot_id=sid, event_type="SOCKET", message="Unknown role -- disconnecting")
+            self.socket.disconnect(sid)
+            return
+
+        # "f": ICAO of the facility to join; the default airport otherwise
+        icao = str(auth.get("f") or self.airports.default_icao).upper()
+        self._connecting[sid] = role
+        if icao not in self.airports and not self.airport_map_manager.has_airport(icao):
+            self._complete_connect(sid, None, f"unknown airport {icao}")
+            return
+        self.airports.request(icao, lambda icao, facility, error: self._complete_connect(sid, facility, error))
+
+    def _complete_connect(self, sid: str, facility: Facility | None, error: str | None) -> None:
+        role = self._connecting.pop(sid, None)
+        if role is None:
+            return  # gone while its airport was loading
+
+        if facility is None:
+            self._emit(sid, ERROR_SEND, {"message": f"Facility unavailable: {error}"})
+            logger.log_error(pilot_id=sid, context="CONNECT", error=str(error))
+            self.metrics.record_error()
+            self.socket.disconnect(sid)
+            return
+
+        self.airports.bind(sid, facility)
 
         if role == 0:
-            public_view: PilotPublicView = self.pilots.create(sid)
-            logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"Pilot connected: {sid}")
+            public_view: PilotPublicView = self.pilots.create(sid, facility)
+            logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"Pilot connected: {sid} ({facility.icao})")
 
             connected_payload: PilotConnectInfo = {
-                "facility": self.atc_manager.connection_info["facility"],
-                "connectedSince": self.atc_manager.connection_info["connectedSince"],
+                "facility": facility.connection_info["facility"],
+                "connectedSince": facility.connection_info["connectedSince"],
                 "sid": sid,
             }
             self._emit(sid, CONNECTED_TO_ATC_SEND, connected_payload)
+            self.clearance_prefetcher.prefetch(facility.engine, self.pilots.get(sid))
 
-            if self.atc_manager.has_any():
-                self._emit(ATC_ROOM, PILOT_CONNECTED_SEND, public_view)
+            if self.atc_manager.has_any(facility.icao):
+                self._emit(facility.atc_room, PILOT_CONNECTED_SEND, encode_public_view(public_view, self.route_encoding))
 
-        elif role == 1:
-            self.atc_manager.create(sid)
-            self.socket.enter_room(sid, room=ATC_ROOM)
-            logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"ATC connected: {sid}")
+        else:
+            self.atc_manager.create(sid, facility.icao)
+            self.socket.enter_room(sid, room=facility.atc_room)
+            logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"ATC connected: {sid} ({facility.icao})")
 
-            pilot_list_data = self.get_adjusted_pilot_list()
+            pilot_list_data = self.get_adjusted_pilot_list(facility)
             self._emit(sid, PILOT_LIST_SEND, pilot_list_data)
+            self._emit(sid, TAXI_POSITIONS_SEND, facility.simulation.keyframe())
 
-            atc_list = self.atc_manager.get_all()
-            self._emit(ATC_ROOM, ATC_LIST_SEND, atc_list)
-
-        else:
-            logger.log_event(pilot_id=sid, event_type="SOCKET", message="Unknown role -- disconnecting")
-            self.socket.disconnect(sid)
+            atc_list = self.atc_manager.get_all(facility.icao)
+            self._emit(facility.atc_room, ATC_LIST_SEND, atc_list)
 
     def on_disconnect(self, data=None):
         sid = request.sid
         if sid in self._disconnecting:
             return
         self._disconnecting.add(sid)
+        self._connecting.pop(sid, None)
 
         try:
+            facility = self.airports.facility_of(sid)
             if self.pilots.exists(sid):
+                if facility is not None:
+                    facility.simulation.stop_taxi(sid)
                 self.pilots.remove(sid)
+                self.clearance_prefetcher.discard(sid)
                 logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"Pilot disconnected: {sid}")
 
-                if self.atc_manager.has_any():
+                if facility is not None and self.atc_manager.has_any(facility.icao):
                     try:
-                        self._emit(ATC_ROOM, PILOT_DISCONNECTED_SEND, sid)
+                        self._emit(facility.atc_room, PILOT_DISCONNECTED_SEND, sid)
                     except Exception as e:
                         logger.log_error(pilot_id=sid, context="DISCONNECT", error=str(e))
 
             elif self.atc_manager.exists(sid):
                 self.atc_manager.remove(sid)
-                self.socket.leave_room(sid, room=ATC_ROOM)
-                atc_list = self.atc_manager.get_all()
-                try:
-                    self._emit(ATC_ROOM, ATC_LIST_SEND, atc_list, skip_sid=sid)
-                except Exception as e:
-                    logger.log_error(pilot_id=sid, context="DISCONNECT", error=str(e))
+                if facility is not None:
+                    self.socket.leave_room(sid, room=facility.atc_room)
+                    atc_list = self.atc_manager.get_all(facility.icao)
+                    try:
+                        self._emit(facility.atc_room, ATC_LIST_SEND, atc_list, skip_sid=sid)
+                    except Exception as e:
+                        logger.log_error(pilot_id=sid, context="DISCONNECT", error=str(e))
                 logger.log_event(pilot_id=sid, event_type="SOCKET", message=f"ATC disconnected: {sid}")
 
             else:
                 logger.log_event(pilot_id=sid, event_type="SOCKET", message="Unknown SID disconnected")
         finally:
+            # last: unbinding may evict the airport once nobody uses it
+            self.airports.unbind(sid)
             self._disconnecting.discard(sid)
 
+    def drop_session(self, sid: str) -> None:
+        """Forget a pilot or ATC without a socket disconnect (benchmark resets): the same cleanup, no notifications."""
+        facility = self.airports.facility_of(sid)
+        if self.pilots.exists(sid):
+            if facility is not None:
+                facility.simulation.stop_taxi(sid)
+            self.pilots.remove(sid)
+            self.clearance_prefetcher.discard(sid)
+        elif self.atc_manager.exists(sid):
+            self.atc_manager.remove(sid)
+            if facility is not None:
+                self.socket.leave_room(sid, room=facility.atc_room)
+        self.airports.unbind(sid)
+
     ## === SEND REQUESTS
     def on_send_request(self, data: dict):
         sid = request.sid
@@ -222,7 +512,7 @@ class SocketManager:
                     )
 
                     self._emit(
-                        ATC_ROOM,
+                        pilot.atc_room,
                         NEW_REQUEST_SEND,
                         self._with_test_metadata(overridden_update.to_atc_payload(), data),
                     )
@@ -237,11 +527,11 @@ class SocketManager:
                     )
 
                     self._emit(
-                        ATC_ROOM,
+                        pilot.atc_room,
                         PROPOSED_CLEARANCE_SEND,
                         {
                             "pilot_sid": pilot.sid,
-                            "clearance": cleared_clearance,
+                            "clearance": self._encode_clearance(cleared_clearance),
                         },
                     )
 
@@ -279,34 +569,13 @@ class SocketManager:
             status = parse_status(step_payload.status)
             step_payload.status = status
 
+            new_request = self._with_test_metadata(step_payload.to_atc_payload(), data)
             if step_code in CLEARANCE_CODES:
                 kind: ClearanceType = "expected" if step_code == EXPECTED_TAXI_CLEARANCE else "taxi"
-                issued_at = get_formatted_time(get_current_timestamp())
-                instruction, coords = self.clearance_engine.generate_clearance(pilot)
-
-                clearance: Clearance = Clearance(
-                    kind=kind,
-                    instruction=instruction,
-                    coords=coords,
-                    issued_at=issued_at,
-                )
-
-                pilot.set_clearance(clearance)
-
-                self._emit(
-                    ATC_ROOM,
-                    PROPOSED_CLEARANCE_SEND,
-                    {
-                        "pilot_sid": pilot.sid,
-                        "clearance": clearance,
-                    },
-                )
-
-            self._emit(
-                ATC_ROOM,
-                NEW_REQUEST_SEND,
-                self._with_test_metadata(step_payload.to_atc_payload(), data),
-            )
+                # ATC gets the request once its clearance is proposed, and never without it
+                self._propose_clearance(pilot, kind, reply_sid=sid, request=data, new_request=new_request)
+            else:
+                self._emit(pilot.atc_room, NEW_REQUEST_SEND, new_request)
 
             self.metrics.record_message("pilot", start_ns)
 
@@ -343,7 +612,7 @@ class SocketManager:
             )
 
             self._emit(
-                ATC_ROOM,
+                pilot.atc_room,
                 NEW_REQUEST_SEND,
                 update_data.to_atc_payload(),
             )
@@ -352,11 +621,11 @@ class SocketManager:
                 clearance = pilot.clear_clearance(update_data.step_code)
 
                 self._emit(
-                    ATC_ROOM,
+                    pilot.atc_room,
                     PROPOSED_CLEARANCE_SEND,
                     {
                         "pilot_sid": pilot.sid,
-                        "clearance": clearance,
+                        "clearance": self._encode_clearance(clearance),
                     },
                 )
 
@@ -407,12 +676,17 @@ class SocketManager:
             )
 
             self._emit(
-                ATC_ROOM,
+                pilot.atc_room,
                 NEW_REQUEST_SEND,
                 update_data.to_atc_payload(),
             )
 
+            if update_data.status == StepStatus.EXECUTED and update_data.step_code == TAXI_CLEARANCE:
+                self._facility(pilot.sid).simulation.start_taxi(pilot)
+
             if data.get("action") in [CANCEL, UNABLE] and update_data.step_code in CLEARANCE_CODES:
+                if update_data.step_code == TAXI_CLEARANCE:
+                    self._facility(pilot.sid).simulation.stop_taxi(pilot.sid)
                 clearance = pilot.clear_clearance(update_data.step_code)
 
                 self._emit(
@@ -425,11 +699,11 @@ class SocketManager:
                 )
 
                 self._emit(
-                    ATC_ROOM,
+                    pilot.atc_room,
                     PROPOSED_CLEARANCE_SEND,
                     {
                         "pilot_sid": pilot.sid,
-                        "clearance": clearance,
+                        "clearance": self._encode_clearance(clearance),
                     },
                 )
 
@@ -508,7 +782,10 @@ class SocketManager:
                 self.metrics.record_error()
                 return
 
-            if not self.pilots.exists(pilot_sid):
+            facility = self._facility(sid)
+            try:
+                pilot = self._facility_pilot(facility, pilot_sid)
+            except KeyError:
                 self._emit(
                     sid,
                     ERROR_SEND,
@@ -521,7 +798,6 @@ class SocketManager:
                 self.metrics.record_error()
                 return
 
-            pilot = self.pilots.get(pilot_sid)
             update: UpdateStepData = atc.handle_response(payload, pilot)
 
             pilot.handle_step_update(update, self.socket)
@@ -549,7 +825,7 @@ class SocketManager:
                 update.status = StepStatus.RESPONDED
 
             self._emit(
-                ATC_ROOM,
+                facility.atc_room,
                 NEW_REQUEST_SEND,
                 update.to_atc_payload(),
             )
@@ -586,11 +862,11 @@ class SocketManager:
                 )
 
                 self._emit(
-                    ATC_ROOM,
+                    facility.atc_room,
                     PROPOSED_CLEARANCE_SEND,
                     {
                         "pilot_sid": pilot.sid,
-                        "clearance": clearance,
+                        "clearance": self._encode_clearance(clearance),
                     },
                 )
 
@@ -615,11 +891,19 @@ class SocketManager:
 
     def handle_pilot_list(self, data=None):
         sid = request.sid
-        pilot_list_data = self.get_adjusted_pilot_list()
+        facility = self.airports.facility_of(sid)
+        if facility is None or not self.atc_manager.exists(sid):
+            self._emit(sid, ERROR_SEND, {"message": "ATC not connected"})
+            logger.log_error(pilot_id=sid, context="PILOT_LIST", error="ATC not connected")
+            self.metrics.record_error()
+            return
+
+        pilot_list_data = self.get_adjusted_pilot_list(facility)
         self._emit(sid, PILOT_LIST_SEND, pilot_list_data)
 
-    def get_adjusted_pilot_list(self) -> list[PilotPublicView]:
-        pilot_list: list[Pilot] = self.pilots.get_all_pilots()
+    def get_adjusted_pilot_list(self, facility: Facility) -> list[Any]:
+        facility.simulation.sync_planes()
+        pilot_list: list[Pilot] = self.pilots.get_all_pilots(facility.icao)
         pilot_list_data = [pilot.to_public() for pilot in pilot_list]
 
         for pilot_data in pilot_list_data:
@@ -635,22 +919,22 @@ class SocketManager:
                 elif status == StepStatus.REQUESTED.value:
                     step_payload["status"] = StepStatus.NEW.value
 
-        return pilot_list_data
+        return [encode_public_view(pilot_data, self.route_encoding) for pilot_data in pilot_list_data]
 
     def handle_map_request(self):
         sid = request.sid
-        if not self.airport_map_manager:
-            self._emit(sid, ERROR_SEND, {"message": "Airport map manager not initialized"})
+        facility = self.airports.facility_of(sid)
+        if facility is None:
+            self._emit(sid, ERROR_SEND, {"message": "Not bound to any airport"})
             logger.log_error(
                 pilot_id=sid,
                 context="MAP_REQUEST",
-                error="Airport map manager not initialized",
+                error="Not bound to any airport",
             )
             self.metrics.record_error()
             return
 
-        map_data = self.airport_map_manager.get_map()
-        if not map_data:
+        if not facility.map_data:
             self._emit(sid, ERROR_SEND, {"message": "No airport map data available"})
             logger.log_error(
                 pilot_id=sid,
@@ -660,7 +944,16 @@ class SocketManager:
             self.metrics.record_error()
             return
 
-        self._emit(sid, AIRPORT_MAP_DATA_SEND, map_data)
+        # the map itself is fetched over HTTP, pre-encoded and revalidated by ETag
+        self._emit(sid, AIRPORT_MAP_DATA_SEND, self._map_ref(facility))
+
+    def _map_ref(self, facility: Facility) -> dict:
+        return {
+            "icao": facility.icao,
+            "version": facility.map_payload.version,
+            "url": facility.map_url,
+            "tiles": f"{facility.map_url}/tiles",
+        }
 
     def on_clearance_request(self, payload: dict):
         sid = request.sid
@@ -680,7 +973,7 @@ class SocketManager:
             return
 
         try:
-            pilot = self.pilots.get(pilot_sid)
+            pilot = self._facility_pilot(self._facility(sid), pilot_sid)
         except KeyError:
             self._emit(sid, ERROR_SEND, {"message": f"Pilot with SID {pilot_sid} does not exist"})
             logger.log_error(pilot_id=sid, context="CLEARANCE", error=f"Pilot not found: {pilot_sid}")
@@ -691,32 +984,196 @@ class SocketManager:
             kind: ClearanceType = payload.get("kind") or "expected"
 
             atc.validate_clearance_request(pilot, kind)
-            issued_at = get_formatted_time(get_current_timestamp())
-            instruction, coords = self.clearance_engine.generate_clearance(pilot)
-
-            clearance: Clearance = Clearance(
-                kind=kind,
-                instruction=instruction,
-                coords=coords,
-                issued_at=issued_at,
-            )
-
-            pilot.set_clearance(clearance)
-
-            self._emit(
-                ATC_ROOM,
-                PROPOSED_CLEARANCE_SEND,
-                {
-                    "pilot_sid": pilot.sid,
-                    "clearance": clearance,
-                },
-            )
+            self._propose_clearance(pilot, kind, reply_sid=sid)
 
         except Exception as e:
             self._emit(sid, ERROR_SEND, {"message": str(e)})
             logger.log_error(pilot_id=sid, context="CLEARANCE", error=str(e))
             self.metrics.record_error()
 
+    def on_clearances_request(self, payload: dict):
+        sid = request.sid
+        try:
+            atc = self.atc_manager.get(sid)
+        except KeyError:
+            self._emit(sid, ERROR_SEND, {"message": "ATC not connected"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="ATC not connected")
+            self.metrics.record_error()
+            return
+
+        pilot_sids = payload.get("pilot_sids") if isinstance(payload, dict) else None
+        if not pilot_sids or not isinstance(pilot_sids, list):
+            self._emit(sid, ERROR_SEND, {"message": "Missing pilot SIDs"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="Missing pilot SIDs")
+            self.metrics.record_error()
+            return
+
+        kind: ClearanceType = payload.get("kind") or "expected"
+        facility = self._facility(sid)
+        pilots: list[Pilot] = []
+        errors: list[dict] = []
+
+        # one bad SID must not block the others: each failure is reported next to the clearances
+        for pilot_sid in dict.fromkeys(pilot_sids):
+            try:
+                pilot = self._facility_pilot(facility, pilot_sid)
+                atc.validate_clearance_request(pilot, kind)
+                pilots.append(pilot)
+            except KeyError:
+                errors.append({"pilot_sid": pilot_sid, "message": f"Pilot with SID {pilot_sid} does not exist"})
+            except ValueError as e:
+                errors.append({"pilot_sid": pilot_sid, "message": str(e)})
+
+        for error in errors:
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error=error["message"])
+
+        issued_at = get_formatted_time(get_current_timestamp())
+
+        def job(execute) -> None:
+            try:
+                engine = facility.engine
+                for pilot in pilots:
+                    self.clearance_prefetcher.claim(engine, pilot)
+                routes = engine.plan_routes(pilots, execute)
+                if facility.engine is not engine:
+                    # the map was rebuilt meanwhile: route again on the new one
+                    self.clearance_dispatcher.submit_many(keys, job)
+                    return
+
+                clearances = []
+                for pilot, route in zip(pilots, routes):
+                    if not self._is_connected(pilot):
+                        continue
+
+                    instruction, coords = engine.clearance_for(pilot, route)
+                    clearance: Clearance = Clearance(
+                        kind=kind,
+                        instruction=instruction,
+                        coords=coords,
+                        issued_at=issued_at,
+                    )
+
+                    pilot.set_clearance(clearance, route.edges if route is not None else ())
+                    clearances.append({
+                        "pilot_sid": pilot.sid,
+                        "clearance": self._encode_clearance(clearance),
+                    })
+
+                self._emit(
+                    facility.atc_room,
+                    PROPOSED_CLEARANCES_SEND,
+                    {
+                        "clearances": clearances,
+                        "errors": errors,
+                    },
+                )
+
+            except Exception as e:
+                self._emit(sid, ERROR_SEND, {"message": str(e)})
+                logger.log_error(pilot_id=sid, context="CLEARANCE", error=str(e))
+                self.metrics.record_error()
+
+        # queued under the requesting ATC and every pilot of the batch: batches from one controller are
+        # answered in order, and a pilot's clearances are set in request order whichever path they come from
+        keys = [sid] + [pilot.sid for pilot in pilots]
+        self.clearance_dispatcher.submit_many(keys, job)
+
+    def on_route_alternatives_request(self, payload: dict):
+        sid = request.sid
+        if not self.atc_manager.exists(sid):
+            self._emit(sid, ERROR_SEND, {"message": "ATC not connected"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="ATC not connected")
+            self.metrics.record_error()
+            return
+
+        pilot_sid = payload.get("pilot_sid") if isinstance(payload, dict) else None
+        if not pilot_sid:
+            self._emit(sid, ERROR_SEND, {"message": "Missing pilot SID"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="Missing pilot SID")
+            self.metrics.record_error()
+            return
+
+        try:
+            pilot = self._facility_pilot(self._facility(sid), pilot_sid)
+        except KeyError:
+            self._emit(sid, ERROR_SEND, {"message": f"Pilot with SID {pilot_sid} does not exist"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error=f"Pilot not found: {pilot_sid}")
+            self.metrics.record_error()
+            return
+
+        try:
+            count = min(max(int(payload.get("count") or 3), 1), MAX_ROUTE_ALTERNATIVES)
+        except (TypeError, ValueError):
+            self._emit(sid, ERROR_SEND, {"message": f"Invalid alternative count: {payload.get('count')}"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="Invalid alternative count")
+            self.metrics.record_error()
+            return
+
+        facility = self._facility(sid)
+
+        def job(execute) -> None:
+            try:
+                engine = facility.engine
+                routes = engine.alternative_routes(pilot, count, execute)
+                if facility.engine is not engine:
+                    # the map was rebuilt meanwhile: search again on the new one
+                    self.clearance_dispatcher.submit(pilot.sid, job)
+                    return
+
+                self._emit(
+                    sid,
+                    ROUTE_ALTERNATIVES_SEND,
+                    {
+                        "pilot_sid": pilot.sid,
+                        "alternatives": [
+                            {
+                                "rank": rank,
+                                "instruction": route.instruction,
+                                **encode_locations(route.locations, self.route_encoding),
+                            }
+                            for rank, route in enumerate(routes, start=1)
+                        ],
+                    },
+                )
+
+            except Exception as e:
+                self._emit(sid, ERROR_SEND, {"message": str(e)})
+                logger.log_error(pilot_id=sid, context="CLEARANCE", error=str(e))
+                self.metrics.record_error()
+
+        self.clearance_dispatcher.submit(pilot.sid, job)
+
+    def on_route_conflicts_request(self, payload: dict):
+        sid = request.sid
+        if not self.atc_manager.exists(sid):
+            self._emit(sid, ERROR_SEND, {"message": "ATC not connected"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error="ATC not connected")
+            self.metrics.record_error()
+            return
+
+        pilot_sid = payload.get("pilot_sid") if isinstance(payload, dict) else None
+        facility = self._facility(sid)
+        try:
+            self._facility_pilot(facility, pilot_sid)
+        except KeyError:
+            self._emit(sid, ERROR_SEND, {"message": f"Pilot with SID {pilot_sid} does not exist"})
+            logger.log_error(pilot_id=sid, context="CLEARANCE", error=f"Pilot not found: {pilot_sid}")
+            self.metrics.record_error()
+            return
+
+        conflicts = facility.occupancy.conflicts_of(pilot_sid)
+        self._emit(
+            sid,
+            PILOT_CONFLICTS_SEND,
+            {
+                "pilot_sid": pilot_sid,
+                "conflicts": [
+                    {"pilot_sid": other, "shared_segments": segments, "shared_nodes": nodes}
+                    for other, (segments, nodes) in sorted(conflicts.items())
+                ],
+            },
+        )
+
     def on_clearance_cancel(self, pilot_sid: str):
         sid = request.sid
         try:
@@ -733,8 +1190,9 @@ class SocketManager:
             self.metrics.record_error()
             return
 
+        facility = self._facility(sid)
         try:
-            pilot = self.pilots.get(pilot_sid)
+            pilot = self._facility_pilot(facility, pilot_sid)
         except KeyError:
             self._emit(sid, ERROR_SEND, {"message": f"Pilot with SID {pilot_sid} does not exist"})
             logger.log_error(pilot_id=sid, context="CLEARANCE", error=f"Pilot not found: {pilot_sid}")
@@ -742,14 +1200,17 @@ class SocketManager:
             return
 
         try:
+            facility.simulation.stop_taxi(pilot.sid)
             pilot.init_clearances()
 
             self._emit(
-                ATC_ROOM,
+                facility.atc_room,
                 CLEARANCE_CANCELLED,
                 {
                     "pilot_sid": pilot.sid,
-                    "clearances": pilot.clearances,
+                    "clearances": {
+                        kind: self._encode_clearance(clearance) for kind, clearance in pilot.clearances.items()
+                    },
                 },
             )
 
@@ -775,7 +1236,7 @@ class SocketManager:
             return
 
         try:
-            pilot = self.pilots.get(pilot_sid)
+            pilot = self._facility_pilot(self._facility(sid), pilot_sid)
         except KeyError:
             self._emit(sid, ERROR_SEND, {"message": f"Pilot with SID {pilot_sid} does not exist"})
             logger.log_error(pilot_id=sid, context="CLEARANCE", error=f"Pilot not found: {pilot_sid}")
@@ -787,4 +1248,69 @@ class SocketManager:
         else:
             atc.selected_aircraft_id = pilot.sid
 
-        self._emit(ATC_ROOM, ATC_LIST_SEND, self.atc_manager.get_all())
\ No newline at end of file
+        self._emit(pilot.atc_room, ATC_LIST_SEND, self.atc_manager.get_all(pilot.facility))
+
+    ## === EDGE CLOSURES
+    def on_close_edges(self, payload: dict):
+        self._handle_closure(payload, close=True)
+
+    def on_reopen_edges(self, payload: dict | None = None):
+        self._handle_closure(payload, close=False)
+
+    def _handle_closure(self, payload: dict | None, close: bool) -> None:
+        sid = request.sid
+        if not self.atc_manager.exists(sid):
+            self._emit(sid, ERROR_SEND, {"message": "ATC not connected"})
+            logger.log_error(pilot_id=sid, context="CLOSURE", error="ATC not connected")
+            self.metrics.record_error()
+            return
+
+        facility = self._facility(sid)
+        engine = facility.engine
+        pilots = self.pilots.get_all_pilots(facility.icao)
+        try:
+            if close:
+                changed = engine.close_edges(self._resolve_edges(payload, engine))
+                # only routes crossing a closed edge can change
+                affected = [p for p in pilots if not changed.isdisjoint(p.active_route_edges())]
+            else:
+                # no name or ids: reopen everything
+                edges = self._resolve_edges(payload, engine) if payload else list(engine.closed_edges)
+                changed = engine.reopen_edges(edges)
+                # a reopened edge may shorten any route
+                affected = [p for p in pilots if p.active_route_edges()] if changed else []
+
+        except ValueError as e:
+            self._emit(sid, ERROR_SEND, {"message": str(e)})
+            logger.log_error(pilot_id=sid, context="CLOSURE", error=str(e))
+            self.metrics.record_error()
+            return
+
+        graph = engine.graph
+        self._emit(
+            facility.atc_room,
+            EDGE_CLOSURES_SEND,
+            {
+                "closed_edges": sorted(engine.closed_edges),
+                "closed_names": sorted({graph.label_of(edge) for edge in engine.closed_edges}),
+            },
+        )
+
+        for pilot in affected:
+            self._propose_clearance(pilot, "route_change", reply_sid=sid, only_if_changed=True)
+
+    def _resolve_edges(self, payload: dict | None, engine: ClearanceEngine) -> list[int]:
+        payload = payload if isinstance(payload, dict) else {}
+
+        name = payload.get("name")
+        if name:
+            edges = engine.edges_named(str(name))
+            if not edges:
+                raise ValueError(f"No taxiway or runway named {name}")
+            return edges
+
+        edges = payload.get("edges")
+        if isinstance(edges, list) and edges:
+            return edges
+
+        raise ValueError("Missing edge name or ids")
@@ -0,0 +1,44 @@
+import argparse
+import os
+
+from app.preconvert.converter import convert_airports
+
+MAX_LISTED_FAILURES = 20
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert apt.dat airports into the airport cache ahead of time (resumable)."
+    )
+    parser.add_argument("--icao", action="append", default=[], help="Airport to convert (repeatable).")
+    parser.add_argument("--prefix", action="append", default=[], help="Convert every ICAO starting with this (repeatable).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=16, help="Airports handed to a worker at once.")
+    parser.add_argument("--graphs", action="store_true", help="Also compile the taxi graph artifacts.")
+    parser.add_argument("--force", action="store_true", help="Reconvert airports that are already cached.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = convert_airports(
+        icaos=args.icao,
+        prefixes=args.prefix,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        force=args.force,
+        graphs=args.graphs,
+    )
+
+    print(
+        f"[Preconvert] Converted {report.converted} airports in {report.elapsed_s:.1f}s "
+        f"({report.throughput:.1f}/s), {report.skipped} skipped, {len(report.failures)} failed"
+    )
+    for icao, error in list(report.failures.items())[:MAX_LISTED_FAILURES]:
+        print(f" - {icao}: {error}")
+    if len(report.failures) > MAX_LISTED_FAILURES:
+        print(f" ... and {len(report.failures) - MAX_LISTED_FAILURES} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Bulk conversion of apt.dat into the airport cache.
+
+The AptIndex scan is the only pass over the whole file. Airports still missing
+from the cache are sorted by byte offset and handed to a process pool in
+contiguous chunks; every worker memory-maps apt.dat, parses its slices and
+writes the cache entry (<ICAO>.map and <ICAO>.tiles, plus <ICAO>.graph with
+`graphs`) itself, so nothing but ICAO codes and error strings crosses process
+boundaries. Cache files are replaced atomically, which makes an interrupted
+run resumable: the next run skips what is already cached.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable, Optional
+
+from app.classes.airport_cache import AirportCache
+from app.classes.apt_index import AptIndex
+from app.classes.apt_parser import APTParser
+from app.classes.taxi_graph import TaxiGraph
+
+PROGRESS_INTERVAL_S = 2.0
+
+# per worker process, set up once by _init_worker
+_parser: Optional[APTParser] = None
+_cache: Optional[AirportCache] = None
+_graphs = False
+
+
+@dataclass
+class ConversionReport:
+    selected: int = 0
+    skipped: int = 0
+    converted: int = 0
+    failures: dict[str, str] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+    interrupted: bool = False
+
+    @property
+    def throughput(self) -> float:
+        return self.converted / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def select_icaos(index: AptIndex, icaos: Iterable[str] = (), prefixes: Iterable[str] = ()) -> list[str]:
+    """Indexed ICAOs matching the filters (everything without filters), in file order."""
+    wanted = {icao.upper() for icao in icaos}
+    starts = tuple(prefix.upper() for prefix in prefixes)
+
+    selected = [
+        icao for icao in index.airports
+        if (not wanted and not starts) or icao in wanted or (starts and icao.startswith(starts))
+    ]
+    return sorted(selected, key=lambda icao: index.airports[icao][0])
+
+
+def _init_worker(cache_dir: str, graphs: bool) -> None:
+    global _parser, _cache, _graphs
+    _parser = APTParser()
+    _cache = AirportCache(Path(cache_dir), verbose=False)
+    _graphs = graphs
+
+
+def _convert(icao: str) -> tuple[str, Optional[str]]:
+    assert _parser is not None and _cache is not None
+    try:
+        map_data = _parser.parse_airport(icao)
+        _cache.write(icao, map_data, _parser.source_of(icao))
+        if _graphs:
+            _cache.save_graph(icao, TaxiGraph.from_airport_map(map_data))
+        return icao, None
+    except Exception as e:
+        return icao, str(e) or type(e).__name__
+
+
+def convert_airports(
+    icaos: Iterable[str] = (),
+    prefixes: Iterable[str] = (),
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+    force: bool = False,
+    graphs: bool = False,
+    cache_dir: Optional[Path] = None,
+) -> ConversionReport:
+    index = AptIndex.load_or_build(APTParser.APT_FILE_PATH)
+    cache = AirportCache(cache_dir, verbose=False) if cache_dir else AirportCache(verbose=False)
+
+    selected = select_icaos(index, icaos, prefixes)
+    pending = selected if force else [icao for icao in selected if icao not in cache.available_icaos]
+    report = ConversionReport(selected=len(selected), skipped=len(selected) - len(pending))
+
+    missing = {icao.upper() for icao in icaos} - set(index.airports)
+    for icao in sorted(missing):
+        report.failures[icao] = "not found in apt.dat"
+
+    print(f"[Preconvert] {len(selected)} airports selected, {report.skipped} already cached, {len(pending)} to convert")
+    if not pending:
+        return report
+
+    started = perf_counter()
+    last_report = started
+    pool = Pool(workers, initializer=_init_worker, initargs=(str(cache.cache_dir), graphs))
+    try:
+        for icao, error in pool.imap_unordered(_convert, pending, chunksize=chunksize):
+            if error is None:
+                report.converted += 1
+            else:
+                report.failures[icao] = error
+
+            now = perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL_S:
+                last_report = now
+                done = report.converted + len(report.failures) - len(missing)
+                rate = done / (now - started)
+                eta_s = (len(pending) - done) / rate if rate else 0.0
+                print(
+                    f"[Preconvert] {done}/{len(pending)} airports, {rate:.1f}/s, "
+                    f"{len(report.failures) - len(missing)} failed, ~{eta_s:.0f}s left"
+                )
+        pool.close()
+
+    except KeyboardInterrupt:
+        report.interrupted = True
+        pool.terminate()
+        print("[Preconvert] Interrupted; run again to resume from the airports already cached")
+
+    finally:
+        pool.join()
+        report.elapsed_s = perf_counter() - started
+
+    return report
@@ -1 +1,2 @@
-from .general import general_bp
\ No newline at end of file
+from .general import general_bp
+from .maps import maps_bp
@@ -0,0 +1,62 @@
+import gzip
+from typing import Callable, Optional
+from flask import Blueprint, Response, jsonify, request
+from app.managers import AirportRegistry
+from app.utils.constants import AIRPORT_MAP_PATH
+
+maps_bp = Blueprint("maps", __name__)
+airport_registry : Optional[AirportRegistry] = None
+
+def _not_loaded(icao: str):
+    return jsonify({"message": f"Airport {icao.upper()} is not loaded"}), 404
+
+def _conditional(body: Callable[[], bytes], etag: str, encoding: Optional[str]) -> Response:
+    # `body` is only produced when the client does not hold `etag` already
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body(), mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(etag)
+    # cached by the browser, but revalidated on every use: a reload costs a 304
+    response.headers["Cache-Control"] = "no-cache"
+    response.vary.add("Accept-Encoding")
+    return response
+
+@maps_bp.get(f"{AIRPORT_MAP_PATH}/<icao>")
+def airport_map(icao: str):
+    # only airports in use are served: sessions load them, not map fetches
+    facility = airport_registry.get(icao) if airport_registry else None
+    if facility is None:
+        return _not_loaded(icao)
+
+    payload = facility.map_payload
+    encoding = payload.negotiate(request.accept_encodings)
+    return _conditional(lambda: payload.body(encoding), payload.etag(encoding), encoding)
+
+@maps_bp.get(f"{AIRPORT_MAP_PATH}/<icao>/tiles")
+def airport_tile_index(icao: str):
+    facility = airport_registry.get(icao) if airport_registry else None
+    if facility is None:
+        return _not_loaded(icao)
+    return jsonify(facility.tiles.index())
+
+@maps_bp.get(f"{AIRPORT_MAP_PATH}/<icao>/tiles/<int:z>/<int:x>/<int:y>")
+def airport_tile(icao: str, z: int, x: int, y: int):
+    facility = airport_registry.get(icao) if airport_registry else None
+    if facility is None:
+        return _not_loaded(icao)
+
+    tiles = facility.tiles
+    tile = tiles.tile(z, x, y)
+    if tile is None:
+        return jsonify({"message": f"No tile {z}/{x}/{y} at {facility.icao}"}), 404
+
+    # tiles are stored gzip-compressed
+    encoding = "gzip" if "gzip" in request.accept_encodings else None
+    etag = f"{tiles.version}-{z}.{x}.{y}"
+    if encoding:
+        return _conditional(lambda: tile, f"{etag}-{encoding}", encoding)
+    return _conditional(lambda: gzip.decompress(tile), etag, None)
@@ -2,7 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from threading import Lock
 from time import perf_counter_ns
-from typing import Any
+from typing import Any, Callable
 from app.utils.socket_constants import ATC_ROOM
 
 def percentile(values: list[float], pct: float) -> float | None:
@@ -48,8 +48,19 @@ class SystemMetrics:
 
     def __init__(self) -> None:
         self._lock = Lock()
+        self._sources: dict[str, tuple[Callable[[], Any], Callable[[], None] | None]] = {}
         self.reset()
 
+    def register_source(
+        self,
+        name: str,
+        snapshot: Callable[[], Any],
+        reset: Callable[[], None] | None = None,
+    ) -> None:
+        """Expose another component's counters under `name` in snapshot()."""
+        with self._lock:
+            self._sources[name] = (snapshot, reset)
+
     def reset(self) -> None:
         with self._lock:
             self.total_messages = 0
@@ -57,6 +68,11 @@ class SystemMetrics:
             self.role_counts: dict[str, int] = {}
             self.delivered_counts: dict[str, int] = {}
             self.server_processing_ms = LatencyRecorder()
+            sources = list(self._sources.values())
+
+        for _, reset in sources:
+            if reset:
+                reset()
 
     def start_timer(self) -> int:
         return perf_counter_ns()
@@ -73,7 +89,8 @@ class SystemMetrics:
         if room is None:
             return
 
-        target = "atc_room" if room == ATC_ROOM else "pilot"
+        # per-airport rooms are "atc_room:<ICAO>"
+        target = "atc_room" if room.startswith(ATC_ROOM) else "pilot"
 
         with self._lock:
             self.delivered_counts[target] = self.delivered_counts.get(target, 0) + 1
@@ -84,10 +101,16 @@ class SystemMetrics:
 
     def snapshot(self) -> dict[str, Any]:
         with self._lock:
-            return {
+            snapshot = {
                 "total_messages": self.total_messages,
                 "total_errors": self.total_errors,
                 "role_counts": dict(self.role_counts),
                 "delivered_counts": dict(self.delivered_counts),
                 "server_processing_ms": self.server_processing_ms.snapshot(),
-            }
\ No newline at end of file
+            }
+            sources = list(self._sources.items())
+
+        for name, (source_snapshot, _) in sources:
+            snapshot[name] = source_snapshot()
+
+        return snapshot
\ No newline at end of file
@@ -80,24 +80,19 @@ def _validate_state(pilots: list[Any], atc_list: list[Any]) -> list[str]:
     return issues
 
 
-def _clear_benchmark_state(pilot_manager, atc_manager) -> dict[str, int]:
+def _clear_benchmark_state(pilot_manager, atc_manager, socket_manager) -> dict[str, int]:
     pilots_before = len(pilot_manager.get_all_pilots())
     atc_before = len(atc_manager.get_all_sids())
 
-    for pilot in list(pilot_manager.get_all_pilots()):
-        sid = getattr(pilot, "sid", None)
+    # through the socket manager: sessions are also unbound from their airport and stop taxiing
+    sids = [getattr(pilot, "sid", None) for pilot in pilot_manager.get_all_pilots()] + list(atc_manager.get_all_sids())
+    for sid in sids:
         if sid:
             try:
-                pilot_manager.remove(sid)
+                socket_manager.drop_session(sid)
             except Exception:
                 pass
 
-    for sid in list(atc_manager.get_all_sids()):
-        try:
-            atc_manager.remove(sid)
-        except Exception:
-            pass
-
     pilots_after = len(pilot_manager.get_all_pilots())
     atc_after = len(atc_manager.get_all_sids())
 
@@ -113,11 +108,12 @@ def register_benchmark_observability(
     app: Flask,
     pilot_manager,
     atc_manager,
+    socket_manager,
     metrics_store,
 ) -> None:
     @app.post("/testing/benchmark/reset")
     def benchmark_reset():
-        state_reset = _clear_benchmark_state(pilot_manager, atc_manager)
+        state_reset = _clear_benchmark_state(pilot_manager, atc_manager, socket_manager)
         metrics_store.reset()
         return jsonify({
             "ok": True,
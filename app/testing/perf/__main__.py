@@ -0,0 +1,38 @@
+import argparse
+
+from app.testing.perf import alternatives, apt_parse, cold_start, contraction, map_cache, map_http, map_tiles, position_stream, route_encoding, routing, runway_trees, simulation
+
+BENCHMARKS = {
+    "alternatives": alternatives.run,
+    "apt_parse": apt_parse.run,
+    "cold_start": cold_start.run,
+    "contraction": contraction.run,
+    "map_cache": map_cache.run,
+    "map_http": map_http.run,
+    "map_tiles": map_tiles.run,
+    "position_stream": position_stream.run,
+    "route_encoding": route_encoding.run,
+    "routing": routing.run,
+    "runway_trees": runway_trees.run,
+    "simulation": simulation.run,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks (no server needed).")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        "--icao",
+        action="append",
+        help="Airport to include (repeatable). Defaults to every bundled airport in app/data.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Cost of Yen k-shortest alternatives versus k, per airport.
+
+Every query asks for k alternatives between a parking position and a runway
+end. The first route is computed beforehand, as it would come from the route
+cache, so the timings cover the spur searches only.
+"""
+from __future__ import annotations
+
+from app.classes.clearance import ClearanceEngine, RouteResult
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.testing.perf.routing import route_queries
+
+K_VALUES = (1, 2, 3, 5, 8)
+MAX_QUERIES = 60  # evenly sampled parking -> runway queries per airport
+
+HEADERS = [
+    "icao",
+    "k",
+    "queries",
+    "routes_found",
+    "ms_per_query",
+    "ms_per_extra_route",
+]
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        engine = ClearanceEngine(load_map(icao))
+        queries = route_queries(engine)
+        queries = queries[::max(len(queries) // MAX_QUERIES, 1)][:MAX_QUERIES]
+
+        firsts: list[tuple[int, RouteResult]] = []
+        for start, goal in queries:
+            first = engine.compute_route((start, goal))
+            if first is not None and first.edges:
+                firsts.append((start, first))
+
+        for k in K_VALUES:
+            found, elapsed_ms = time_ms(lambda: [
+                1 + len(engine.compute_alternatives(start, first, k)) if k > 1 else 1
+                for start, first in firsts
+            ])
+            total = sum(found)
+            extra = total - len(firsts)
+
+            rows.append([
+                icao,
+                k,
+                len(firsts),
+                total,
+                elapsed_ms / max(len(firsts), 1),
+                elapsed_ms / extra if extra else 0.0,
+            ])
+
+    print_table("Yen k-shortest alternatives: cost vs k", HEADERS, rows)
+    print(f"Saved in: {write_csv('alternatives', HEADERS, rows)}")
+    return rows
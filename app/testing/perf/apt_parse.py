@@ -0,0 +1,174 @@
+"""
+apt.dat airport parsing: the previous per-section walks (one pass over
+`airport.text` per section plus the library's taxi network) vs the single
+row-code dispatch pass of `APTParser.build_map`.
+
+apt.dat itself is not bundled, so each airport's source record is rebuilt from
+its bundled JSON map (rows 1, 100, 102, 1201, 1202 and 1300) and used as the
+fixture. Every timed run parses a fresh `Airport`, since its lines, text and
+taxi network are cached on first use.
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+
+from xplane_airports.AptDat import AptDat, AptDatLine, RowCode
+
+from app.classes.apt_parser import APTParser
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.utils.types import AirportMapData
+
+REPEATS = 5
+
+HEADERS = [
+    "icao",
+    "rows",
+    "taxiways",
+    "legacy_ms",
+    "single_pass_ms",
+    "speedup",
+    "same_output",
+]
+
+
+def apt_record(airport_map: AirportMapData) -> str:
+    """apt.dat text of one airport, rebuilt from its JSON map."""
+    info = airport_map["airport_info"]
+    lines = ["I", "1100 Generated by WorldEditor from the bundled JSON map", "", f"1 {info['elevation']} 0 0 {info['icao']} {info['name']}"]
+
+    for runway in airport_map["runways"]:
+        ends = []
+        for name, (lat, lon) in zip(runway["name"].split("/"), (runway["start"], runway["end"])):
+            ends.append(f"{name} {lat} {lon} 0.00 0.00 2 0 0 0")
+        lines.append(f"100 {runway['width']} {runway['surface']} 0 0.25 0 0 0 {ends[0]} {ends[1]}")
+
+    for helipad in airport_map["helipads"]:
+        lat, lon = helipad["location"]
+        lines.append(f"102 {helipad['name']} {lat} {lon} {helipad['heading']} {helipad['length']} {helipad['width']} 1 0 0 0.25 0")
+
+    nodes: Dict[Tuple[float, float], int] = {}
+    for taxiway in airport_map["taxiways"]:
+        for lat, lon in (taxiway["start"], taxiway["end"]):
+            if (lat, lon) not in nodes:
+                nodes[(lat, lon)] = len(nodes)
+                lines.append(f"1201 {lat} {lon} both {nodes[(lat, lon)]} n{nodes[(lat, lon)]}")
+    for taxiway in airport_map["taxiways"]:
+        kind = "runway" if taxiway["is_runway"] else f"taxiway_{taxiway['width']}"
+        direction = "oneway" if taxiway["one_way"] else "twoway"
+        name = "" if taxiway["name"] == "-" else taxiway["name"]
+        lines.append(f"1202 {nodes[tuple(taxiway['start'])]} {nodes[tuple(taxiway['end'])]} {direction} {kind} {name}".rstrip())
+
+    for parking in airport_map["parking"]:
+        lat, lon = parking["location"]
+        lines.append(f"1300 {lat} {lon} {parking['heading']} {parking['type']} jets|turboprops {parking['name']}")
+
+    lines.append("99")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_parse(airport) -> AirportMapData:
+    """`APTParser.parse_airport` before the single pass: one walk per section."""
+    runways = []
+    for line in airport.text:
+        if isinstance(line, AptDatLine) and line.tokens:
+            code = line.tokens[0]
+            if isinstance(code, RowCode):
+                code = code.value
+            if code == RowCode.LAND_RUNWAY:
+                try:
+                    tokens = line.tokens
+                    runways.append({
+                        "name": f"{tokens[8]}/{tokens[17]}",
+                        "start": (float(tokens[9]), float(tokens[10])),
+                        "end": (float(tokens[18]), float(tokens[19])),
+                        "width": float(tokens[1]),
+                        "surface": int(tokens[2])
+                    })
+                except Exception:
+                    continue
+
+    helipads = []
+    for line in airport.text:
+        if line.is_runway() and line.runway_type == RowCode.HELIPAD:
+            tokens = line.tokens
+            helipads.append({
+                "name": tokens[1],
+                "location": (float(tokens[2]), float(tokens[3])),
+                "heading": float(tokens[4]),
+                "length": float(tokens[5]),
+                "width": float(tokens[6]),
+            })
+
+    taxiways = []
+    network = airport.taxi_network
+    for edge in network.edges:
+        start = network.nodes[edge.node_begin]
+        end = network.nodes[edge.node_end]
+        taxiways.append({
+            "name": edge.name or "-",
+            "start": (start.lat, start.lon),
+            "end": (end.lat, end.lon),
+            "is_runway": edge.is_runway,
+            "one_way": edge.one_way,
+            "width": edge.icao_width.name if edge.icao_width else "C"
+        })
+
+    parking = []
+    for line in airport.text:
+        if isinstance(line, AptDatLine) and line.tokens:
+            code = line.tokens[0]
+            if isinstance(code, RowCode):
+                code = code.value
+            if int(code) == 1300:
+                tokens = line.tokens
+                parking.append({
+                    "location": (float(tokens[1]), float(tokens[2])),
+                    "heading": float(tokens[3]),
+                    "type": APTParser.sanitize_parking_type(str(tokens[4])),
+                    "name": " ".join(str(t) for t in tokens[6:]) if len(tokens) > 6 else "Unnamed"
+                })
+
+    return {
+        "runways": runways,
+        "helipads": helipads,
+        "taxiways": taxiways,
+        "parking": parking,
+        "airport_info": {
+            "icao": airport.id,
+            "name": airport.name,
+            "elevation": airport.elevation_ft_amsl,
+        }
+    }
+
+
+def best_ms(record: str, parse) -> Tuple[AirportMapData, float]:
+    best = float("inf")
+    result = None
+    for _ in range(REPEATS):
+        airport = AptDat.from_file_text(record, None).airports[0]
+        airport.tokenized_lines  # tokenizing belongs to the record read, not to either parser
+        result, elapsed_ms = time_ms(lambda: parse(airport))
+        best = min(best, elapsed_ms)
+    return result, best
+
+
+def run(args) -> List[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        record = apt_record(load_map(icao))
+        legacy, legacy_ms = best_ms(record, legacy_parse)
+        single, single_ms = best_ms(record, APTParser.build_map)
+
+        rows.append([
+            icao,
+            record.count("\n"),
+            len(single["taxiways"]),
+            legacy_ms,
+            single_ms,
+            legacy_ms / single_ms if single_ms else 0.0,
+            legacy == single,
+        ])
+
+    print_table(f"apt.dat airport parse: per-section walks vs single pass (best of {REPEATS})", HEADERS, rows)
+    print(f"Saved in: {write_csv('apt_parse', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,53 @@
+"""
+Cold start of the routing engine: compiling the taxi graph from the JSON map
+vs memory-mapping the compiled graph artifact.
+"""
+from __future__ import annotations
+import hashlib
+import tempfile
+from pathlib import Path
+
+from app.classes.clearance import ClearanceEngine
+from app.classes.graph_artifact import read_graph_artifact, write_graph_artifact
+from app.classes.taxi_graph import TaxiGraph
+from app.testing.perf.common import DATA_DIR, bundled_icaos, load_map, print_table, time_ms, write_csv
+
+HEADERS = [
+    "icao",
+    "nodes",
+    "half_edges",
+    "artifact_kib",
+    "engine_from_json_ms",
+    "engine_from_artifact_ms",
+    "speedup",
+]
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for icao in args.icao or bundled_icaos():
+            airport_map = load_map(icao)
+            digest = hashlib.sha1((DATA_DIR / f"{icao}.json").read_bytes()).hexdigest()
+            artifact = Path(tmp) / f"{icao}.graph"
+            write_graph_artifact(artifact, TaxiGraph.from_airport_map(airport_map), digest)
+
+            built, built_ms = time_ms(lambda: ClearanceEngine(airport_map))
+            _, loaded_ms = time_ms(
+                lambda: ClearanceEngine(airport_map, graph=read_graph_artifact(artifact, digest))
+            )
+
+            rows.append([
+                icao,
+                built.graph.node_count,
+                built.graph.edge_count,
+                artifact.stat().st_size / 1024,
+                built_ms,
+                loaded_ms,
+                built_ms / loaded_ms if loaded_ms else 0.0,
+            ])
+
+    print_table("Routing engine cold start: JSON compile vs graph artifact", HEADERS, rows)
+    print(f"Saved in: {write_csv('cold_start', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Callable
+
+from app.testing.benchmark.defaults import RESULTS_ROOT
+from app.utils.types import AirportMapData
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+PERF_RESULTS_ROOT = RESULTS_ROOT / "perf"
+
+
+def bundled_icaos() -> list[str]:
+    return sorted(f.stem.upper() for f in DATA_DIR.glob("*.json") if f.is_file())
+
+
+def load_map(icao: str) -> AirportMapData:
+    with (DATA_DIR / f"{icao.upper()}.json").open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def time_ms(fn: Callable[[], Any]) -> tuple[Any, float]:
+    start_ns = perf_counter_ns()
+    result = fn()
+    return result, (perf_counter_ns() - start_ns) / 1_000_000.0
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def print_table(title: str, headers: list[str], rows: list[list[Any]]) -> None:
+    cells = [[_fmt(value) for value in row] for row in rows]
+    widths = [
+        max([len(header)] + [len(row[i]) for row in cells])
+        for i, header in enumerate(headers)
+    ]
+
+    print()
+    print(title)
+    print("  ".join(header.ljust(widths[i]) for i, header in enumerate(headers)))
+    print("  ".join("-" * width for width in widths))
+    for row in cells:
+        print("  ".join(value.ljust(widths[i]) for i, value in enumerate(row)))
+    print()
+
+
+def write_csv(name: str, headers: list[str], rows: list[list[Any]]) -> Path:
+    PERF_RESULTS_ROOT.mkdir(parents=True, exist_ok=True)
+    path = PERF_RESULTS_ROOT / f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}__{name}.csv"
+
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow([_fmt(value) for value in row])
+
+    return path
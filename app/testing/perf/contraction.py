@@ -0,0 +1,55 @@
+"""
+Contraction hierarchy preprocessing cost and query speedup over A*, per airport.
+
+Both engines answer the same parking -> runway end queries with the route
+cache bypassed; `same_routes` checks the unpacked edge sequences match.
+"""
+from __future__ import annotations
+
+from app.classes.clearance import ClearanceEngine
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.testing.perf.routing import route_queries
+
+HEADERS = [
+    "icao",
+    "nodes",
+    "half_edges",
+    "shortcuts",
+    "preprocess_ms",
+    "queries",
+    "astar_us_per_query",
+    "ch_us_per_query",
+    "speedup",
+    "same_routes",
+]
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        airport_map = load_map(icao)
+
+        search_engine = ClearanceEngine(airport_map, routing_mode="search")
+        ch_engine = ClearanceEngine(airport_map, routing_mode="ch", graph=search_engine.graph)
+
+        queries = route_queries(search_engine)
+        astar, astar_ms = time_ms(lambda: [search_engine._find_path(s, g) for s, g in queries])
+        ch, ch_ms = time_ms(lambda: [ch_engine._find_path(s, g) for s, g in queries])
+
+        rows.append([
+            icao,
+            search_engine.graph.node_count,
+            search_engine.graph.edge_count,
+            int(ch_engine.precompute_stats["shortcuts"]),
+            ch_engine.precompute_stats["build_ms"],
+            len(queries),
+            astar_ms * 1000 / max(len(queries), 1),
+            ch_ms * 1000 / max(len(queries), 1),
+            astar_ms / ch_ms if ch_ms else 0.0,
+            all(a[1] == b[1] for a, b in zip(astar, ch)),
+        ])
+
+    print_table("Routing: A* vs contraction hierarchy", HEADERS, rows)
+    print(f"Saved in: {write_csv('contraction', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,90 @@
+"""
+Airport map cache: the JSON file vs the columnar map archive (.map).
+
+Load times are the best of REPEATS; memory is what tracemalloc still holds
+once the map is loaded. The archive is measured just opened, with only the
+taxiway section built (what the routing engine reads), and fully built.
+"""
+from __future__ import annotations
+import gc
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+from app.classes.map_archive import SECTIONS, read_map_archive, write_map_archive
+from app.testing.perf.common import DATA_DIR, bundled_icaos, load_map, print_table, time_ms, write_csv
+
+REPEATS = 5
+
+HEADERS = [
+    "icao",
+    "json_kib",
+    "archive_kib",
+    "json_load_ms",
+    "archive_open_ms",
+    "archive_taxiways_ms",
+    "archive_full_ms",
+    "json_mem_kib",
+    "archive_open_mem_kib",
+    "archive_taxiways_mem_kib",
+    "archive_full_mem_kib",
+    "same_data",
+]
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def materialize(archive_path: Path, sections: Tuple[str, ...]) -> Any:
+    loaded = read_map_archive(archive_path)
+    for section in sections:
+        loaded[section]
+    return loaded
+
+
+def best_ms(fn: Callable[[], Any]) -> float:
+    return min(time_ms(fn)[1] for _ in range(REPEATS))
+
+
+def held_kib(fn: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held / 1024
+
+
+def run(args) -> List[list]:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for icao in args.icao or bundled_icaos():
+            json_path = DATA_DIR / f"{icao}.json"
+            archive_path = Path(tmp) / f"{icao}.map"
+            write_map_archive(archive_path, load_map(icao))
+
+            taxiways = ("taxiways",)
+            rows.append([
+                icao,
+                json_path.stat().st_size / 1024,
+                archive_path.stat().st_size / 1024,
+                best_ms(lambda: load_json(json_path)),
+                best_ms(lambda: materialize(archive_path, ())),
+                best_ms(lambda: materialize(archive_path, taxiways)),
+                best_ms(lambda: materialize(archive_path, SECTIONS)),
+                held_kib(lambda: load_json(json_path)),
+                held_kib(lambda: materialize(archive_path, ())),
+                held_kib(lambda: materialize(archive_path, taxiways)),
+                held_kib(lambda: materialize(archive_path, SECTIONS)),
+                dict(read_map_archive(archive_path)) == load_json(json_path),
+            ])
+
+    print_table(f"Airport map cache: JSON vs map archive (best of {REPEATS})", HEADERS, rows)
+    print(f"Saved in: {write_csv('map_cache', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,142 @@
+"""
+Airport map delivery to a burst of ATC clients fetching it at once (e.g. every
+controller reconnecting after a network blip).
+
+"encode_per_client" is the previous socket path: the map is JSON-encoded for
+every request. "pre_encoded" is the HTTP route serving the gzip body built
+once per map version, and "revalidated" the same route hit by clients that
+already hold that version (If-None-Match, answered 304). The server is a
+threaded werkzeug server in this process; each burst is CLIENTS requests
+released together, and the best of BURSTS is kept.
+"""
+from __future__ import annotations
+import http.client
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter_ns
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, Response
+from werkzeug.serving import make_server
+
+from app.classes.map_payload import MapPayload
+from app.routes import maps
+from app.testing.perf.common import bundled_icaos, load_map, print_table, write_csv
+from app.utils.constants import AIRPORT_MAP_PATH
+
+CLIENTS = 50
+BURSTS = 3
+LEGACY_PATH = "/legacy-maps"
+
+HEADERS = [
+    "icao",
+    "clients",
+    "mode",
+    "kib_per_client",
+    "burst_ms",
+    "p50_ms",
+    "p95_ms",
+]
+
+
+class StaticRegistry:
+    """What the map route reads from AirportRegistry: facilities by ICAO."""
+
+    def __init__(self):
+        self.facilities: Dict[str, SimpleNamespace] = {}
+
+    def get(self, icao: str) -> Optional[SimpleNamespace]:
+        return self.facilities.get(icao.upper())
+
+
+def build_app(registry: StaticRegistry, maps_by_icao: Dict[str, dict]) -> Flask:
+    app = Flask(__name__)
+    maps.airport_registry = registry
+    app.register_blueprint(maps.maps_bp)
+
+    @app.get(f"{LEGACY_PATH}/<icao>")
+    def legacy_map(icao: str):
+        return Response(json.dumps(maps_by_icao[icao]), mimetype="application/json")
+
+    return app
+
+
+def fetch(port: int, path: str, headers: Dict[str, str], start: threading.Barrier) -> Tuple[float, int, int]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.connect()
+    start.wait()
+    started = perf_counter_ns()
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    elapsed_ms = (perf_counter_ns() - started) / 1_000_000.0
+    conn.close()
+    return elapsed_ms, response.status, len(body)
+
+
+def burst(port: int, path: str, headers: Dict[str, str]) -> Tuple[float, List[float], int]:
+    start = threading.Barrier(CLIENTS + 1)
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        futures = [pool.submit(fetch, port, path, headers, start) for _ in range(CLIENTS)]
+        start.wait()
+        started = perf_counter_ns()
+        results = [future.result() for future in futures]
+        burst_ms = (perf_counter_ns() - started) / 1_000_000.0
+
+    statuses = {status for _, status, _ in results}
+    if not statuses <= {200, 304}:
+        raise RuntimeError(f"Unexpected statuses {sorted(statuses)} for {path}")
+    return burst_ms, [elapsed for elapsed, _, _ in results], results[0][2]
+
+
+def best_burst(port: int, path: str, headers: Dict[str, str]) -> Tuple[float, List[float], int]:
+    return min((burst(port, path, headers) for _ in range(BURSTS)), key=lambda result: result[0])
+
+
+def run(args) -> List[list]:
+    rows = []
+    icaos = args.icao or bundled_icaos()
+    maps_by_icao = {icao: load_map(icao) for icao in icaos}
+
+    registry = StaticRegistry()
+    for icao, map_data in maps_by_icao.items():
+        registry.facilities[icao] = SimpleNamespace(map_payload=MapPayload(icao, map_data))
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, build_app(registry, maps_by_icao), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        for icao in icaos:
+            payload: MapPayload = registry.facilities[icao].map_payload
+            gzip_etag = f'"{payload.etag("gzip")}"'
+            modes = [
+                ("encode_per_client", f"{LEGACY_PATH}/{icao}", {}),
+                ("pre_encoded", f"{AIRPORT_MAP_PATH}/{icao}", {"Accept-Encoding": "gzip"}),
+                ("revalidated", f"{AIRPORT_MAP_PATH}/{icao}", {"Accept-Encoding": "gzip", "If-None-Match": gzip_etag}),
+            ]
+
+            for mode, path, headers in modes:
+                burst_ms, latencies, body_bytes = best_burst(server.port, path, headers)
+                cuts = quantiles(latencies, n=20)
+                rows.append([
+                    icao,
+                    CLIENTS,
+                    mode,
+                    body_bytes / 1024,
+                    burst_ms,
+                    cuts[9],
+                    cuts[18],
+                ])
+    finally:
+        server.shutdown()
+        thread.join()
+
+    print_table(f"Airport map delivery to {CLIENTS} concurrent clients (best of {BURSTS} bursts)", HEADERS, rows)
+    print(f"Saved in: {write_csv('map_http', HEADERS, rows)}")
+    return rows
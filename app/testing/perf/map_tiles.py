@@ -0,0 +1,150 @@
+"""
+Viewport map delivery: quadtree tiles vs the whole pre-encoded map.
+
+Runs on the largest bundled airport (most map rows) unless --icao is given.
+A CANVAS_PX square ATC view is placed at each of ZOOMS around the taxiway
+centroid; the tile level and the tiles covering the view are picked the way
+the ATC client picks them. "first render" is the client's work until it has
+something to draw, through the map routes of a Flask test client: the tile
+requests (sequential here, where a browser runs them in parallel), gunzip,
+JSON decode and the merge of the tiles, vs the same for the whole map.
+"""
+from __future__ import annotations
+import gzip
+import json
+import math
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from app.classes.map_payload import MapPayload
+from app.classes.map_tiles import MapTiles, cut_map_tiles
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.testing.perf.map_http import StaticRegistry, build_app
+from app.utils.constants import AIRPORT_MAP_PATH
+
+REPEATS = 5
+CANVAS_PX = 1200
+ZOOMS = (1, 4, 16)
+SECTIONS = ("runways", "helipads", "taxiways", "parking")
+
+HEADERS = [
+    "icao",
+    "zoom",
+    "level",
+    "tiles",
+    "tiles_kib",
+    "full_kib",
+    "tile_features",
+    "full_features",
+    "tiles_first_render_ms",
+    "full_first_render_ms",
+]
+
+
+def largest_icao() -> str:
+    return max(bundled_icaos(), key=lambda icao: sum(len(load_map(icao)[section]) for section in SECTIONS))
+
+
+def centroid(map_data) -> Tuple[float, float]:
+    points = [point for taxiway in map_data["taxiways"] for point in (taxiway["start"], taxiway["end"])]
+    return sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points)
+
+
+def viewport_tiles(tiles: MapTiles, center: Tuple[float, float], zoom: float) -> Tuple[int, List[str]]:
+    """Level and tiles the ATC client requests for a CANVAS_PX view at `zoom` (1 = whole airport)."""
+    z = min(tiles.max_zoom, max(0, math.floor(math.log2(CANVAS_PX * zoom / tiles.resolution))))
+    count = 2 ** z
+    size = tiles.span / count
+    half = tiles.span / zoom / 2
+    south, west = tiles.bounds[0]
+
+    def cell(value: float, origin: float) -> int:
+        return min(count - 1, max(0, math.floor((value - origin) / size)))
+
+    xs = range(cell(center[1] - half, west), cell(center[1] + half, west) + 1)
+    ys = range(cell(center[0] - half, south), cell(center[0] + half, south) + 1)
+    return z, [f"{z}/{x}/{y}" for x in xs for y in ys]
+
+
+# same identities as the client's merge: features crossing tiles are in each of them
+_IDENTITY = {
+    "runways": lambda r: r["name"],
+    "helipads": lambda h: h["name"],
+    "taxiways": lambda t: (tuple(t["start"]), tuple(t["end"])),
+    "parking": lambda p: tuple(p["location"]),
+}
+
+
+def merge(bodies: List[dict]) -> dict:
+    merged = {section: [] for section in SECTIONS}
+    seen = set()
+    for body in bodies:
+        for section in SECTIONS:
+            identity = _IDENTITY[section]
+            for feature in body.get(section, ()):
+                key = (section, identity(feature))
+                if key not in seen:
+                    seen.add(key)
+                    merged[section].append(feature)
+    return merged
+
+
+def fetch_json(client, path: str) -> Tuple[dict, int]:
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    body = response.data
+    if response.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body), len(response.data)
+
+
+def best_ms(fn) -> Tuple[object, float]:
+    runs = [time_ms(fn) for _ in range(REPEATS)]
+    return runs[0][0], min(elapsed for _, elapsed in runs)
+
+
+def run(args) -> List[list]:
+    rows = []
+    icao = (args.icao or [largest_icao()])[0].upper()
+    map_data = load_map(icao)
+
+    tiles, cut_ms = best_ms(lambda: cut_map_tiles(map_data))
+    registry = StaticRegistry()
+    registry.facilities[icao] = SimpleNamespace(map_payload=MapPayload(icao, map_data), tiles=tiles, icao=icao)
+    client = build_app(registry, {icao: map_data}).test_client()
+    center = centroid(map_data)
+
+    def first_render_full() -> Tuple[dict, int]:
+        return fetch_json(client, f"{AIRPORT_MAP_PATH}/{icao}")
+
+    (full, full_bytes), full_ms = best_ms(first_render_full)
+    full_features = sum(len(full[section]) for section in SECTIONS)
+
+    for zoom in ZOOMS:
+        z, keys = viewport_tiles(tiles, center, zoom)
+
+        def first_render_tiles() -> Tuple[dict, int]:
+            fetched = [fetch_json(client, f"{AIRPORT_MAP_PATH}/{icao}/tiles/{key}") for key in keys]
+            return merge([body for body, _ in fetched]), sum(size for _, size in fetched)
+
+        (merged, tile_bytes), tiles_ms = best_ms(first_render_tiles)
+        rows.append([
+            icao,
+            zoom,
+            z,
+            len(keys),
+            tile_bytes / 1024,
+            full_bytes / 1024,
+            sum(len(merged[section]) for section in SECTIONS),
+            full_features,
+            tiles_ms,
+            full_ms,
+        ])
+
+    print_table(
+        f"Viewport map delivery at {icao}: {len(tiles)} tiles cut in {cut_ms:.1f} ms, "
+        f"{tiles.nbytes / 1024:.0f} KiB (best of {REPEATS})",
+        HEADERS,
+        rows,
+    )
+    print(f"Saved in: {write_csv('map_tiles', HEADERS, rows)}")
+    return rows
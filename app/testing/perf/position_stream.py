@@ -0,0 +1,116 @@
+"""
+Outbound bytes per second per ATC client for taxi position updates.
+
+500 and 2000 aircraft taxi real parking -> runway routes for SIMULATED_S
+seconds (an aircraft that arrives starts over on the next route). Each tick
+is encoded three ways, as JSON the way Socket.IO sends it:
+
+- pilot_views: one {"sid", "plane"} object per taxiing aircraft, the shape
+  PILOT_LIST_SEND would carry
+- float_frames: columnar float frames of every aircraft that moved
+- stream: PositionStream delta frames, at 1 frame per tick and at the
+  slowest rate the adaptive stream falls back to (POSITION_STREAM_MAX_INTERVAL)
+"""
+from __future__ import annotations
+
+import json
+
+from app.classes.clearance import ClearanceEngine
+from app.classes.position_stream import PositionStream
+from app.classes.taxi_simulator import TaxiSimulator
+from app.testing.perf.common import bundled_icaos, load_map, print_table, write_csv
+from app.testing.perf.simulation import route_polylines
+from app.utils.constants import (
+    POSITION_STREAM_MAX_INTERVAL,
+    POSITION_STREAM_MIN_MOVE,
+    POSITION_STREAM_MIN_TURN,
+    POSITION_STREAM_SCALE,
+    SIMULATION_TICK_HZ,
+    TAXI_ACCELERATION_MPS2,
+    TAXI_SPEED_MPS,
+)
+
+AIRCRAFT_COUNTS = (500, 2_000)
+SIMULATED_S = 60
+
+HEADERS = [
+    "icao",
+    "aircraft",
+    "pilot_views_Bps",
+    "float_frames_Bps",
+    "stream_Bps",
+    "stream_slow_Bps",
+    "reduction",
+]
+
+
+def encoded_size(payload) -> int:
+    return len(json.dumps(payload, separators=(",", ":")))
+
+
+def run(args) -> list[list]:
+    rows = []
+    dt = 1.0 / SIMULATION_TICK_HZ
+    ticks = int(SIMULATED_S * SIMULATION_TICK_HZ)
+
+    for icao in args.icao or bundled_icaos():
+        polylines = route_polylines(ClearanceEngine(load_map(icao)))
+        if not polylines:
+            continue
+
+        for count in AIRCRAFT_COUNTS:
+            simulator = TaxiSimulator(TAXI_SPEED_MPS, TAXI_ACCELERATION_MPS2)
+            next_route = {}
+            for i in range(count):
+                simulator.start(f"AC{i}", polylines[i % len(polylines)])
+                next_route[f"AC{i}"] = i + count
+
+            stream = PositionStream(POSITION_STREAM_SCALE, POSITION_STREAM_MIN_MOVE, POSITION_STREAM_MIN_TURN)
+            slow_stream = PositionStream(POSITION_STREAM_SCALE, POSITION_STREAM_MIN_MOVE, POSITION_STREAM_MIN_TURN)
+            totals = {"views": 0, "floats": 0, "stream": 0, "slow": 0}
+
+            for tick in range(ticks):
+                moved = simulator.tick(dt)
+                sids = simulator.sids
+
+                totals["views"] += encoded_size([
+                    {
+                        "sid": sid,
+                        "plane": {
+                            "current_pos": {"name": "TWY", "type": "taxiway", "coord": list(position)},
+                            "current_heading": heading,
+                            "current_speed": speed,
+                        },
+                    }
+                    for sid, position, heading, speed in zip(
+                        sids, simulator.positions.tolist(), simulator.headings.tolist(), simulator.speeds.tolist()
+                    )
+                ])
+                totals["floats"] += encoded_size({
+                    "sids": [sids[slot] for slot in moved.tolist()],
+                    "coords": simulator.positions[moved].tolist(),
+                    "headings": simulator.headings[moved].tolist(),
+                    "speeds": simulator.speeds[moved].tolist(),
+                })
+                totals["stream"] += encoded_size(stream.frame(sids, simulator.positions, simulator.headings))
+                if tick % POSITION_STREAM_MAX_INTERVAL == 0:
+                    totals["slow"] += encoded_size(slow_stream.frame(sids, simulator.positions, simulator.headings))
+
+                for slot in reversed(simulator.arrived().nonzero()[0].tolist()):
+                    sid = sids[slot]
+                    simulator.start(sid, polylines[next_route[sid] % len(polylines)])
+                    next_route[sid] += 1
+
+            rows.append([
+                icao,
+                count,
+                totals["views"] / SIMULATED_S,
+                totals["floats"] / SIMULATED_S,
+                totals["stream"] / SIMULATED_S,
+                totals["slow"] / SIMULATED_S,
+                totals["views"] / totals["stream"] if totals["stream"] else 0.0,
+            ])
+
+    print_table("Position streaming: bytes per second per ATC client", HEADERS, rows)
+    print(f"Saved in: {write_csv('position_stream', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,86 @@
+"""
+Clearance payload size, legacy `coords` vs compact `route`, per airport.
+
+Every parking -> runway end route is turned into the PROPOSED_CLEARANCE_SEND
+payload ATC receives and encoded as JSON the way Socket.IO sends it.
+`max_error_m` is the worst position error after decoding the compact route.
+"""
+from __future__ import annotations
+
+import json
+from math import cos, hypot, radians
+
+from app.classes.clearance import ClearanceEngine
+from app.testing.perf.common import bundled_icaos, load_map, print_table, write_csv
+from app.testing.perf.routing import route_queries
+from app.utils.route_encoding import decode_route, encode_clearance
+
+EARTH_RADIUS_M = 6_371_000.0
+
+HEADERS = [
+    "icao",
+    "routes",
+    "edges_per_route",
+    "segments_per_route",
+    "legacy_bytes",
+    "compact_bytes",
+    "reduction",
+    "max_error_m",
+]
+
+
+def payload_size(pilot_sid: str, clearance) -> int:
+    return len(json.dumps({"pilot_sid": pilot_sid, "clearance": clearance}, separators=(",", ":")))
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        engine = ClearanceEngine(load_map(icao))
+        legacy = compact = edges = segments = 0
+        max_error_m = 0.0
+        routes = 0
+
+        for start, goal in route_queries(engine):
+            _, path_edges = engine._find_path(start, goal)
+            if not path_edges:
+                continue
+
+            locations = engine._build_location_infos(path_edges)
+            clearance = {
+                "kind": "taxi",
+                "instruction": "TAXI VIA " + " ".join(engine._extract_labels(path_edges)),
+                "coords": locations,
+                "issued_at": "12:00:00",
+            }
+            encoded = encode_clearance(clearance, "compact")
+
+            routes += 1
+            edges += len(locations)
+            segments += len(encoded["route"]["segments"])
+            legacy += payload_size("PILOT_SID_PLACEHOLDER", clearance)
+            compact += payload_size("PILOT_SID_PLACEHOLDER", encoded)
+
+            for original, decoded in zip(locations, decode_route(encoded["route"])):
+                (lat, lon), (dlat, dlon) = original["coord"], decoded["coord"]
+                error = hypot(radians(dlat - lat), radians(dlon - lon) * cos(radians(lat))) * EARTH_RADIUS_M
+                max_error_m = max(max_error_m, error)
+
+        if not routes:
+            continue
+
+        rows.append([
+            icao,
+            routes,
+            edges / routes,
+            segments / routes,
+            legacy / routes,
+            compact / routes,
+            legacy / compact,
+            max_error_m,
+        ])
+
+    print_table("Route encoding: PROPOSED_CLEARANCE_SEND payload bytes", HEADERS, rows)
+    print(f"Saved in: {write_csv('route_encoding', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,91 @@
+"""
+A* (predecessor map) vs the previous path-copying Dijkstra, on every bundled airport.
+
+Each airport is queried from every parking position to every runway end.
+"""
+from __future__ import annotations
+from heapq import heappop, heappush
+from typing import List, Tuple
+
+from app.classes.clearance import ClearanceEngine
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+
+HEADERS = [
+    "icao",
+    "queries",
+    "dijkstra_expanded",
+    "astar_expanded",
+    "dijkstra_ms",
+    "astar_ms",
+    "speedup",
+    "same_paths",
+]
+
+
+def legacy_search(engine: ClearanceEngine, start: int, goal: int) -> Tuple[List[int], int]:
+    """Search loop of the original `_find_path`: every heap entry carries a copy of its path."""
+    if engine._is_close(start, goal):
+        return [start], 0
+
+    component = engine.component_of[start]
+    if engine.component_of[goal] != component:
+        goal = engine.component_index[component].nearest(engine.graph.coord(goal))
+
+    graph = engine.graph
+    queue = [(0.0, start, [])]
+    visited = set()
+
+    while queue:
+        cost, current, path = heappop(queue)
+        if current in visited:
+            continue
+
+        visited.add(current)
+        new_path = path + [current]
+
+        if engine._is_close(current, goal):
+            return new_path, len(visited)
+
+        for edge in graph.neighbors(current):
+            neighbor = graph.targets_list[edge]
+            if neighbor not in visited:
+                heappush(queue, (cost + graph.weights_list[edge], neighbor, new_path))
+
+    return [], len(visited)
+
+
+def route_queries(engine: ClearanceEngine) -> list[tuple[int, int]]:
+    airport_map = engine.airport_map
+    starts = [engine._closest_node(engine.to_lonlat(p["location"])) for p in airport_map["parking"]]
+    goals = [
+        engine._closest_node(engine.to_lonlat(rwy[end]))
+        for rwy in airport_map["runways"]
+        for end in ("start", "end")
+    ]
+    return [(start, goal) for start in starts for goal in goals]
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        engine = ClearanceEngine(load_map(icao))
+        queries = route_queries(engine)
+
+        legacy, legacy_ms = time_ms(lambda: [legacy_search(engine, s, g) for s, g in queries])
+        astar, astar_ms = time_ms(lambda: [engine._search(s, g) for s, g in queries])
+
+        rows.append([
+            icao,
+            len(queries),
+            sum(expanded for _, expanded in legacy),
+            sum(expanded for _, _, expanded in astar),
+            legacy_ms,
+            astar_ms,
+            legacy_ms / astar_ms if astar_ms else 0.0,
+            all(a[0] == b[0] for a, b in zip(legacy, astar)),
+        ])
+
+    print_table("Route search: path-copying Dijkstra vs A*", HEADERS, rows)
+    print(f"Saved in: {write_csv('routing', HEADERS, rows)}")
+    return rows
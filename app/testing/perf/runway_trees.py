@@ -0,0 +1,54 @@
+"""
+Startup cost, memory and per-request cost of the two routing modes, per airport.
+
+"search" runs A* on every request; "precomputed" builds one shortest-path tree
+per runway end at startup and only walks it at request time. The route cache is
+bypassed so both columns measure the routing itself.
+"""
+from __future__ import annotations
+
+from app.classes.clearance import ClearanceEngine
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.testing.perf.routing import route_queries
+
+HEADERS = [
+    "icao",
+    "nodes",
+    "search_build_ms",
+    "precomputed_build_ms",
+    "trees",
+    "trees_kib",
+    "queries",
+    "search_us_per_query",
+    "precomputed_us_per_query",
+]
+
+
+def run(args) -> list[list]:
+    rows = []
+
+    for icao in args.icao or bundled_icaos():
+        airport_map = load_map(icao)
+
+        search_engine, search_build_ms = time_ms(lambda: ClearanceEngine(airport_map, routing_mode="search"))
+        tree_engine, tree_build_ms = time_ms(lambda: ClearanceEngine(airport_map, routing_mode="precomputed"))
+
+        queries = route_queries(search_engine)
+        _, search_ms = time_ms(lambda: [search_engine._find_path(s, g) for s, g in queries])
+        _, tree_ms = time_ms(lambda: [tree_engine._find_path(s, g) for s, g in queries])
+
+        rows.append([
+            icao,
+            search_engine.graph.node_count,
+            search_build_ms,
+            tree_build_ms,
+            int(tree_engine.precompute_stats["trees"]),
+            tree_engine.precompute_stats["bytes"] / 1024,
+            len(queries),
+            search_ms * 1000 / max(len(queries), 1),
+            tree_ms * 1000 / max(len(queries), 1),
+        ])
+
+    print_table("Routing modes: on-demand search vs precomputed runway trees", HEADERS, rows)
+    print(f"Saved in: {write_csv('runway_trees', HEADERS, rows)}")
+    return rows
@@ -0,0 +1,102 @@
+"""
+Cost of one TaxiSimulator tick with 1k, 5k and 10k aircraft taxiing at once.
+
+Aircraft follow real parking -> runway routes of the airport, spread over the
+route set round-robin. After the first tick they are spread along their
+routes at taxi speed, so about one in ARRIVAL_SPREAD_TICKS of them arrives
+per tick. Each of the TICKS ticks is then timed in steady state, the way
+SimulationManager runs it: the tick, then the aircraft that arrived leave in
+one `stop_many`, and as many start a full route again, so the traffic stays
+at the same size and the next tick repacks the routes. `rebuild_ms` is the
+one-off cost of packing every route into the shared vertex buffer on the
+first tick.
+"""
+from __future__ import annotations
+
+from statistics import median
+
+import numpy as np
+
+from app.classes.clearance import ClearanceEngine
+from app.classes.taxi_simulator import TaxiSimulator
+from app.testing.perf.common import bundled_icaos, load_map, print_table, time_ms, write_csv
+from app.testing.perf.routing import route_queries
+from app.utils.constants import SIMULATION_TICK_HZ, TAXI_ACCELERATION_MPS2, TAXI_SPEED_MPS
+
+AIRCRAFT_COUNTS = (1_000, 5_000, 10_000)
+TICKS = 50
+ARRIVAL_SPREAD_TICKS = 500  # remaining taxi time of the initial traffic, in ticks
+
+HEADERS = [
+    "icao",
+    "aircraft",
+    "route_vertices",
+    "rebuild_ms",
+    "tick_p50_ms",
+    "tick_max_ms",
+    "arrivals_per_tick",
+    "us_per_aircraft",
+    "ticks_per_s",
+]
+
+
+def route_polylines(engine: ClearanceEngine) -> list[list[tuple[float, float]]]:
+    polylines = []
+    for start, goal in route_queries(engine):
+        path, _ = engine._find_path(start, goal)
+        if len(path) >= 2:
+            polylines.append([engine.graph.coord(node) for node in path])
+    return polylines
+
+
+def run(args) -> list[list]:
+    rows = []
+    dt = 1.0 / SIMULATION_TICK_HZ
+
+    for icao in args.icao or bundled_icaos():
+        polylines = route_polylines(ClearanceEngine(load_map(icao)))
+        if not polylines:
+            continue
+
+        for count in AIRCRAFT_COUNTS:
+            simulator = TaxiSimulator(TAXI_SPEED_MPS, TAXI_ACCELERATION_MPS2)
+            for i in range(count):
+                simulator.start(f"AC{i}", polylines[i % len(polylines)])
+
+            _, rebuild_ms = time_ms(lambda: simulator.tick(dt))
+            vertices = len(simulator._vertices)
+            remaining = (np.arange(count) % ARRIVAL_SPREAD_TICKS + 1) * TAXI_SPEED_MPS * dt
+            simulator.travelled = np.maximum(simulator._totals - remaining, 0.0)
+            simulator.speeds = np.full(count, TAXI_SPEED_MPS)
+
+            def steady_tick() -> int:
+                simulator.tick(dt)
+                arrived = [simulator.sids[slot] for slot in simulator.arrived().nonzero()[0].tolist()]
+                simulator.stop_many(arrived)
+                for sid in arrived:
+                    simulator.start(sid, polylines[int(sid[2:]) % len(polylines)])
+                return len(arrived)
+
+            tick_ms = []
+            arrivals = 0
+            for _ in range(TICKS):
+                arrived, elapsed_ms = time_ms(steady_tick)
+                tick_ms.append(elapsed_ms)
+                arrivals += arrived
+
+            p50 = median(tick_ms)
+            rows.append([
+                icao,
+                count,
+                vertices,
+                rebuild_ms,
+                p50,
+                max(tick_ms),
+                arrivals / TICKS,
+                p50 * 1000 / count,
+                1000 / p50 if p50 else 0.0,
+            ])
+
+    print_table("Taxi simulation: vectorized tick cost", HEADERS, rows)
+    print(f"Saved in: {write_csv('simulation', HEADERS, rows)}")
+    return rows
@@ -18,6 +18,32 @@ AFFIRM = "affirm"
 DEFAULT_TIMER_DURATION = 90
 STANDBY_TIMER_DURATION = 300
 
+ROUTE_CACHE_SIZE = 1024 # computed taxi routes kept per airport, keyed by snapped endpoints
+MAX_ROUTE_ALTERNATIVES = 5 # upper bound on the alternatives ATC can ask for at once
+ROUTE_ENCODING_SCALE = 100_000 # compact clearance routes quantize coordinates to int(degrees * scale)
+
+AIRPORT_MEMORY_BUDGET_MB = 64 # resident airports (maps + routing engines) kept before idle ones are evicted
+AIRPORT_MAX_COLD_LOADS = 2 # airports built at once for connecting sessions; further cold requests are turned away
+AIRPORT_MAX_IN_USE = 16 # airports with sessions bound, which eviction never frees; cold requests beyond it are turned away
+FACILITY_BYTES_PER_MAP_ROW = 2_000 # rough resident cost of one map row once its graph and engine are built
+AIRPORT_MAP_PATH = "/maps" # HTTP route serving the pre-encoded map of each loaded airport, as <path>/<ICAO>
+MAP_TILE_MAX_ZOOM = 5 # deepest quadtree level cut from a map (2^z x 2^z tiles); that level keeps the exact geometry
+MAP_TILE_RESOLUTION = 512 # pixels a tile is simplified for: geometry below one pixel of it is dropped
+MAP_TILE_PARKING_MIN_ZOOM = 2 # parking stands only appear in tiles from this level on
+CACHE_REVALIDATE_INTERVAL_S = 300 # seconds between two checks of the cached maps against apt.dat
+CACHE_REBUILD_BATCH = 8 # stale maps of airports not in use rewritten per check; airports in use are always rebuilt
+
+SIMULATION_TICK_HZ = 2 # taxi movement steps (and position broadcasts) per second
+TAXI_SPEED_MPS = 7.7 # ~15 kt
+TAXI_ACCELERATION_MPS2 = 0.5
+
+POSITION_STREAM_SCALE = 100_000 # streamed coordinates are int(degrees * scale), ~1 m
+POSITION_STREAM_MIN_MOVE = 2 # quantized units an aircraft must move before it is sent again
+POSITION_STREAM_MIN_TURN = 3 # degrees of heading change that also trigger a resend
+POSITION_STREAM_MAX_INTERVAL = 8 # at most this many ticks between two frames
+POSITION_STREAM_HIGH_WATER = 32 # packets queued on the slowest ATC socket before frames slow down
+POSITION_STREAM_LOW_WATER = 4 # ... and below which they speed up again
+
 DEFAULT_STEPS = [ # used on frontend!
     {"label": "Expected Taxi Clearance", "requestType": EXPECTED_TAXI_CLEARANCE},
     {"label": "Engine Startup", "requestType": ENGINE_STARTUP},
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Literal, Mapping, Sequence, Tuple
+
+from app.utils.constants import ROUTE_ENCODING_SCALE
+from app.utils.types import Clearance, LocationInfo, PilotPublicView
+
+RouteEncoding = Literal["legacy", "compact"]
+ROUTE_ENCODINGS: Tuple[RouteEncoding, ...] = ("legacy", "compact")
+
+# compact route: {"scale", "segments": [[name, type, point count], ...], "points": [lat0, lon0, dlat1, dlon1, ...]}
+CompactRoute = Dict[str, Any]
+
+
+def encode_route(locations: Sequence[LocationInfo], scale: int = ROUTE_ENCODING_SCALE) -> CompactRoute:
+    """
+    Consecutive locations with the same name and type become one segment;
+    coordinates are quantized to int(degrees * scale), the first point absolute
+    and every later one as the difference from the previous point.
+    """
+    segments: List[List[Any]] = []
+    points: List[int] = []
+    previous = (0, 0)
+
+    for location in locations:
+        name, kind = location["name"], location["type"]
+        if segments and segments[-1][0] == name and segments[-1][1] == kind:
+            segments[-1][2] += 1
+        else:
+            segments.append([name, kind, 1])
+
+        quantized = (round(location["coord"][0] * scale), round(location["coord"][1] * scale))
+        points.append(quantized[0] - previous[0])
+        points.append(quantized[1] - previous[1])
+        previous = quantized
+
+    return {"scale": scale, "segments": segments, "points": points}
+
+
+def decode_route(route: CompactRoute) -> List[LocationInfo]:
+    scale = route["scale"]
+    points = route["points"]
+    locations: List[LocationInfo] = []
+    lat = lon = 0
+    index = 0
+
+    for name, kind, count in route["segments"]:
+        for _ in range(count):
+            lat += points[index]
+            lon += points[index + 1]
+            index += 2
+            locations.append({"name": name, "type": kind, "coord": (lat / scale, lon / scale)})
+
+    return locations
+
+
+def encode_locations(locations: Sequence[LocationInfo], encoding: RouteEncoding) -> Dict[str, Any]:
+    """Route fields of a payload: `coords` (legacy) or `route` (compact)."""
+    if encoding == "legacy":
+        return {"coords": list(locations)}
+    return {"route": encode_route(locations)}
+
+
+def encode_clearance(clearance: Clearance, encoding: RouteEncoding) -> Mapping[str, Any]:
+    """Clearance as sent to clients: unchanged for legacy, `coords` replaced by `route` for compact."""
+    if encoding == "legacy":
+        return clearance
+
+    encoded = {key: value for key, value in clearance.items() if key != "coords"}
+    encoded.update(encode_locations(clearance["coords"], encoding))
+    return encoded
+
+
+def encode_public_view(view: PilotPublicView, encoding: RouteEncoding) -> Mapping[str, Any]:
+    if encoding == "legacy":
+        return view
+
+    encoded: Dict[str, Any] = dict(view)
+    encoded["clearances"] = {kind: encode_clearance(clearance, encoding) for kind, clearance in view["clearances"].items()}
+    return encoded
@@ -11,9 +11,14 @@ GET_ACTIVITY_LISTEN="getActivity"
 GET_PILOTS_LISTEN="getPilotList"
 GET_AIRPORT_MAP_DATA_LISTEN="getAirportMapData"
 GET_CLEARANCE_LISTEN="getClearance"
+GET_CLEARANCES_LISTEN="getClearances"
+GET_ROUTE_ALTERNATIVES_LISTEN="getRouteAlternatives"
+GET_ROUTE_CONFLICTS_LISTEN="getRouteConflicts"
 CANCEL_CLEARANCE_LISTEN="cancelClearance"
 ATC_RESPONSE_LISTEN="atcResponse"
 SELECT_AIRCRAFT="selectAircraft"
+CLOSE_EDGES_LISTEN="closeEdges"
+REOPEN_EDGES_LISTEN="reopenEdges"
 
 ## == Send Events
 CONNECTED_TO_ATC_SEND="connectedToAtc"
@@ -22,6 +27,10 @@ REQUEST_ACK_SEND="requestAcknowledged"
 REQUEST_CANCELLED_SEND="requestCancelled"
 ACTION_ACK_SEND="actionAcknowledged"
 PROPOSED_CLEARANCE_SEND="proposedClearance"
+PROPOSED_CLEARANCES_SEND="proposedClearances"
+ROUTE_ALTERNATIVES_SEND="routeAlternatives"
+ROUTE_CONFLICTS_SEND="routeConflicts"
+PILOT_CONFLICTS_SEND="pilotConflicts"
 ACTIVITY_INFO_SEND="activityInfoResponse"
 ATC_RESPONSE_TO_PILOT="atcResponseToPilot"
 PILOT_CONNECTED_SEND="pilot_connected"
@@ -30,6 +39,8 @@ ATC_LIST_SEND="atc_list"
 NEW_REQUEST_SEND="new_request"
 AIRPORT_MAP_DATA_SEND="airport_map_data"
 CLEARANCE_CANCELLED="clearancesCancelled"
+EDGE_CLOSURES_SEND="edgeClosures"
+TAXI_POSITIONS_SEND="taxiPositions"
 ATC_TIMEOUT="atcTimeout"
 TICK="tick"
 ERROR_SEND="error"
\ No newline at end of file
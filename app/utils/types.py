@@ -192,6 +192,16 @@ class AirportMapData(TypedDict):
     taxiways: List[Taxiway]
     parking: List[ParkingPosition]
 
+# apt.dat record a cached map was built from
+class MapSource(TypedDict):
+    checksum: str
+    parser_version: int
+
+# JSON entry (bundled, or edited by hand) a cached map was converted from
+class JsonMapSource(TypedDict):
+    origin: Literal["json"]
+    digest: str
+
 # === Plane ===
 class LocationInfo(TypedDict):
     name: str
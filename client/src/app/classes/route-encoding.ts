@@ -0,0 +1,32 @@
+import { Clearance, CompactRoute, LocationInfo, PilotPublicView } from '@app/interfaces/Publics';
+
+export function decodeRoute(route: CompactRoute): LocationInfo[] {
+  const locations: LocationInfo[] = [];
+  let lat = 0;
+  let lon = 0;
+  let index = 0;
+
+  for (const [name, type, count] of route.segments) {
+    for (let i = 0; i < count; i++) {
+      lat += route.points[index];
+      lon += route.points[index + 1];
+      index += 2;
+      locations.push({ name, type, coord: [lat / route.scale, lon / route.scale] });
+    }
+  }
+  return locations;
+}
+
+// fills `coords` from `route` in place; legacy clearances are left untouched
+export function decodeClearance(clearance: Clearance): Clearance {
+  if (clearance.route) {
+    clearance.coords = decodeRoute(clearance.route);
+    delete clearance.route;
+  }
+  return clearance;
+}
+
+export function decodePilotView(view: PilotPublicView): PilotPublicView {
+  Object.values(view.clearances).forEach(decodeClearance);
+  return view;
+}
@@ -56,3 +56,28 @@ export interface AirportMapData {
   taxiways: Taxiway[];
   parking: ParkingPosition[];
 }
+
+// === Map Reference (socket) ===
+// the map itself is fetched from `url`, or by viewport from the `tiles` index; both revalidate by ETag
+export interface AirportMapRef {
+  icao: string;
+  version: string;
+  url: string;
+  tiles: string;
+}
+
+// === Map Tiles ===
+// quadtree over a square of `span` degrees from bounds[0]; tile z/x/y counts x along the second coordinate
+export interface AirportTileIndex {
+  version: string;
+  bounds: [LonLat, LonLat];
+  span: number;
+  max_zoom: number;
+  resolution: number;
+  airport_info: AirportInfo;
+}
+
+// empty tiles are {}
+export interface MapTile extends Partial<Omit<AirportMapData, 'airport_info'>> {
+  tile?: [number, number, number];
+}
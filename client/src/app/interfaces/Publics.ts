@@ -40,10 +40,18 @@ export interface StepEvent {
 // CLEARANCE
 export type ClearanceType = "expected" | "taxi" | "route_change";
 
+// server started with --route-encoding compact: `route` is sent instead of `coords`
+export interface CompactRoute {
+  scale: number;
+  segments: [string, LocationInfo["type"], number][];
+  points: number[];
+}
+
 export interface Clearance {
   kind: ClearanceType;
   instruction: string;
   coords: LocationInfo[];
+  route?: CompactRoute;
   issued_at: string;
 }
 
@@ -12,7 +12,12 @@ export enum SOCKET_SENDS  {
     SELECT_AIRCRAFT = 'selectAircraft',
     GET_PILOT_LIST = 'getPilotList',
     GET_CLEARANCE = 'getClearance',
+    GET_CLEARANCES = 'getClearances',
+    GET_ROUTE_ALTERNATIVES = 'getRouteAlternatives',
+    GET_ROUTE_CONFLICTS = 'getRouteConflicts',
     CANCEL_CLEARANCE = 'cancelClearance',
+    CLOSE_EDGES = 'closeEdges',
+    REOPEN_EDGES = 'reopenEdges',
     ATC_RESPONSE = 'atcResponse'
 }
 
@@ -24,7 +29,13 @@ export enum SOCKET_LISTENS  {
     PILOT_DISCONNECTED = 'pilot_disconnected',
     NEW_REQUEST = 'new_request',
     PROPOSED_CLEARANCE = 'proposedClearance',
+    PROPOSED_CLEARANCES = 'proposedClearances',
+    ROUTE_ALTERNATIVES = 'routeAlternatives',
+    ROUTE_CONFLICTS = 'routeConflicts',
+    PILOT_CONFLICTS = 'pilotConflicts',
     CLEARANCE_CANCELLED = 'clearancesCancelled',
+    EDGE_CLOSURES = 'edgeClosures',
+    TAXI_POSITIONS = 'taxiPositions',
     ATC_LIST = 'atc_list',
     ERROR = 'error'
 }
\ No newline at end of file
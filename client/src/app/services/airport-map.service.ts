@@ -1,11 +1,12 @@
 import { Injectable } from '@angular/core';
-// import { CommunicationService } from './communication.service';
+import { CommunicationService } from './communication.service';
 import { BehaviorSubject, Observable } from 'rxjs';
 import { MapRenderOptions } from '@app/classes/airport-map-renderer.ts';
 import { Clearance, ClearancePayload, PilotPublicView } from '@app/interfaces/Publics';
 import { ClientSocketService } from './client-socket.service';
-import { AirportMapData } from '@app/interfaces/AirMap';
+import { AirportMapData, AirportMapRef, AirportTileIndex, MapTile } from '@app/interfaces/AirMap';
 import { SOCKET_SENDS } from '@app/modules/constants';
+import { decodeClearance } from '@app/classes/route-encoding';
 
 @Injectable({ providedIn: 'root' })
 export class AirportMapService {
@@ -27,6 +28,14 @@ export class AirportMapService {
   private showLabelsSubject = new BehaviorSubject<boolean>(false);
   showLabels$: Observable<boolean> = this.showLabelsSubject.asObservable();
 
+  private mapVersion = '';
+
+  // === Map tiles ===
+  private tileIndex: AirportTileIndex | null = null;
+  private tilesUrl = '';
+  private tileCache = new Map<string, MapTile>();
+  private visibleTiles = '';
+
   // === Projection data ===
   private baseScale = 1;
   private minLon = 0;
@@ -58,7 +67,7 @@ export class AirportMapService {
   private prefersReducedMotion = false;
   
   constructor(
-    // private readonly communicationService: CommunicationService,
+    private readonly communicationService: CommunicationService,
     private readonly socketClientService: ClientSocketService
   ) {
     this.prefersReducedMotion =
@@ -93,37 +102,10 @@ export class AirportMapService {
   }
 
   private computeProjection(): void {
-    const map = this.airportMapSubject.value;
-    if (!map) return;
-  
-    // === Collect all LonLat coordinates ===
-    const allCoords: [number, number][] = [];
-  
-    map.runways.forEach(rw => {
-      allCoords.push(rw.start, rw.end);
-    });
-  
-    map.helipads.forEach(h => {
-      allCoords.push(h.location);
-    });
-  
-    map.taxiways.forEach(t => {
-      allCoords.push(t.start, t.end);
-    });
-  
-    map.parking.forEach(p => {
-      allCoords.push(p.location);
-    });
-  
-    if (!allCoords.length) return;
+    if (!this.tileIndex) return;
   
-    // === Extract bounds ===
-    const lons = allCoords.map(([lon, _]) => lon);
-    const lats = allCoords.map(([_, lat]) => lat);
-    this.minLon = Math.min(...lons);
-    this.maxLon = Math.max(...lons);
-    this.minLat = Math.min(...lats);
-    this.maxLat = Math.max(...lats);
+    // === Bounds of the whole airport, whichever tiles are loaded ===
+    [[this.minLon, this.minLat], [this.maxLon, this.maxLat]] = this.tileIndex.bounds;
   
     // === Compute scaling factors ===
     const W = this.canvasWidth - 2 * this.padding;
@@ -137,6 +119,108 @@ export class AirportMapService {
     const projectedHeight = (this.maxLat - this.minLat) * this.baseScale;
     this.offsetCenterX = (this.canvasWidth - projectedWidth) / 2;
     this.offsetCenterY = (this.canvasHeight - projectedHeight) / 2;
+    this.refreshTiles();
+  }
+
+  // canvas pixel back to map coordinates (inverse of getRenderOptions().project)
+  private unproject(x: number, y: number): [number, number] {
+    const [rotX, rotY] = this.rotatePoint(
+      x - this.panOffset.x,
+      y - this.panOffset.y,
+      -this.rotationAngle,
+      this.canvasWidth / 2,
+      this.canvasHeight / 2
+    );
+    const x0 = rotX / this.zoomFactor;
+    const y0 = rotY / this.zoomFactor;
+
+    return [
+      this.minLon + (x0 - this.offsetCenterX) / this.baseScale,
+      this.minLat + (this.canvasHeight - y0 - this.offsetCenterY) / this.baseScale
+    ];
+  }
+
+  // loads the tiles covering the viewport, at the level drawn closest to (and not finer than) its resolution
+  private refreshTiles(): void {
+    const index = this.tileIndex;
+    if (!index || !this.canvasWidth || !this.canvasHeight || !this.baseScale) return;
+
+    const spanPx = index.span * this.baseScale * this.zoomFactor;
+    const z = Math.min(index.max_zoom, Math.max(0, Math.floor(Math.log2(spanPx / index.resolution))));
+    const count = 2 ** z;
+    const size = index.span / count;
+
+    const corners = [
+      this.unproject(0, 0),
+      this.unproject(this.canvasWidth, 0),
+      this.unproject(0, this.canvasHeight),
+      this.unproject(this.canvasWidth, this.canvasHeight)
+    ];
+    const firsts = corners.map(([first, _]) => first);
+    const seconds = corners.map(([_, second]) => second);
+    const [originFirst, originSecond] = index.bounds[0];
+    const cell = (value: number, origin: number) => Math.min(count - 1, Math.max(0, Math.floor((value - origin) / size)));
+
+    const keys: string[] = [];
+    for (let x = cell(Math.min(...seconds), originSecond); x <= cell(Math.max(...seconds), originSecond); x++) {
+      for (let y = cell(Math.min(...firsts), originFirst); y <= cell(Math.max(...firsts), originFirst); y++) {
+        keys.push(`${z}/${x}/${y}`);
+      }
+    }
+
+    const visible = keys.join(',');
+    if (visible === this.visibleTiles) return;
+    this.visibleTiles = visible;
+    void this.loadTiles(keys, visible);
+  }
+
+  private async loadTiles(keys: string[], visible: string): Promise<void> {
+    const version = this.mapVersion;
+    const missing = keys.filter(key => !this.tileCache.has(key));
+    const fetched = await Promise.all(
+      missing.map(key => this.communicationService.get<MapTile>(`${this.tilesUrl}/${key}`))
+    );
+
+    if (version !== this.mapVersion) return; // another map meanwhile
+    missing.forEach((key, i) => {
+      const tile = fetched[i];
+      if (tile) this.tileCache.set(key, tile);
+    });
+
+    // the viewport moved on meanwhile: its own load draws it
+    if (visible !== this.visibleTiles) return;
+    this.airportMapSubject.next(this.mergeTiles(keys));
+  }
+
+  private mergeTiles(keys: string[]): AirportMapData {
+    const map: AirportMapData = {
+      airport_info: this.tileIndex!.airport_info,
+      runways: [],
+      helipads: [],
+      taxiways: [],
+      parking: []
+    };
+
+    // features crossing tiles are in each of them
+    const seen = new Set<string>();
+    const add = <T>(target: T[], items: T[] | undefined, id: (item: T) => string) => {
+      for (const item of items ?? []) {
+        const key = id(item);
+        if (seen.has(key)) continue;
+        seen.add(key);
+        target.push(item);
+      }
+    };
+
+    for (const key of keys) {
+      const tile = this.tileCache.get(key);
+      if (!tile) continue;
+      add(map.runways, tile.runways, r => `r${r.name}`);
+      add(map.helipads, tile.helipads, h => `h${h.name}`);
+      add(map.taxiways, tile.taxiways, t => `t${t.start}|${t.end}`);
+      add(map.parking, tile.parking, p => `p${p.location}`);
+    }
+    return map;
   }
   
   getRenderOptions(): MapRenderOptions | null {
@@ -174,6 +258,7 @@ export class AirportMapService {
   setZoomAndPan(zoom: number, pan: { x: number; y: number }): void {
     this.zoomFactor = this.clampZoom(zoom);
     this.panOffset = { ...pan };
+    this.refreshTiles();
     this.renderSubject.next(true);
   }
 
@@ -310,6 +395,7 @@ export class AirportMapService {
 
     this.panOffset.x += dx * this.PAN_SENSITIVITY;
     this.panOffset.y += dy * this.PAN_SENSITIVITY;
+    this.refreshTiles();
   }
 
   getBaseScale(): number {
@@ -323,6 +409,7 @@ export class AirportMapService {
   setRotation(angleRadians: number): void {
     const normalized = Math.atan2(Math.sin(angleRadians), Math.cos(angleRadians));
     this.rotationAngle = normalized;
+    this.refreshTiles();
     this.renderSubject.next(true);
   }
 
@@ -406,8 +493,19 @@ export class AirportMapService {
   }
 
   // === Socket events ===
-  private onAirportMapData = (data: AirportMapData): void => {
-    this.airportMapSubject.next(data);
+  private onAirportMapData = async (ref: AirportMapRef): Promise<void> => {
+    if (ref.version === this.mapVersion && this.tileIndex) return;
+
+    // the map comes in tiles, by viewport: only their index is fetched up front
+    const tilesUrl = ref.tiles.replace(/^\//, '');
+    const index = await this.communicationService.get<AirportTileIndex>(tilesUrl);
+    if (!index) return;
+
+    this.mapVersion = ref.version;
+    this.tileIndex = index;
+    this.tilesUrl = tilesUrl;
+    this.tileCache.clear();
+    this.visibleTiles = '';
     this.computeProjection();
   }
 
@@ -415,7 +513,7 @@ export class AirportMapService {
     const currentPilot = this.selectedAircraft;
     if (!currentPilot || currentPilot.sid !== payload.pilot_sid) return;
 
-    const { kind, instruction, coords, issued_at } = payload.clearance;
+    const { kind, instruction, coords, issued_at } = decodeClearance(payload.clearance);
 
     const clearance: Clearance = {
       kind: kind,
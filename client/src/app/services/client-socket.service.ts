@@ -3,6 +3,8 @@ import { environment } from 'src/environments/environment';
 import { io, Socket } from 'socket.io-client';
 
 const ROLE_ATC = 1;
+// ?facility=<ICAO> joins that airport; the server's default airport otherwise
+const FACILITY = new URLSearchParams(window.location.search).get('facility');
 
 @Injectable({
     providedIn: 'root',
@@ -21,7 +23,7 @@ export class ClientSocketService {
         if (!this.isSocketAlive()) {
             const url = `${environment.serverUrl}`;
             this.socket = io(url, {
-                auth: { r: ROLE_ATC },
+                auth: FACILITY ? { r: ROLE_ATC, f: FACILITY } : { r: ROLE_ATC },
                 transports: ['websocket'],
             });
         }
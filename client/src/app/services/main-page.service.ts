@@ -8,6 +8,7 @@ import { SelectedRequestInfo } from '@app/interfaces/SelectedRequest';
 import { ResponseCache, StepUpdate } from '@app/interfaces/Payloads'; // SmartResponse
 import { AirportMapService } from './airport-map.service';
 import { LABELS, SOCKET_LISTENS, SOCKET_SENDS } from '@app/modules/constants';
+import { decodeClearance, decodePilotView } from '@app/classes/route-encoding';
 
 @Injectable({
   providedIn: 'root'
@@ -178,6 +179,7 @@ export class MainPageService {
   }
 
   private onNewPilotPublicView = (preview: PilotPublicView) => {
+    decodePilotView(preview);
     preview.renderClearance = false
 
     const currentPreviews = this.pilotsPreviewsSubject.getValue();
@@ -198,7 +200,7 @@ export class MainPageService {
   }
 
   private pilotListUpdate = (pilots: PilotPublicView[]) => {
-    pilots.forEach(pilot => { pilot.renderClearance = false; });
+    pilots.forEach(pilot => { decodePilotView(pilot); pilot.renderClearance = false; });
     this.pilotsPreviewsSubject.next(pilots);
   }
 
@@ -210,7 +212,7 @@ export class MainPageService {
     const pilot = currentPreviews[pilotIndex];
     if (!pilot) return;
     const kind = payload.clearance.kind;
-    pilot.clearances[kind] = payload.clearance;
+    pilot.clearances[kind] = decodeClearance(payload.clearance);
     this.pilotsPreviewsSubject.next([...currentPreviews]);
     if (this.airportMapService.selectedAircraft?.sid === payload.pilot_sid) this.airportMapService.selectedAircraft = pilot;
   }
@@ -221,6 +223,7 @@ export class MainPageService {
     if (pilotIndex === -1) return;
     const pilot = currentPreviews[pilotIndex];
     if (!pilot) return;
+    Object.values(payload.clearances).forEach(decodeClearance);
     pilot.clearances = payload.clearances;
     this.pilotsPreviewsSubject.next([...currentPreviews]);
     if (this.airportMapService.selectedAircraft?.sid === payload.pilot_sid) this.airportMapService.selectedAircraft = pilot;
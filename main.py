@@ -16,7 +16,10 @@ from flask_cors import CORS
 from flask_socketio import SocketIO
 from app.classes.socket import SocketService
 from app.managers import PilotManager, SocketManager, AtcManager, AirportMapManager
-from app.routes import general
+from app.routes import general, maps
+from app.classes.clearance import ROUTING_MODES
+from app.utils.route_encoding import ROUTE_ENCODINGS
+from app.utils.constants import AIRPORT_MEMORY_BUDGET_MB
 from app.testing.benchmark.metrics.server import SystemMetrics
 from app.testing.benchmark.observability import register_benchmark_observability
 
@@ -59,6 +62,9 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--icao", "--ICAO", default=DEFAULT_ICAO)
+    parser.add_argument("--routing-mode", choices=ROUTING_MODES, default="search")
+    parser.add_argument("--route-encoding", choices=ROUTE_ENCODINGS, default="legacy")
+    parser.add_argument("--airport-memory-mb", type=float, default=AIRPORT_MEMORY_BUDGET_MB)
     args = parser.parse_args()
 
     selected_icao: str = args.icao.upper()
@@ -69,8 +75,8 @@ if __name__ == "__main__":
     metrics_store = SystemMetrics()
 
     socket_service = SocketService(socketio, metrics_store)
-    pilot_manager = PilotManager(airport_map_manager=airport_map_manager)
-    atc_manager = AtcManager(selected_icao)
+    pilot_manager = PilotManager()
+    atc_manager = AtcManager()
 
     general.pilot_manager = pilot_manager
     general.socket_service = socket_service
@@ -82,8 +88,14 @@ if __name__ == "__main__":
         atc_manager=atc_manager,
         airport_map_manager=airport_map_manager,
         metrics_store=metrics_store,
+        routing_mode=args.routing_mode,
+        route_encoding=args.route_encoding,
+        airport_memory_mb=args.airport_memory_mb,
     )
 
+    maps.airport_registry = socket_manager.airports
+    app.register_blueprint(maps.maps_bp)
+
     socket_manager.init_events()
 
     if os.getenv("CPDLC_BENCHMARK") == "1":
@@ -91,6 +103,7 @@ if __name__ == "__main__":
             app=app,
             pilot_manager=pilot_manager,
             atc_manager=atc_manager,
+            socket_manager=socket_manager,
             metrics_store=metrics_store,
         )
 
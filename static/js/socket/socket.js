@@ -1,9 +1,11 @@
 import { SERVER_URL } from "../consts/serverUrl.js";
 
 const ROLE_PILOT = 0;
+// ?facility=<ICAO> joins that airport; the server's default airport otherwise
+const FACILITY = new URLSearchParams(window.location.search).get("facility");
 
 const socket = io(SERVER_URL, { //! single connection for each pilot
-  auth: { r: ROLE_PILOT },
+  auth: FACILITY ? { r: ROLE_PILOT, f: FACILITY } : { r: ROLE_PILOT },
   transports: ["websocket"],
 }); 
 